@@ -1,114 +1,31 @@
 import sys
-import json
-import sqlite3
+from collections import defaultdict
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
     QLabel, QLineEdit, QPushButton, QComboBox, QRadioButton, QButtonGroup, QTableView,
-    QTabWidget, QDialog, QDialogButtonBox, QMessageBox
+    QTabWidget, QMessageBox, QProgressDialog
 )
-from PyQt5.QtCore import Qt, QAbstractTableModel, QVariant
-from PyQt5.QtGui import QColor
-from student import Student
-from instructor import Instructor
+from PyQt5.QtCore import Qt, QTimer
 from course import Course
-from person import Person
-from data_manager import save_data, load_data
-
-
-Person.create_database()
-Student.create_database()
-Instructor.create_database()
-Course.create_database()
-
-class RecordTableModel(QAbstractTableModel):
-    """
-    A custom table model that displays data using PyQt5's QAbstractTableModel.
-
-    This class is designed to handle a list of records and display them in a table
-    with headers. It overrides the basic methods for determining row/column counts
-    and providing data to the table view.
-
-    Attributes:
-        records (list): A list of records, where each record is typically a list or tuple
-            representing a row in the table.
-        headers (list): A list of column headers for the table.
-    """
-    
-    def __init__(self, records, headers, parent=None):
-        """
-        Initialize the table model with records and headers.
-
-        Args:
-            records (list): The data for the table, a list of rows, where each row is a list or tuple.
-            headers (list): The column headers for the table.
-            parent (QWidget, optional): The parent widget of the table model. Defaults to None.
-        """
-        super().__init__(parent)
-        self.records = records
-        self.headers = headers
-
-    def rowCount(self, parent=None):
-        """
-        Return the number of rows in the table.
-
-        Args:
-            parent (QModelIndex, optional): The parent index, not used here. Defaults to None.
-
-        Returns:
-            int: The number of rows in the table, based on the number of records.
-        """
-        return len(self.records)
-
-    def columnCount(self, parent=None):
-        """
-        Return the number of columns in the table.
-
-        Args:
-            parent (QModelIndex, optional): The parent index, not used here. Defaults to None.
-
-        Returns:
-            int: The number of columns in the table, based on the length of the headers list.
-        """
-        return len(self.headers)
-
-    def data(self, index, role=Qt.DisplayRole):
-        """
-        Provide data for the given index and role.
-
-        This method is called by the view to get the data to display.
-
-        Args:
-            index (QModelIndex): The index of the cell that needs data.
-            role (Qt.ItemDataRole): The role for which data is requested (e.g., display role).
-
-        Returns:
-            QVariant: The data for the requested index and role, or an invalid QVariant if
-            the index is invalid or the role is not supported.
-        """
-        if not index.isValid():
-            return QVariant()
-
-        record = self.records[index.row()]
-        if role == Qt.DisplayRole:
-            return QVariant(record[index.column()])
-        return QVariant()
+from database import get_connection, stream_query, PrefetchedRows
+from migrations import migrate
+from data_manager import (
+    save_records, iter_record_batches,
+    can_journal, record_snapshot, append_journal, discard_journal
+)
+from change_tracking import ChangeTracker
+from validation import validate_records
+from lazy_models import LazyStudent, LazyInstructor, LazyCourse
+from qt_models import RecordTableModel, PrefixPicker
+from prefix_index import PrefixIndex
+from jobs import JobRunner
+from live_search import LiveSearch, DEBOUNCE_MS
+from text_search import contains_filter
+from events import EventBus, RecordInserted, RecordUpdated, RecordDeleted
+from query_cache import QueryCache
 
-    def headerData(self, section, orientation, role=Qt.DisplayRole):
-        """
-        Provide header data for the table, either for rows or columns.
 
-        Args:
-            section (int): The section (row or column) number for which header data is requested.
-            orientation (Qt.Orientation): The orientation (horizontal or vertical) of the header.
-            role (Qt.ItemDataRole): The role for which the header data is requested.
-
-        Returns:
-            QVariant: The header data for the requested section and role, or an invalid QVariant
-            if the role or orientation is not supported.
-        """
-        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
-            return QVariant(self.headers[section])
-        return QVariant()
+migrate()
 
 class MainWindow(QMainWindow):
     """
@@ -121,9 +38,20 @@ class MainWindow(QMainWindow):
     instructors to courses.
 
     Attributes:
-        students (list): A list of student records (initially empty).
-        instructors (list): A list of instructor records (initially empty).
-        courses (list): A list of course records (initially empty).
+        students (list): Lazy student proxies from the database (see `lazy_models`).
+        instructors (list): Lazy instructor proxies from the database.
+        courses (list): Lazy course proxies from the database.
+        model (RecordTableModel): The model of the table view, fetching rows as the view scrolls.
+        changes (ChangeTracker): The ``(section, id)`` keys of the records
+            changed since the data was last saved, and the snapshot the
+            database matched after the last full save, so the next save may
+            journal only the changes (see `data_manager.can_journal`).
+        jobs (JobRunner): Runs queries on worker threads.
+        write_jobs (JobRunner): Runs writes, saves and loads on a single worker thread, one at
+            a time in the order they were requested.
+        live_search (LiveSearch): Runs the searches, cancelling the ones that are out of date.
+        query_cache (QueryCache): The rows of the view and the dropdowns as last read, dropped
+            when a record of a table they read is changed.
     """
     def __init__(self):
         """
@@ -136,11 +64,40 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("School Management System")
         self.setGeometry(100, 100, 800, 800)
         
-        self.students = []
-        self.instructors = []
-        self.courses = []
+        # The dropdown records by ID
+        self.students = {}
+        self.instructors = {}
+        self.courses = {}
+        self.model = None
+
+        # The database may hold changes that were never saved, so the first
+        # save of a session always writes a full snapshot.
+        self.changes = ChangeTracker()
+
+        # Database and file work runs off the GUI thread; results come back through signals
+        self.jobs = JobRunner(self)
+        self.write_jobs = JobRunner(self, max_threads=1)
+        self.view_job = None
+        self.dropdown_job = None
+        self.live_search = LiveSearch()
+
+        # Writes publish what they changed; the view and the dropdowns apply just that change.
+        # Events that arrive while the view or the dropdowns are being reloaded are kept and
+        # applied to the reloaded rows, which may or may not include the change already.
+        self.events = EventBus()
+        # The cached rows reading a changed record's table are dropped before the view applies it
+        self.query_cache = QueryCache()
+        self.events.subscribe(lambda event: self.query_cache.invalidate(event.entity))
+        self.view_backlog = []
+        self.dropdown_backlog = []
+        # Whether the view shows search results rather than every record
+        self.view_filtered = False
+        self.dropdowns = {}
 
         self.initUI()
+        self.events.subscribe(self.apply_to_view)
+        self.events.subscribe(self.apply_to_dropdowns)
+        self.refresh_dropdowns()
 
     def initUI(self):
         """
@@ -176,6 +133,21 @@ class MainWindow(QMainWindow):
         self.initAssignTab()
         self.initViewTab()
 
+        # The dropdowns only hold the first matches of what has been typed; the instructor and
+        # course dropdowns share one index per kind of record (see `fill_dropdowns`)
+        name_label = lambda record: record.name
+        self.course_instructor_picker = PrefixPicker(
+            self.course_instructor_combo, PrefixIndex(), name_label,
+            lambda record: record.instructor_id)
+        self.instructor_picker = PrefixPicker(
+            self.instructor_combo, PrefixIndex(), name_label, lambda record: record.instructor_id)
+        self.student_picker = PrefixPicker(
+            self.student_combo, PrefixIndex(), name_label, lambda record: record.student_id)
+        self.course_picker = PrefixPicker(
+            self.course_combo, PrefixIndex(), name_label, lambda record: record.course_id)
+        self.course_assign_picker = PrefixPicker(
+            self.course_combo_assign, PrefixIndex(), name_label, lambda record: record.course_id)
+
     def initStudentTab(self):
         """
         Initializes the UI layout and components for the 'Student' tab.
@@ -350,9 +322,19 @@ class MainWindow(QMainWindow):
         
         search_button = QPushButton("Search")
         search_button.clicked.connect(self.search_records)
+
+        # Search as the user types, once typing pauses
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search_records)
+        self.search_name_entry.textChanged.connect(self.schedule_search)
+        self.search_id_entry.textChanged.connect(self.schedule_search)
+        self.search_option_group.buttonClicked.connect(self.schedule_search)
         
-        # TreeView
+        # TreeView; double-click a row to see the record's details
         self.tree_view = QTableView()
+        self.tree_view.doubleClicked.connect(self.show_record_details)
         self.update_treeview()
         
         layout.addLayout(button_layout)
@@ -362,64 +344,302 @@ class MainWindow(QMainWindow):
         
         self.view_tab.setLayout(layout)
 
+    # Rows of the record view: ID, name, type or instructor name, and the kind of record
+    # (not displayed) used to open its details.
+    _VIEW_SQL = '''
+        SELECT student_id, name, 'Student', 'student' FROM student
+        UNION ALL
+        SELECT instructor_id, name, 'Instructor', 'instructor' FROM instructor
+        UNION ALL
+        SELECT course.course_id, course.course_name, COALESCE(instructor.name, 'N/A'), 'course'
+        FROM course
+        LEFT JOIN instructor ON course.instructor_id = instructor.instructor_id
+    '''
+
+    # The tables `_VIEW_SQL` reads.
+    _VIEW_TABLES = ("student", "instructor", "course")
+
+    # Lazy proxy class for each kind of record in the view.
+    _PROXY_CLASSES = {"student": LazyStudent, "instructor": LazyInstructor, "course": LazyCourse}
+
+    # The tables read by the `_SELECT_ALL` query of each proxy class.
+    _PROXY_TABLES = {LazyStudent: ("student",), LazyInstructor: ("instructor",),
+                     LazyCourse: ("course", "instructor")}
+
+    # The section of the JSON snapshot holding each kind of record.
+    _SNAPSHOT_SECTIONS = {"student": "students", "instructor": "instructors", "course": "courses"}
+
+    @staticmethod
+    def _view_row(kind, proxy):
+        """
+        Builds the row of `_VIEW_SQL` for a record.
+
+        Args:
+            kind (str): "student", "instructor" or "course".
+            proxy (LazyRecord): The record, as loaded by `LazyRecord.load`.
+
+        Returns:
+            tuple: The ID, name, type or instructor name, and record kind.
+        """
+        if kind == "course":
+            instructor = proxy.instructor
+            return (proxy.course_id, proxy.name, instructor.name if instructor is not None else "N/A", kind)
+        return (proxy.record_id, proxy.name, kind.capitalize(), kind)
+
+    @classmethod
+    def _load_records(cls, job, cache):
+        """
+        Loads lazy proxies for every student, instructor and course in the database.
+
+        Only IDs and names (and each course's instructor) are read here; other columns and the
+        relationships are fetched the first time they are accessed (see `lazy_models`). The
+        rows are read through the query cache, so they come from memory unless a record was
+        changed since they were last read. The dropdown indexes of the proxies are built here
+        too, off the GUI thread.
+
+        Args:
+            job (Job): The job running the load.
+            cache (QueryCache): The cache to read the rows through.
+
+        Returns:
+            tuple: The student, instructor and course proxies, each by ID, then their
+            `PrefixIndex` objects.
+        """
+        records = tuple(
+            {proxy.record_id: proxy for proxy in map(
+                proxy_class.from_row,
+                cache.fetch(proxy_class._SELECT_ALL, tables=cls._PROXY_TABLES[proxy_class]))}
+            for proxy_class in (LazyStudent, LazyInstructor, LazyCourse))
+        indexes = []
+        for proxies in records:
+            index = PrefixIndex()
+            # Each record can be picked by typing the start of its name or of its ID
+            index.update((proxy, (proxy.name, str(record_id))) for record_id, proxy in proxies.items())
+            indexes.append(index)
+        return records + tuple(indexes)
+
+    @staticmethod
+    def _read_first_page(job, sql, params, cache=None, tables=()):
+        """
+        Runs a query and reads its first page of rows.
+
+        If the job is cancelled while the page is read, the query is closed and the job stops.
+
+        Args:
+            job (Job): The job running the query.
+            sql (str): The SELECT statement.
+            params (tuple): The statement parameters.
+            cache (QueryCache, optional): The cache to read the rows through. Defaults to None,
+                which reads them from the database.
+            tables (tuple): The tables the query reads, for the cache. Defaults to ().
+
+        Returns:
+            PrefetchedRows: The first page followed by the rows not read yet.
+        """
+        rows = cache.fetch(sql, params, tables) if cache is not None else stream_query(sql, params)
+        rows = PrefetchedRows(rows, RecordTableModel.PAGE_SIZE)
+        if job.is_cancelled:
+            rows.close()
+            job.check_cancelled()
+        return rows
+
+    def run_view_job(self, fn, *args, error_title="Error loading records", filtered=False):
+        """
+        Runs a function reading rows for the tree view on a worker thread, then shows the rows.
+
+        A job still running for the view is cancelled first. Rows that arrive from a job that is
+        no longer the latest one are closed instead of shown, and a job that fails or is cancelled
+        stops holding back the changes waiting to be applied to the view.
+
+        Args:
+            fn (callable): Called as ``fn(job, *args)``; returns the rows, or None if they are out
+                of date.
+            *args: Positional arguments for ``fn``.
+            error_title (str): The title of the message shown if the job fails.
+            filtered (bool): Whether the rows are search results (see `show_records`).
+                Defaults to False.
+        """
+        if self.view_job is not None:
+            self.view_job.cancel()
+
+        def finished(rows):
+            if job is not self.view_job:
+                close = getattr(rows, "close", None)
+                if close is not None:
+                    close()
+            elif rows is not None:
+                self.show_records(rows, filtered)
+            else:
+                self.end_view_job()
+
+        def failed(e):
+            if job is self.view_job:
+                self.end_view_job()
+            self.show_error_message(error_title, str(e))
+
+        def cancelled():
+            if job is self.view_job:
+                self.end_view_job()
+
+        job = self.view_job = self.jobs.submit(
+            fn, *args, on_finished=finished, on_error=failed, on_cancelled=cancelled)
+
+    def end_view_job(self):
+        """
+        Forgets the job reading rows for the tree view and applies the changes held back meanwhile.
+        """
+        if self.view_job is not None:
+            self.view_job.cancel()
+            self.view_job = None
+        backlog, self.view_backlog = self.view_backlog, []
+        for event in backlog:
+            self.apply_to_view(event)
+
+    def show_query(self, sql, params=(), error_title="Error loading records", tables=None):
+        """
+        Shows the rows of a query in the tree view.
+
+        The query and its first page of rows run on a worker thread; the view is updated when they
+        are done. A query still running when another one is shown is cancelled, so only the rows of
+        the latest query reach the view (see `run_view_job`).
+
+        Args:
+            sql (str): A SELECT of ID, name, type or instructor name, and record kind.
+            params (tuple): The statement parameters. Defaults to ().
+            error_title (str): The title of the message shown if the query fails.
+            tables (tuple, optional): The tables the query reads, which caches its rows in
+                `self.query_cache`. Defaults to None, which reads them from the database.
+        """
+        cache = self.query_cache if tables is not None else None
+        self.run_view_job(self._read_first_page, sql, params, cache, tables or (),
+                          error_title=error_title)
+
+    def show_records(self, rows, filtered=False):
+        """
+        Shows rows in the tree view, fetching them page by page as the view scrolls.
+
+        The cursor behind the previous rows is closed first, and a query still running for the
+        view is cancelled so its rows do not replace these.
+
+        Args:
+            rows (iterable): Rows of ID, name, type or instructor name, and record kind.
+            filtered (bool): Whether the rows are search results, which new records are not
+                added to. Defaults to False.
+        """
+        if self.model is not None:
+            self.model.close()
+        self.view_filtered = filtered
+        # Rows are identified by their record kind and ID
+        self.model = RecordTableModel(rows, ["ID", "Name", "Type/Instructor"],
+                                      key=lambda row: (row[3], row[0]))
+        self.tree_view.setModel(self.model)
+        self.end_view_job()
+
+    def apply_to_view(self, event):
+        """
+        Applies the change to one record to the rows of the tree view.
+
+        A new record is added at the end of the rows unless the view shows search results, which
+        only list the records that matched the search; a changed or deleted record is updated or
+        removed if the view shows it.
+
+        Args:
+            event (RecordEvent): The change, carrying the record's lazy proxy unless it was deleted.
+        """
+        if event.entity not in self._PROXY_CLASSES:
+            return
+        if self.view_job is not None:
+            self.view_backlog.append(event)
+            return
+        if self.model is None:
+            return
+
+        if isinstance(event, RecordUpdated) and event.old_id != event.record_id:
+            self.model.remove_record(event.old_key)
+        if isinstance(event, RecordDeleted):
+            self.model.remove_record(event.key)
+        elif event.record is not None:
+            row = self._view_row(event.entity, event.record)
+            if isinstance(event, RecordInserted) and not self.view_filtered:
+                self.model.add_record(row)
+            else:
+                # Search results only show the record if they already list it
+                self.model.update_record(row)
+
     def update_treeview(self):
         """
         Updates the data in the tree view for displaying records of students, instructors, and courses.
         
-        This method fetches data from the SQLite database, formats it into a list, and sets it as the 
-        data source for the table view in the 'View Records' tab.
-        """
-        headers = ["ID", "Name", "Type/Instructor"]
-        records = []
-
-        # Connect to the database
-        conn = sqlite3.connect('school.db')
-        cursor = conn.cursor()
-
-        # Fetch students from the database
-        cursor.execute("SELECT student_id, name FROM student")
-        students = cursor.fetchall()
-        for student in students:
-            records.append([student[0], student[1], "Student"])
-
-        # Fetch instructors from the database
-        cursor.execute("SELECT instructor_id, name FROM instructor")
-        instructors = cursor.fetchall()
-        for instructor in instructors:
-            records.append([instructor[0], instructor[1], "Instructor"])
-
-        # Fetch courses from the database
-        cursor.execute('''
-            SELECT course.course_id, course.course_name, instructor.name
-            FROM course
-            LEFT JOIN instructor ON course.instructor_id = instructor.instructor_id
-        ''')
-        courses = cursor.fetchall()
-        for course in courses:
-            instructor_name = course[2] if course[2] is not None else "N/A"
-            records.append([course[0], course[1], instructor_name])
-
-        # Close the database connection
-        conn.close()
-
-        # Update the tree view
-        self.model = RecordTableModel(records, headers)
-        self.tree_view.setModel(self.model)
+        This method streams the records from the SQLite database into the table view in the
+        'View Records' tab. Only the first page of rows is read up front, on a worker thread; more
+        rows are fetched as the user scrolls, so the view opens in the same time however large the
+        tables are.
+
+        Once every row has been fetched, the rows are kept in `self.query_cache` as long as they
+        fit, so refreshing the view again reads them from memory until a student, instructor or
+        course is changed.
+        """
+        self.show_query(self._VIEW_SQL, tables=self._VIEW_TABLES)
+
+    def show_record_details(self, index):
+        """
+        Shows the details of the record in the double-clicked row.
+
+        Age, email and relationships are loaded from the database on a worker thread; the details
+        are shown when they are loaded.
+
+        Args:
+            index (QModelIndex): The index of the double-clicked cell.
+        """
+        try:
+            record_id, name, _, kind = self.model.record(index.row())
+            proxy = self._PROXY_CLASSES[kind](record_id, name)
+            self.jobs.submit(
+                self._record_details, proxy, on_finished=self.show_info_message,
+                on_error=lambda e: self.show_error_message("Error loading record details", str(e)))
+        except Exception as e:
+            self.show_error_message("Error loading record details", str(e))
+
+    @staticmethod
+    def _record_details(job, proxy):
+        """
+        Describes a record, loading its details and relationships from the database.
+
+        Args:
+            job (Job): The job loading the details.
+            proxy (LazyRecord): The lazy proxy of the record.
+
+        Returns:
+            str: The text describing the record.
+        """
+        if isinstance(proxy, LazyCourse):
+            instructor_name = proxy.instructor.name if proxy.instructor is not None else "N/A"
+            students = ", ".join(student.name for student in proxy.enrolled_students) or "None"
+            return f"Course: {proxy.name} ({proxy.course_id})\nInstructor: {instructor_name}\nStudents: {students}"
+        if isinstance(proxy, LazyStudent):
+            kind, courses = "Student", proxy.registered_courses
+        else:
+            kind, courses = "Instructor", proxy.assigned_courses
+        course_names = ", ".join(course.name for course in courses) or "None"
+        return (f"{kind}: {proxy.name} ({proxy.record_id})\nAge: {proxy.age}\n"
+                f"Email: {proxy._email}\nCourses: {course_names}")
 
     def refresh_dropdowns(self):
         """
     Refreshes the dropdown menus for instructors, students, and courses.
 
-    This method clears the current items in the instructor, student, and course-related
-    dropdown menus (combo boxes), then fetches the latest data from the SQLite database to
-    repopulate them. This ensures that the dropdowns are always up to date with the most
-    recent entries in the 'instructor', 'student', and 'course' tables.
+    This method loads lazy proxies of the records in the 'instructor', 'student', and 'course'
+    tables, which hold only their IDs and names, on a worker thread, and indexes them by the
+    prefixes of their names and IDs. When they are loaded, the dropdown menus (combo boxes)
+    switch to the new indexes and show the first matches of the text typed into them.
+    The records are read through `self.query_cache`, so refreshing again reads them from memory
+    until a record of one of those tables is changed.
 
     The method performs the following operations:
-        - Clears the existing items in the combo boxes.
-        - Fetches instructor records and adds them to the appropriate instructor combo boxes.
-        - Fetches student records and adds them to the student combo box.
-        - Fetches course records and adds them to the course-related combo boxes.
+        - Builds one prefix index each for the instructors, students, and courses.
+        - Points the instructor combo boxes at the instructor index.
+        - Points the student combo box at the student index.
+        - Points the course-related combo boxes at the course index.
 
     The combo boxes updated by this method are:
         - self.course_instructor_combo: Dropdown for selecting an instructor when adding a course.
@@ -428,60 +648,146 @@ class MainWindow(QMainWindow):
         - self.instructor_combo: Dropdown for selecting an instructor when assigning them to a course.
         - self.course_combo_assign: Dropdown for selecting a course when assigning an instructor.
 
-    Database:
-        - Connects to the SQLite database 'school.db' to fetch the latest data from the 
-          'instructor', 'student', and 'course' tables.
-
     Returns:
         None
     """
-    # Clear existing items
-        self.course_instructor_combo.clear()
-        self.student_combo.clear()
-        self.course_combo.clear()
-        self.instructor_combo.clear()
-        self.course_combo_assign.clear()
-
-        # Connect to the database
-        conn = sqlite3.connect('school.db')
-        cursor = conn.cursor()
-
-        # Fetch instructors and populate the instructor-related dropdowns
-        cursor.execute("SELECT instructor_id, name FROM instructor")
-        instructors = cursor.fetchall()
-        for instructor in instructors:
-            instructor_id, name = instructor
-            # Add instructor name and ID to the combo boxes
-            self.course_instructor_combo.addItem(name, instructor_id)
-            self.instructor_combo.addItem(name, instructor_id)
-
-        # Fetch students and populate the student dropdown
-        cursor.execute("SELECT student_id, name FROM student")
-        students = cursor.fetchall()
-        for student in students:
-            student_id, name = student
-            # Add student name and ID to the combo box
-            self.student_combo.addItem(name, student_id)
-
-        # Fetch courses and populate the course-related dropdowns
-        cursor.execute("SELECT course_id, course_name FROM course")
-        courses = cursor.fetchall()
-        for course in courses:
-            course_id, course_name = course
-            # Add course name and ID to the combo boxes
-            self.course_combo.addItem(course_name, course_id)
-            self.course_combo_assign.addItem(course_name, course_id)
-
-        # Close the database connection
-        conn.close()
+        if self.dropdown_job is not None:
+            self.dropdown_job.cancel()
+
+        # Records loaded by a job that is no longer the latest one are dropped
+        def loaded(records):
+            if job is self.dropdown_job:
+                self.fill_dropdowns(records)
+
+        def failed(e):
+            if job is self.dropdown_job:
+                self.end_dropdown_job()
+            self.show_error_message("Error loading records", str(e))
+
+        def cancelled():
+            if job is self.dropdown_job:
+                self.end_dropdown_job()
+
+        job = self.dropdown_job = self.jobs.submit(
+            self._load_records, self.query_cache, on_finished=loaded, on_error=failed,
+            on_cancelled=cancelled)
+
+    def fill_dropdowns(self, records):
+        """
+        Fills the dropdown menus with loaded records.
+
+        Only the first matches of each dropdown's text are added to it, however many records
+        there are.
+
+        Args:
+            records (tuple): The student, instructor and course proxies to show, each by ID,
+                then their prefix indexes.
+        """
+        self.students, self.instructors, self.courses = records[:3]
+        student_index, instructor_index, course_index = records[3:]
+        self.dropdowns = {
+            "student": (self.students, student_index, [self.student_picker]),
+            "instructor": (self.instructors, instructor_index,
+                           [self.course_instructor_picker, self.instructor_picker]),
+            "course": (self.courses, course_index, [self.course_picker, self.course_assign_picker]),
+        }
+
+        # The instructor index is shared by both instructor combo boxes
+        self.course_instructor_picker.set_index(instructor_index)
+        self.instructor_picker.set_index(instructor_index)
+
+        self.student_picker.set_index(student_index)
+
+        # The course index is shared by both course combo boxes
+        self.course_picker.set_index(course_index)
+        self.course_assign_picker.set_index(course_index)
+        self.end_dropdown_job()
+
+    def end_dropdown_job(self):
+        """
+        Forgets the job loading the dropdown records and applies the changes held back meanwhile.
+
+        The changes are dropped if no records were ever loaded into the dropdowns.
+        """
+        self.dropdown_job = None
+        backlog, self.dropdown_backlog = self.dropdown_backlog, []
+        if not self.dropdowns:
+            return
+        for event in backlog:
+            self.apply_to_dropdowns(event)
+
+    def apply_to_dropdowns(self, event):
+        """
+        Applies the change to one record to the index of its dropdowns.
+
+        Only the dropdowns listing that kind of record look up their first matches again.
+
+        Args:
+            event (RecordEvent): The change, carrying the record's lazy proxy unless it was deleted.
+        """
+        if event.entity not in self._PROXY_CLASSES:
+            return
+        if self.dropdown_job is not None:
+            self.dropdown_backlog.append(event)
+            return
+
+        records, index, pickers = self.dropdowns[event.entity]
+        old = records.pop(getattr(event, "old_id", event.record_id), None)
+        if old is not None:
+            index.discard(old)
+        proxy = event.record
+        if not isinstance(event, RecordDeleted) and proxy is not None:
+            records[event.record_id] = proxy
+            index.add(proxy, proxy.name, str(event.record_id))
+        for picker in pickers:
+            picker.refresh()
+
+    def run_write(self, write, error_title):
+        """
+    Runs a database write on the write thread, then records the change and publishes it.
+
+    The lazy proxies of the changed records are loaded on the write thread after the commit and
+    attached to the events, so the view and the dropdowns only apply those records.
+
+    Args:
+        write (callable): Called with the write thread's connection inside a transaction;
+            returns the `RecordEvent` of each record it changed.
+        error_title (str): The title of the message shown if the write fails.
+
+    Returns:
+        Job: The queued write.
+    """
+        def execute(job):
+            conn = get_connection()
+            with conn:
+                events = write(conn)
+            for event in events:
+                proxy_class = self._PROXY_CLASSES.get(event.entity)
+                if proxy_class is not None and not isinstance(event, RecordDeleted):
+                    event.record = proxy_class.load(event.record_id)
+            return events
+
+        def written(events):
+            for event in events:
+                if event.entity == "registration":
+                    student_id, course_id = event.record_id
+                    self.changes.mark_dirty(("students", student_id))
+                    self.changes.mark_dirty(("courses", course_id))
+                else:
+                    self.changes.mark_dirty((self._SNAPSHOT_SECTIONS[event.entity], event.record_id))
+            self.events.publish_all(events)
+
+        return self.write_jobs.submit(
+            execute, on_finished=written, on_error=lambda e: self.show_error_message(error_title, str(e)))
 
     def add_student(self):
         """
     Adds a new student to the database and updates the UI.
 
     This method retrieves the student's name, age, email, and student ID from the UI entries,
-    then inserts this information into the 'student' table in the SQLite database. After the
-    student is successfully added, it updates the tree view and refreshes the dropdown menus.
+    then inserts this information into the 'student' table in the SQLite database on the write
+    thread. After the student is successfully added, it is added to the tree view and the
+    student dropdown.
 
     Input:
         - Name, age, email, and student ID are retrieved from the corresponding UI elements.
@@ -502,19 +808,15 @@ class MainWindow(QMainWindow):
             email = self.student_email_entry.text()
             student_id = int(self.student_id_entry.text())
 
-            # Insert the student into the database
-            conn = sqlite3.connect('school.db')
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO student (student_id, name, age, email)
-                VALUES (?, ?, ?, ?)
-            ''', (student_id, name, age, email))
-            conn.commit()
-            conn.close()
-
-            # Update UI
-            self.update_treeview()
-            self.refresh_dropdowns()
+            # Insert the student into the database, then update the UI
+            def insert(conn):
+                conn.execute('''
+                    INSERT INTO student (student_id, name, age, email)
+                    VALUES (?, ?, ?, ?)
+                ''', (student_id, name, age, email))
+                return [RecordInserted("student", student_id)]
+
+            self.run_write(insert, "Error adding student")
         except Exception as e:
             self.show_error_message("Error adding student", str(e))
 
@@ -523,8 +825,9 @@ class MainWindow(QMainWindow):
     Adds a new instructor to the database and updates the UI.
 
     This method retrieves the instructor's name, age, email, and instructor ID from the UI entries,
-    then inserts this information into the 'instructor' table in the SQLite database. After the
-    instructor is successfully added, it updates the tree view and refreshes the dropdown menus.
+    then inserts this information into the 'instructor' table in the SQLite database on the write
+    thread. After the
+    instructor is successfully added, it is added to the tree view and the instructor dropdowns.
 
     Input:
         - Name, age, email, and instructor ID are retrieved from the corresponding UI elements.
@@ -545,34 +848,34 @@ class MainWindow(QMainWindow):
             email = self.instructor_email_entry.text()
             instructor_id = int(self.instructor_id_entry.text())
 
-            # Insert the instructor into the database
-            conn = sqlite3.connect('school.db')
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO instructor (instructor_id, name, age, email)
-                VALUES (?, ?, ?, ?)
-            ''', (instructor_id, name, age, email))
-            conn.commit()
-            conn.close()
-
-            # Update UI
-            self.update_treeview()
-            self.refresh_dropdowns()
+            # Insert the instructor into the database, then update the UI
+            def insert(conn):
+                conn.execute('''
+                    INSERT INTO instructor (instructor_id, name, age, email)
+                    VALUES (?, ?, ?, ?)
+                ''', (instructor_id, name, age, email))
+                return [RecordInserted("instructor", instructor_id)]
+
+            self.run_write(insert, "Error adding instructor")
         except Exception as e:
             self.show_error_message("Error adding instructor", str(e))
 
     def add_course(self):
         """
-    Adds a new course to the internal list and updates the UI.
+    Adds a new course to the database and updates the UI.
 
     This method retrieves the course name, course ID, and selected instructor from the UI entries,
-    creates a `Course` object, and adds it to the internal list of courses. It then updates the
-    tree view and refreshes the dropdown menus.
+    checks them as a `Course` would, then inserts the course into the 'course' table in the SQLite
+    database on the write thread. After the course is successfully added, it is added to the tree
+    view and the course dropdowns.
 
     Input:
         - Course name and course ID are retrieved from the UI entries.
         - Instructor is retrieved from the course instructor dropdown (combo box).
 
+    Database:
+        - Inserts a new course record into the 'course' table.
+
     Exceptions:
         - Shows an error message if any exceptions occur during the process, such as 
           invalid inputs.
@@ -583,12 +886,19 @@ class MainWindow(QMainWindow):
         try:
             course_name = self.course_name_entry.text()
             course_id = int(self.course_id_entry.text())
-            instructor = self.course_instructor_combo.currentData()
-            
-            course = Course(course_id, course_name, instructor)
-            self.courses.append(course)
-            self.update_treeview()
-            self.refresh_dropdowns()
+            instructor_id = self.course_instructor_combo.currentData()
+
+            # Insert the course into the database, then update the UI
+            def insert(conn):
+                # Reject the course name and ID the model would reject
+                Course(course_id, course_name)
+                conn.execute('''
+                    INSERT INTO course (course_id, course_name, instructor_id)
+                    VALUES (?, ?, ?)
+                ''', (course_id, course_name, instructor_id))
+                return [RecordInserted("course", course_id)]
+
+            self.run_write(insert, "Error adding course")
         except Exception as e:
             self.show_error_message("Error adding course", str(e))
 
@@ -597,8 +907,8 @@ class MainWindow(QMainWindow):
     Registers a student for a course by inserting a record into the registration table.
 
     This method retrieves the selected student and course IDs from the dropdown menus,
-    then inserts the student and course pairing into the 'registration' table in the SQLite database.
-    It then updates the tree view.
+    then inserts the student and course pairing into the 'registration' table in the SQLite database
+    on the write thread.
 
     Input:
         - Student ID and course ID are retrieved from the dropdown menus (combo boxes).
@@ -619,18 +929,15 @@ class MainWindow(QMainWindow):
             course_id = self.course_combo.currentData()  # Assume this returns the course ID
 
             if course_id and student_id:
-                # Insert into the registration table
-                conn = sqlite3.connect('school.db')
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO registration (student_id, course_id)
-                    VALUES (?, ?)
-                ''', (student_id, course_id))
-                conn.commit()
-                conn.close()
-
-                # Update UI
-                self.update_treeview()
+                # Insert into the registration table, then update the UI
+                def insert(conn):
+                    conn.execute('''
+                        INSERT INTO registration (student_id, course_id)
+                        VALUES (?, ?)
+                    ''', (student_id, course_id))
+                    return [RecordInserted("registration", (student_id, course_id))]
+
+                self.run_write(insert, "Error registering student")
         except Exception as e:
             self.show_error_message("Error registering student", str(e))
 
@@ -639,8 +946,8 @@ class MainWindow(QMainWindow):
     Assigns an instructor to a course by updating the course record in the database.
 
     This method retrieves the selected course and instructor IDs from the dropdown menus,
-    then updates the instructor assignment in the 'course' table of the SQLite database.
-    After the instructor is assigned, it updates the tree view.
+    then updates the instructor assignment in the 'course' table of the SQLite database on the
+    write thread. After the instructor is assigned, the course's row in the tree view is updated.
 
     Input:
         - Course ID and instructor ID are retrieved from the dropdown menus (combo boxes).
@@ -660,29 +967,43 @@ class MainWindow(QMainWindow):
             course_id = self.course_combo_assign.currentData()  # Assume this returns the course ID
 
             if course_id and instructor_id:
-                # Update the course in the database
-                conn = sqlite3.connect('school.db')
-                cursor = conn.cursor()
-                cursor.execute('''
-                    UPDATE course
-                    SET instructor_id = ?
-                    WHERE course_id = ?
-                ''', (instructor_id, course_id))
-                conn.commit()
-                conn.close()
-
-                # Update UI
-                self.update_treeview()
+                # Update the course in the database, then update the UI
+                def update(conn):
+                    previous = conn.execute(
+                        "SELECT instructor_id FROM course WHERE course_id = ?", (course_id,)).fetchone()
+                    conn.execute('''
+                        UPDATE course
+                        SET instructor_id = ?
+                        WHERE course_id = ?
+                    ''', (instructor_id, course_id))
+                    changed = [RecordUpdated("course", course_id), RecordUpdated("instructor", instructor_id)]
+                    if previous is not None and previous[0] is not None:
+                        # The previous instructor loses the course
+                        changed.append(RecordUpdated("instructor", previous[0]))
+                    return changed
+
+                self.run_write(update, "Error assigning instructor")
         except Exception as e:
             self.show_error_message("Error assigning instructor", str(e))
 
+    def schedule_search(self, *args):
+        """
+    Runs `search_records` once the search fields have not changed for `DEBOUNCE_MS` milliseconds.
+
+    Each change restarts the timer, so a search runs when typing pauses rather than on every keystroke.
+    """
+        self.search_timer.start()
+
     def search_records(self):
         """
     Searches for students, instructors, or courses in the database based on the input.
 
     This method retrieves search parameters from the UI, such as a name or ID, and the type
     of record (student, instructor, or course). It then queries the database for matching
-    records and displays the results in the tree view.
+    records on a worker thread and displays the results in the tree view.
+
+    Searches run as the user types (see `schedule_search`). Starting a search interrupts the query of
+    the previous one through `self.live_search`, so only the results of the latest search are shown.
 
     Input:
         - Search parameters (name and ID) are retrieved from the UI entries.
@@ -690,6 +1011,8 @@ class MainWindow(QMainWindow):
 
     Database:
         - Queries the relevant tables (student, instructor, course) and fetches records that match the criteria.
+          Names, and the emails of students, are matched through the trigram index of migration 3
+          (see `text_search.contains_filter`).
 
     Output:
         - Displays the search results in the tree view with columns "ID", "Name", and "Type/Instructor".
@@ -701,47 +1024,43 @@ class MainWindow(QMainWindow):
     Returns:
         None
     """
+        self.search_timer.stop()
         try:
             search_name = self.search_name_entry.text()
             search_id = self.search_id_entry.text()
             search_type = self.search_option_group.checkedId()
-            
-            found_records = []
-            conn = sqlite3.connect('school.db')
-            cursor = conn.cursor()
 
+            # Start a new search, interrupting the previous one
+            token = self.live_search.begin()
+
+            # Names (and student emails) are matched through the trigram index
             if search_type == 1:  # Student
-                query = "SELECT student_id, name FROM student WHERE name LIKE ? OR student_id = ?"
-                cursor.execute(query, ('%' + search_name + '%', search_id))
-                students = cursor.fetchall()
-                for student in students:
-                    found_records.append([student[0], student[1], "Student"])
-            
+                condition, params = contains_filter("student", search_name)
+                query = f"SELECT student_id, name, 'Student', 'student' FROM student WHERE {condition} OR student_id = ?"
+
             elif search_type == 2:  # Instructor
-                query = "SELECT instructor_id, name FROM instructor WHERE name LIKE ? OR instructor_id = ?"
-                cursor.execute(query, ('%' + search_name + '%', search_id))
-                instructors = cursor.fetchall()
-                for instructor in instructors:
-                    found_records.append([instructor[0], instructor[1], "Instructor"])
+                condition, params = contains_filter("instructor", search_name)
+                query = f"SELECT instructor_id, name, 'Instructor', 'instructor' FROM instructor WHERE {condition} OR instructor_id = ?"
 
             elif search_type == 3:  # Course
-                query = '''
-                    SELECT course.course_id, course.course_name, instructor.name
+                condition, params = contains_filter("course", search_name)
+                query = f'''
+                    SELECT course.course_id, course.course_name, COALESCE(instructor.name, 'N/A'), 'course'
                     FROM course
                     LEFT JOIN instructor ON course.instructor_id = instructor.instructor_id
-                    WHERE course.course_name LIKE ? OR course.course_id = ?
+                    WHERE {condition} OR course.course_id = ?
                 '''
-                cursor.execute(query, ('%' + search_name + '%', search_id))
-                courses = cursor.fetchall()
-                for course in courses:
-                    instructor_name = course[2] if course[2] else "N/A"
-                    found_records.append([course[0], course[1], instructor_name])
 
-            conn.close()
-            
-            # Update the tree view with search results
-            self.model = RecordTableModel(found_records, ["ID", "Name", "Type/Instructor"])
-            self.tree_view.setModel(self.model)
+            else:
+                # No record type selected; nothing is found
+                self.show_records([], filtered=True)
+                return
+
+            params += (search_id,)
+
+            # None is returned if a newer search made this one stale
+            self.run_view_job(lambda job: self.live_search.run(token, query, params),
+                              error_title="Error searching records", filtered=True)
         except Exception as e:
             self.show_error_message("Error searching records", str(e))
 
@@ -751,9 +1070,14 @@ class MainWindow(QMainWindow):
     to a JSON file.
 
     This method fetches all data from the 'instructor', 'course', 'student', and 'registration' tables
-    in the SQLite database. It organizes the data into dictionaries for instructors, courses, and students.
-    The relationships between students and courses, as well as instructors and courses, are also maintained
-    in the output JSON file. Each entity is then saved to 'school_data.json'.
+    in the SQLite database. The relationships between students and courses, as well as instructors and
+    courses, are grouped by ID up front; the entity rows are then streamed to 'school_data.json' one
+    record at a time with `data_manager.save_records`, which also picks the binary format for '.snap' files.
+
+    Once a full snapshot has been written, later saves only append the records changed since then to
+    the snapshot's journal, until `data_manager.can_journal` asks for a full snapshot again, e.g. because
+    the journal grew too large or the file was replaced.
+    The save runs on the write thread, so the window stays responsive while large tables are written.
 
     Database:
         - Fetches data from the 'instructor', 'course', 'student', and 'registration' tables.
@@ -769,92 +1093,128 @@ class MainWindow(QMainWindow):
         None
     """
         try:
-            filename = "school_data.json"  # Set the filename to save
+            filename = "school_data.json"  # Set the filename to save; '.snap' writes a binary snapshot
             
-            # Fetch data from the database
-            conn = sqlite3.connect('school.db')
-            cursor = conn.cursor()
-
-            # Fetch instructors
-            cursor.execute("SELECT instructor_id, name, age, email FROM instructor")
-            instructors = cursor.fetchall()
-            instructor_list = []
-            for inst in instructors:
-                instructor_list.append({
-                    "instructor_id": inst[0],
-                    "name": inst[1],
-                    "age": inst[2],
-                    "_email": inst[3],  # Note: using '_email' to match the format in the JSON file
-                    "assigned_courses": []  # Will populate this next
-                })
-
-            # Fetch courses and assign instructors to courses
-            cursor.execute("SELECT course_id, course_name, instructor_id FROM course")
-            courses = cursor.fetchall()
-            course_list = []
-            for course in courses:
-                course_id, course_name, instructor_id = course
-                course_list.append({
+            # The changes being saved; records changed while the save runs stay marked
+            saved = self.changes.dirty
+            journal = can_journal(filename, self.changes)
+
+            def save(job):
+                # Fetch data from the database on the write thread
+                conn = get_connection()
+
+                if journal:
+                    # Journal only the records changed since the last save
+                    upserts, deletions = self._changed_records(conn, saved)
+                    append_journal(filename, upserts, deletions)
+                    return False
+
+                # Group the relationships by ID once instead of scanning every list per row
+                assigned_courses = defaultdict(list)
+                for course_id, instructor_id in conn.execute("SELECT course_id, instructor_id FROM course"):
+                    assigned_courses[instructor_id].append(course_id)
+
+                registered_courses = defaultdict(list)
+                enrolled_students = defaultdict(list)
+                for student_id, course_id in conn.execute("SELECT student_id, course_id FROM registration"):
+                    registered_courses[student_id].append(course_id)
+                    enrolled_students[course_id].append(student_id)
+
+                # Stream the rows to the file as they are read
+                instructor_records = ({
+                    "instructor_id": instructor_id,
+                    "name": name,
+                    "age": age,
+                    "_email": email,  # Note: using '_email' to match the format in the JSON file
+                    "assigned_courses": assigned_courses[instructor_id]
+                } for instructor_id, name, age, email in conn.execute(
+                    "SELECT instructor_id, name, age, email FROM instructor"))
+
+                course_records = ({
                     "course_id": course_id,
                     "course_name": course_name,
                     "instructor_id": instructor_id,
-                    "enrolled_students": []
-                })
-
-                # Assign the course to the instructor's 'assigned_courses'
-                for instructor in instructor_list:
-                    if instructor["instructor_id"] == instructor_id:
-                        instructor["assigned_courses"].append(course_id)
-
-            # Fetch students and their registered courses
-            cursor.execute("SELECT student_id, name, age, email FROM student")
-            students = cursor.fetchall()
-            student_list = []
-            for stud in students:
-                student_list.append({
-                    "student_id": stud[0],
-                    "name": stud[1],
-                    "age": stud[2],
-                    "_email": stud[3],  # Note: using '_email' to match the format in the JSON file
-                    "registered_courses": []
-                })
-
-            # Fetch student-course registrations
-            cursor.execute("SELECT student_id, course_id FROM registration")
-            registrations = cursor.fetchall()
-            for registration in registrations:
-                student_id, course_id = registration
-                # Add course to the student's 'registered_courses'
-                for student in student_list:
-                    if student["student_id"] == student_id:
-                        student["registered_courses"].append(course_id)
-                # Add student to the course's 'enrolled_students'
-                for course in course_list:
-                    if course["course_id"] == course_id:
-                        course["enrolled_students"].append(student_id)
-
-            conn.close()
-
-            # Save to JSON
-            data = {
-                "instructors": instructor_list,
-                "courses": course_list,
-                "students": student_list
-            }
-            with open(filename, 'w') as json_file:
-                json.dump(data, json_file, indent=4)
-
-            self.show_info_message("Data saved successfully.")
+                    "enrolled_students": enrolled_students[course_id]
+                } for course_id, course_name, instructor_id in conn.execute(
+                    "SELECT course_id, course_name, instructor_id FROM course"))
+
+                student_records = ({
+                    "student_id": student_id,
+                    "name": name,
+                    "age": age,
+                    "_email": email,  # Note: using '_email' to match the format in the JSON file
+                    "registered_courses": registered_courses[student_id]
+                } for student_id, name, age, email in conn.execute(
+                    "SELECT student_id, name, age, email FROM student"))
+
+                save_records(filename, instructor_records, course_records, student_records)
+                discard_journal(filename)
+                return True
+
+            def saved_to_file(full):
+                self.changes.discard(saved)
+                if full:
+                    record_snapshot(filename, self.changes)
+                self.show_info_message("Data saved successfully.")
+
+            self.write_jobs.submit(
+                save, on_finished=saved_to_file,
+                on_error=lambda e: self.show_error_message("Error saving data", str(e)))
         except Exception as e:
             self.show_error_message("Error saving data", str(e))
 
+    @staticmethod
+    def _changed_records(conn, keys):
+        """
+    Reads the current records of the changed records from the database.
+
+    Args:
+        conn (sqlite3.Connection): The connection to read from.
+        keys (list): The ``(section, id)`` keys of the changed records, from `self.changes`.
+
+    Returns:
+        tuple: ``(upserts, deletions)`` for `data_manager.append_journal`. Records that are no longer
+        in the database are reported as deletions.
+    """
+        queries = {
+            "instructors": (
+                "SELECT name, age, email FROM instructor WHERE instructor_id = ?",
+                "SELECT course_id FROM course WHERE instructor_id = ?",
+                "instructor_id", "assigned_courses"),
+            "courses": (
+                "SELECT course_name, instructor_id FROM course WHERE course_id = ?",
+                "SELECT student_id FROM registration WHERE course_id = ?",
+                "course_id", "enrolled_students"),
+            "students": (
+                "SELECT name, age, email FROM student WHERE student_id = ?",
+                "SELECT course_id FROM registration WHERE student_id = ?",
+                "student_id", "registered_courses"),
+        }
+        upserts, deletions = [], []
+        for section, record_id in keys:
+            row_sql, related_sql, id_key, related_key = queries[section]
+            row = conn.execute(row_sql, (record_id,)).fetchone()
+            if row is None:
+                deletions.append((section, record_id))
+                continue
+            if section == "courses":
+                record = {"course_id": record_id, "course_name": row[0], "instructor_id": row[1]}
+            else:
+                record = {id_key: record_id, "name": row[0], "age": row[1], "_email": row[2]}
+            record[related_key] = [related_id for related_id, in conn.execute(related_sql, (record_id,))]
+            upserts.append((section, record))
+        return upserts, deletions
+
     def load_data_from_file(self):
         """
     Loads data from a JSON file into the SQLite database and updates the UI.
 
     This method reads the 'school_data.json' file, which contains instructors, courses, students, 
-    and their relationships (such as registrations and course assignments). It inserts this data 
-    into the 'instructor', 'course', 'student', and 'registration' tables in the SQLite database. 
+    and their relationships (such as registrations and course assignments). The file is parsed
+    incrementally and inserted batch by batch into the 'instructor', 'course', 'student', and
+    'registration' tables in the SQLite database on the write thread while a progress dialog shows
+    how far along it is; cancelling the dialog rolls the load back.
+    Each batch is checked with `validation.validate_records` first and invalid records are skipped.
     The UI elements such as the tree view and dropdowns are also updated with the loaded data.
 
     Input:
@@ -875,57 +1235,102 @@ class MainWindow(QMainWindow):
     """
         try:
             filename = "school_data.json"  # Set the filename to load
-            instructor_dict, student_dict, course_dict = load_data(filename)
-
-            # Convert the dictionaries to lists
-            instructors = list(instructor_dict.values())
-            students = list(student_dict.values())
-            courses = list(course_dict.values())
-
-            # Insert data into the database
-            conn = sqlite3.connect('school.db')
-            cursor = conn.cursor()
-
-            # Insert instructors
-            for instructor in instructors:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO instructor (instructor_id, name, age, email)
-                    VALUES (?, ?, ?, ?)
-                ''', (instructor['instructor_id'], instructor['name'], instructor['age'], instructor['_email']))
 
-            # Insert courses
-            for course in courses:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO course (course_id, course_name, instructor_id)
-                    VALUES (?, ?, ?)
-                ''', (course['course_id'], course['course_name'], course['instructor_id']))
-
-            # Insert students
-            for student in students:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO student (student_id, name, age, email)
-                    VALUES (?, ?, ?, ?)
-                ''', (student['student_id'], student['name'], student['age'], student['_email']))
-
-            # Insert registrations (many-to-many relationships)
-            for student in students:
-                for course_id in student['registered_courses']:
-                    cursor.execute('''
-                        INSERT OR IGNORE INTO registration (student_id, course_id)
-                        VALUES (?, ?)
-                    ''', (student['student_id'], course_id))
-
-            conn.commit()
-            conn.close()
+            # Show how far through the file the streaming loader is
+            progress_dialog = QProgressDialog("Loading data...", "Cancel", 0, 100, self)
+            progress_dialog.setWindowModality(Qt.WindowModal)
+            progress_dialog.setMinimumDuration(500)
 
-            # Update the UI
-            self.update_treeview()  # Update the tree view to reflect the loaded data
-            self.refresh_dropdowns()  # Refresh the dropdowns to show the loaded data
+            def report_progress(bytes_read, total_bytes):
+                progress_dialog.setValue(int(bytes_read * 100 / total_bytes) if total_bytes else 100)
 
-            self.show_info_message("Data loaded successfully.")
+            def load(job):
+                # Insert data into the database batch by batch while the file is parsed;
+                # cancelling rolls back everything inserted so far
+                conn = get_connection()
+                cursor = conn.cursor()
+                skipped = 0
+                with conn:
+                    for section, records in iter_record_batches(filename, progress=job.report_progress):
+                        job.check_cancelled()
+
+                        # Skip records the model classes would reject
+                        valid = [r for r, errors in zip(records, validate_records(section, records)) if not errors]
+                        skipped += len(records) - len(valid)
+                        records = valid
+
+                        if section == "instructors":
+                            cursor.executemany('''
+                                INSERT OR IGNORE INTO instructor (instructor_id, name, age, email)
+                                VALUES (?, ?, ?, ?)
+                            ''', [(r['instructor_id'], r['name'], r['age'], r['_email']) for r in records])
+
+                        elif section == "courses":
+                            cursor.executemany('''
+                                INSERT OR IGNORE INTO course (course_id, course_name, instructor_id)
+                                VALUES (?, ?, ?)
+                            ''', [(r['course_id'], r['course_name'], r['instructor_id']) for r in records])
+
+                        elif section == "students":
+                            cursor.executemany('''
+                                INSERT OR IGNORE INTO student (student_id, name, age, email)
+                                VALUES (?, ?, ?, ?)
+                            ''', [(r['student_id'], r['name'], r['age'], r['_email']) for r in records])
+
+                            # Insert registrations (many-to-many relationships)
+                            cursor.executemany('''
+                                INSERT OR IGNORE INTO registration (student_id, course_id)
+                                VALUES (?, ?)
+                            ''', [(r['student_id'], course_id) for r in records for course_id in r['registered_courses']])
+                return skipped
+
+            def loaded(skipped):
+                progress_dialog.close()
+
+                # Rows already in the database were kept, so they may be missing from the snapshot
+                self.changes.snapshot = None
+
+                # The load publishes no events; every cached row may be out of date
+                self.query_cache.clear()
+
+                # Update the UI
+                self.update_treeview()  # Update the tree view to reflect the loaded data
+                self.refresh_dropdowns()  # Refresh the dropdowns to show the loaded data
+
+                if skipped:
+                    self.show_info_message(f"Data loaded successfully. {skipped} invalid records were skipped.")
+                else:
+                    self.show_info_message("Data loaded successfully.")
+
+            def failed(e):
+                progress_dialog.close()
+                self.show_error_message("Error loading data", str(e))
+
+            def cancelled():
+                progress_dialog.close()
+                self.show_info_message("Loading was cancelled. No data was loaded.")
+
+            job = self.write_jobs.submit(load, on_finished=loaded, on_error=failed,
+                                         on_progress=report_progress, on_cancelled=cancelled)
+            progress_dialog.canceled.connect(job.cancel)
         except Exception as e:
             self.show_error_message("Error loading data", str(e))
 
+    def closeEvent(self, event):
+        """
+    Cancels the running jobs and waits for the worker threads before the window closes.
+
+    Args:
+        event (QCloseEvent): The close event.
+    """
+        # Rows delivered after this are stale, so they are closed instead of shown
+        self.view_job = self.dropdown_job = None
+        for runner in (self.jobs, self.write_jobs):
+            runner.cancel_all()
+            runner.wait()
+        self.live_search.close()
+        super().closeEvent(event)
+
     def show_error_message(self, title, message):
         """
     Displays a critical error message in a message box.
@@ -3,13 +3,142 @@ from tkinter import ttk, messagebox
 from student import Student
 from instructor import Instructor
 from course import Course
-from data_manager import save_data, load_data
+from enrollment import withdraw
+from data_manager import save_changes, load_data
+from change_tracking import ModelChangeTracker
+from identity_map import IdentityMap
+from trigram_index import TrigramIndex
+from prefix_index import PrefixIndex
+from events import EventBus, RecordInserted, RecordUpdated, RecordDeleted
 
 # Data storage
 students = []
 instructors = []
 courses = []
 
+# The objects of this session by ID; also rejects duplicate IDs
+identity_map = IdentityMap()
+
+# What changed since the data was last loaded or saved; edits are recorded while the main loop runs
+changes = ModelChangeTracker()
+
+# Whether the treeview shows search results rather than every record
+view_filtered = False
+
+# Substring indexes of the names searched in the View Records tab
+student_index = TrigramIndex()
+instructor_index = TrigramIndex()
+course_index = TrigramIndex()
+
+# Name and ID prefix indexes of the records offered by the dropdowns
+student_picks = PrefixIndex()
+instructor_picks = PrefixIndex()
+course_picks = PrefixIndex()
+
+# Changes publish an event; the indexes, the treeview and the dropdowns apply just that change
+events = EventBus()
+
+# The "Name (ID)" text of a record in the dropdowns
+def record_label(record):
+    if isinstance(record, Student):
+        return f"{record.name} ({record.student_id})"
+    if isinstance(record, Instructor):
+        return f"{record.name} ({record.instructor_id})"
+    return f"{record.course_name} ({record.course_id})"
+
+# Add a record to the search and pick indexes of its type, or update its entries after an edit
+def index_record(record):
+    if isinstance(record, Student):
+        student_index.add(record, record.name)
+        student_picks.add(record, record.name, str(record.student_id))
+    elif isinstance(record, Instructor):
+        instructor_index.add(record, record.name)
+        instructor_picks.add(record, record.name, str(record.instructor_id))
+    elif isinstance(record, Course):
+        course_index.add(record, record.course_name)
+        course_picks.add(record, record.course_name, str(record.course_id))
+
+# Remove a deleted record from the search and pick indexes of its type
+def unindex_record(record):
+    for index in (student_index, instructor_index, course_index,
+                  student_picks, instructor_picks, course_picks):
+        index.discard(record)
+
+# Rebuild the search and pick indexes after the records were replaced
+def build_search_indexes():
+    student_index.clear()
+    student_index.update((student, student.name) for student in students)
+    instructor_index.clear()
+    instructor_index.update((instructor, instructor.name) for instructor in instructors)
+    course_index.clear()
+    course_index.update((course, course.course_name) for course in courses)
+    student_picks.clear()
+    student_picks.update((student, (student.name, str(student.student_id))) for student in students)
+    instructor_picks.clear()
+    instructor_picks.update((instructor, (instructor.name, str(instructor.instructor_id)))
+                            for instructor in instructors)
+    course_picks.clear()
+    course_picks.update((course, (course.course_name, str(course.course_id))) for course in courses)
+
+# Make a dropdown list only the first records of an index that match what has been typed,
+# looked up whenever it opens or a key is released; returns the function that refreshes it
+def bind_picker(combo, index):
+    def show_matches(event=None):
+        combo['values'] = [record_label(record) for record in index.matches(combo.get())]
+    combo.configure(postcommand=show_matches)
+    combo.bind('<KeyRelease>', show_matches, add='+')
+    return show_matches
+
+# The treeview item of a record, named after its kind and ID
+def tree_item(entity, record_id):
+    return f"{entity}:{record_id}"
+
+# The ID, name and type or instructor name of a record in the treeview
+def tree_values(record):
+    if isinstance(record, Student):
+        return (record.student_id, record.name, "Student")
+    if isinstance(record, Instructor):
+        return (record.instructor_id, record.name, "Instructor")
+    instructor_name = record.instructor.name if record.instructor else "N/A"
+    return (record.course_id, record.course_name, instructor_name)
+
+# Index a new or changed record, or forget a deleted one, then refresh only
+# the dropdowns listing that kind of record
+def apply_to_indexes(event):
+    if event.entity not in pickers:
+        return
+    if isinstance(event, RecordDeleted):
+        unindex_record(event.record)
+    else:
+        index_record(event.record)
+    for show_matches in pickers[event.entity]:
+        show_matches()
+
+# Add, update or remove the one treeview row of the changed record, whether
+# the treeview lists every record or search results; search results only
+# list the records that matched, so new records are not added to them
+def apply_to_view(event):
+    if event.entity not in pickers:
+        return
+    item = tree_item(event.entity, event.record_id)
+    if isinstance(event, RecordInserted) and not tree.exists(item):
+        if not view_filtered:
+            tree.insert('', 'end', iid=item, values=tree_values(event.record))
+    elif isinstance(event, RecordDeleted):
+        if tree.exists(item):
+            tree.delete(item)
+    else:
+        old_item = tree_item(event.entity, getattr(event, "old_id", event.record_id))
+        if not tree.exists(old_item):
+            return
+        if old_item != item:
+            # Items cannot be renamed; replace it at the same position
+            position = tree.index(old_item)
+            tree.delete(old_item)
+            tree.insert('', position, iid=item, values=tree_values(event.record))
+        else:
+            tree.item(item, values=tree_values(event.record))
+
 # Functionality to add a student
 def add_student():
     student_name = student_name_entry.get()
@@ -20,11 +149,12 @@ def add_student():
     if student_name and student_age and student_email and student_id:
         try:
             # Create a Student instance
-            student = Student(student_name, int(student_age), student_email, int(student_id))
+            with identity_map:
+                student = Student(student_name, int(student_age), student_email, int(student_id))
             students.append(student)
+            changes.mark_dirty(student)
+            events.publish(RecordInserted("student", student.student_id, student))
             messagebox.showinfo("Success", f"Student {student_name} added.")
-            update_treeview()
-            refresh_dropdowns()
         except ValueError as e:
             # Catch validation errors from the Student class
             messagebox.showerror("Error", str(e))
@@ -41,11 +171,12 @@ def add_instructor():
     if instructor_name and instructor_age and instructor_email and instructor_id:
         try:
             # Create an Instructor instance
-            instructor = Instructor(instructor_name, int(instructor_age), instructor_email, int(instructor_id))
+            with identity_map:
+                instructor = Instructor(instructor_name, int(instructor_age), instructor_email, int(instructor_id))
             instructors.append(instructor)
+            changes.mark_dirty(instructor)
+            events.publish(RecordInserted("instructor", instructor.instructor_id, instructor))
             messagebox.showinfo("Success", f"Instructor {instructor_name} added.")
-            update_treeview()
-            refresh_dropdowns()
         except ValueError as e:
             # Catch validation errors from the Instructor class
             messagebox.showerror("Error", str(e))
@@ -70,21 +201,22 @@ def add_course():
                 print("Type of Extracted ID:", type(instructor_id))
 
                 # Find the instructor instance by ID
-                instructor = next((inst for inst in instructors if inst.instructor_id == instructor_id), None)
+                instructor = identity_map.get(Instructor, instructor_id)
                 if instructor is None:
                     raise ValueError("Instructor not found")
 
             # Create a Course instance with or without an instructor
-            course = Course(course_id, course_name, instructor)
+            with identity_map:
+                course = Course(course_id, course_name, instructor)
             courses.append(course)
+            changes.mark_dirty(course)
 
             # Assign the course to the instructor if an instructor is provided
             if instructor is not None:
                 instructor.assign_course(course)
 
+            events.publish(RecordInserted("course", course.course_id, course))
             messagebox.showinfo("Success", f"Course {course_name} added.")
-            update_treeview()
-            refresh_dropdowns()
         except ValueError as e:
             messagebox.showerror("Error", str(e))
     else:
@@ -103,8 +235,8 @@ def register_student():
             course_id = int(course_text.split('(')[-1].strip(')'))
 
             # Find student and course instances
-            student = next((stud for stud in students if stud.student_id == student_id), None)
-            course = next((crs for crs in courses if crs.course_id == course_id), None)
+            student = identity_map.get(Student, student_id)
+            course = identity_map.get(Course, course_id)
 
             if student is None or course is None:
                 raise ValueError("Student or course not found")
@@ -115,9 +247,9 @@ def register_student():
             # Add student to the course using the Course method
             course.add_student(student)
 
+            # No row shows registrations, but other subscribers may care
+            events.publish(RecordInserted("registration", (student.student_id, course.course_id)))
             messagebox.showinfo("Success", f"Student {student.name} registered to course {course.course_name}.")
-            update_treeview()
-            refresh_dropdowns()
         except ValueError as e:
             messagebox.showerror("Error", str(e))
         except Exception as e:
@@ -138,8 +270,8 @@ def assign_instructor():
             course_id = int(course_text.split('(')[-1].strip(')'))
 
             # Find the instructor and course objects
-            instructor = next((inst for inst in instructors if inst.instructor_id == instructor_id), None)
-            course = next((crs for crs in courses if crs.course_id == course_id), None)
+            instructor = identity_map.get(Instructor, instructor_id)
+            course = identity_map.get(Course, course_id)
 
             if instructor is None or course is None:
                 raise ValueError("Instructor or course not found")
@@ -148,9 +280,8 @@ def assign_instructor():
             course.instructor = instructor  # Set the course's instructor to the Instructor object
             instructor.assign_course(course)  # Add the course to the instructor's assigned courses
 
+            events.publish(RecordUpdated("course", course.course_id, course))
             messagebox.showinfo("Success", f"Instructor {instructor.name} assigned to {course.course_name}.")
-            update_treeview()
-            refresh_dropdowns()
         except ValueError as e:
             messagebox.showerror("Error", str(e))
         except Exception as e:
@@ -159,36 +290,39 @@ def assign_instructor():
         messagebox.showerror("Error", "Invalid instructor or course selection.")
 
 def refresh_dropdowns():
-    # Populate student dropdown with "Name (ID)"
-    student_combo['values'] = [f"{student.name} ({student.student_id})" for student in students]
-
-    # Populate instructor dropdown with "Name (ID)"
-    instructor_combo['values'] = [f"{instructor.name} ({instructor.instructor_id})" for instructor in instructors]
-
-    # Populate course dropdowns with "Course Name (ID)"
-    course_combo['values'] = [f"{course.course_name} ({course.course_id})" for course in courses]
-    course_combo_assign['values'] = [f"{course.course_name} ({course.course_id})" for course in courses]
-
-    # Populate course instructor dropdown with "Instructor Name (ID)"
-    course_instructor_combo['values'] = [f"{instructor.name} ({instructor.instructor_id})" for instructor in instructors]
+    # The pick indexes are kept up to date as records change, so each dropdown
+    # only looks up the first "Name (ID)" matches of its text again
+    for entity_pickers in pickers.values():
+        for show_matches in entity_pickers:
+            show_matches()
 
-# Update the Treeview with all records
+# Update the Treeview with all records; single changes are applied by apply_to_view
 def update_treeview():
-    for row in tree.get_children():
-        tree.delete(row)
+    global view_filtered
+    view_filtered = False
+    tree.delete(*tree.get_children())
 
     # Add students to the treeview
     for student in students:
-        # tree.insert('', 'end', values=(student.name, student.age, student._email, student.student_id, "Student"))
-        tree.insert('', 'end', values =(student.student_id, student.name, "Student"))
+        tree.insert('', 'end', iid=tree_item("student", student.student_id), values=tree_values(student))
 
     # Add instructors to the treeview
     for instructor in instructors:
-        tree.insert('', 'end', values=(instructor.instructor_id, instructor.name, "Instructor"))
+        tree.insert('', 'end', iid=tree_item("instructor", instructor.instructor_id), values=tree_values(instructor))
 
     # Add courses to the treeview
     for course in courses:
-        tree.insert('', 'end', values=(course.course_id,  course.course_name, "Course"))
+        tree.insert('', 'end', iid=tree_item("course", course.course_id), values=tree_values(course))
+
+
+# Change the ID of a record and keep the identity map in step
+def rekey(record, id_attribute, new_id):
+    existing = identity_map.get(type(record), new_id)
+    if existing is not None and existing is not record:
+        raise ValueError(f"{type(record).__name__} ID must be unique.")
+    identity_map.evict(record)
+    setattr(record, id_attribute, new_id)
+    identity_map.add(record)
 
 
 def edit_record():
@@ -252,26 +386,32 @@ def edit_record():
 
         # Function to save the changes
         def save_changes():
+            old_id = getattr(record, record._KEY)
             try:
                 # Validate and update the common record fields
                 record.name = name_entry.get()
+                index_record(record)  # Search by the new name even if a later field is invalid
                 record.age = int(age_entry.get())
                 record._email = email_entry.get()
 
                 if isinstance(record, Student):
                     # Validate and update the student-specific fields
-                    record.student_id = int(id_entry.get())
+                    rekey(record, "student_id", int(id_entry.get()))
 
                 elif isinstance(record, Instructor):
                     # Validate and update the instructor-specific fields
-                    record.instructor_id = int(id_entry.get())
+                    rekey(record, "instructor_id", int(id_entry.get()))
 
                 elif isinstance(record, Course):
                     # Validate and update the course-specific fields
-                    record.course_id = id_entry.get()
-
-                # Make sure to update Treeview to reflect the changes
-                update_treeview()
+                    rekey(record, "course_id", int(id_entry.get()))
+
+                # Update the record's row, indexes and dropdowns to reflect the changes
+                events.publish(RecordUpdated(record._TABLE, getattr(record, record._KEY), record, old_id=old_id))
+                if isinstance(record, Instructor):
+                    # The rows of the instructor's courses show the instructor's name
+                    for course in record.assigned_courses:
+                        events.publish(RecordUpdated("course", course.course_id, course))
                 edit_window.destroy()
                 messagebox.showinfo("Success", "Record updated successfully.")
             except ValueError as e:
@@ -293,39 +433,60 @@ def delete_record():
     selected_id = tree.item(selected_item, 'values')[0]
 
     # Find and delete the record by ID
+    deleted = []
     if search_option.get() == "Student":
         global students
+        deleted = [stud for stud in students if stud.student_id == int(selected_id)]
         students = [stud for stud in students if stud.student_id != int(selected_id)]
     elif search_option.get() == "Instructor":
         global instructors
+        deleted = [inst for inst in instructors if inst.instructor_id == int(selected_id)]
         instructors = [inst for inst in instructors if inst.instructor_id != int(selected_id)]
     elif search_option.get() == "Course":
         global courses
-        courses = [crs for crs in courses if crs.course_id != selected_id]
+        deleted = [crs for crs in courses if crs.course_id == int(selected_id)]
+        courses = [crs for crs in courses if crs.course_id != int(selected_id)]
+
+    # Withdraw the enrollments of the deleted records so both sides of the index agree,
+    # record the deletions so the next save journals them, and free their IDs,
+    # then remove their rows and index entries
+    for record in deleted:
+        if isinstance(record, Student):
+            for course in list(record.registered_courses):
+                withdraw(record, course)
+        elif isinstance(record, Course):
+            for student in list(record.enrolled_students):
+                withdraw(student, record)
+        changes.mark_deleted(record)
+        identity_map.evict(record)
+        events.publish(RecordDeleted(record._TABLE, getattr(record, record._KEY), record))
 
-    # Update the Treeview
-    update_treeview()
     messagebox.showinfo("Success", "Record deleted successfully.")
 
 
 def save_data_to_file():
     try:
         filename = "school_data.json"  # Set the filename to save
-        save_data(filename, instructors, students, courses)
+        # Only the changes since the last snapshot are written, unless it is time to compact
+        save_changes(filename, instructors, students, courses, changes)
         messagebox.showinfo("Success", "Data saved successfully.")
     except Exception as e:
         messagebox.showerror("Error", f"Error saving data: {str(e)}")
 
 def load_data_from_file():
-    global students, instructors, courses
+    global students, instructors, courses, identity_map
     try:
         filename = "school_data.json"  # Set the filename to load
-        instructor_dict, student_dict, course_dict = load_data(filename)
+        # Load into a fresh identity map so the replaced objects cannot clash
+        loaded_map = IdentityMap()
+        instructor_dict, student_dict, course_dict = load_data(filename, identity_map=loaded_map, changes=changes)
+        identity_map = loaded_map
 
         # Convert the dictionaries to lists for use in the application
         instructors = list(instructor_dict.values())
         students = list(student_dict.values())
         courses = list(course_dict.values())
+        build_search_indexes()
 
         # Update the UI
         update_treeview()
@@ -335,36 +496,34 @@ def load_data_from_file():
         messagebox.showerror("Error", f"Error loading data: {str(e)}")
 
 def search_records():
+    global view_filtered
     # Get the search query values
     name_query = search_name_entry.get().strip().lower()
     id_query = search_id_entry.get().strip().lower()
     search_type = search_option.get()
 
-    # Clear the treeview
-    for item in tree.get_children():
-        tree.delete(item)
+    # Clear the treeview; it now lists search results
+    view_filtered = True
+    tree.delete(*tree.get_children())
 
+    # Names are looked up in the trigram indexes instead of checking every record
     # Search Students
     if search_type == "Student":
-        for student in students:
-            if (name_query in student.name.lower() or not name_query) and \
-               (id_query in student.student_id.lower() or not id_query):
-                tree.insert("", "end", values=(student.student_id, student.name, "Student"))
+        for student in student_index.search(name_query) if name_query else students:
+            if id_query in str(student.student_id) or not id_query:
+                tree.insert("", "end", iid=tree_item("student", student.student_id), values=tree_values(student))
     
     # Search Instructors
     elif search_type == "Instructor":
-        for instructor in instructors:
-            if (name_query in instructor.name.lower() or not name_query) and \
-               (id_query in instructor.instructor_id.lower() or not id_query):
-                tree.insert("", "end", values=(instructor.instructor_id, instructor.name, "Instructor"))
+        for instructor in instructor_index.search(name_query) if name_query else instructors:
+            if id_query in str(instructor.instructor_id) or not id_query:
+                tree.insert("", "end", iid=tree_item("instructor", instructor.instructor_id), values=tree_values(instructor))
     
     # Search Courses
     elif search_type == "Course":
-        for course in courses:
-            if (name_query in course.course_name.lower() or not name_query) and \
-               (id_query in course.course_id.lower() or not id_query):
-                instructor_name = course.instructor.name if course.instructor else "N/A"
-                tree.insert("", "end", values=(course.course_id, course.course_name, instructor_name))
+        for course in course_index.search(name_query) if name_query else courses:
+            if id_query in str(course.course_id) or not id_query:
+                tree.insert("", "end", iid=tree_item("course", course.course_id), values=tree_values(course))
     else:
         messagebox.showerror("Error", "Invalid search type selected.")
 
@@ -476,6 +635,15 @@ tk.Label(assign_frame, text="Select Course:").pack(pady=5)
 course_combo_assign = ttk.Combobox(assign_frame)
 course_combo_assign.pack(pady=5)
 
+# The dropdowns only list the first matches of what has been typed into them
+pickers = {
+    "instructor": [bind_picker(course_instructor_combo, instructor_picks),
+                   bind_picker(instructor_combo, instructor_picks)],
+    "student": [bind_picker(student_combo, student_picks)],
+    "course": [bind_picker(course_combo, course_picks),
+               bind_picker(course_combo_assign, course_picks)],
+}
+
 tk.Button(assign_frame, text="Assign", command=assign_instructor).pack(pady=10)
 
 # Search Widgets
@@ -518,8 +686,13 @@ tk.Button(view_frame, text="Edit Record", command=edit_record).pack(side=tk.LEFT
 tk.Button(view_frame, text="Delete Record", command=delete_record).pack(side=tk.LEFT, padx=10)
 
 
+# Apply each change to the indexes and dropdowns, then to the treeview
+events.subscribe(apply_to_indexes)
+events.subscribe(apply_to_view)
+
 # Initialize the application
 update_treeview()
 
 # Run the application
-root.mainloop()
+with changes:
+    root.mainloop()
@@ -1,17 +1,75 @@
 import tkinter as tk
 import sqlite3
+import queue
+import threading
 from tkinter import ttk, messagebox
 from student import Student
 from instructor import Instructor
-from course import Course
-from person import Person
-from data_manager import save_data, load_data
+from database import get_connection
+from migrations import migrate
+from live_search import LiveSearch, DEBOUNCE_MS
+from text_search import contains_filter
+from prefix_index import PrefixIndex
+from events import EventBus, RecordInserted, RecordUpdated, RecordDeleted
 
 # Data storage
-Person.create_database()
-Student.create_database()
-Instructor.create_database()
-Course.create_database()
+migrate()
+
+# Searches run on worker threads; only the results of the latest one are shown
+live_search = LiveSearch()
+search_results = queue.Queue()
+search_after_id = None
+search_polling = False
+# How often the search results are checked while a search runs, in milliseconds
+SEARCH_POLL_MS = 20
+
+# Name and ID prefix indexes of the "Name (ID)" labels offered by the dropdowns
+student_picks = PrefixIndex()
+instructor_picks = PrefixIndex()
+course_picks = PrefixIndex()
+
+# The pick index of each kind of record, the query listing its names and IDs, and its ID column
+PICKS = {
+    "student": (student_picks, "SELECT name, student_id FROM student", "student_id"),
+    "instructor": (instructor_picks, "SELECT name, instructor_id FROM instructor", "instructor_id"),
+    "course": (course_picks, "SELECT course_name, course_id FROM course", "course_id"),
+}
+# The label of each record in its pick index, by kind and ID
+pick_labels = {entity: {} for entity in PICKS}
+
+# The search results of each kind of record, before any filter, and its ID column
+SEARCH_SQL = {
+    "student": ("SELECT student_id, name, 'Student' FROM student", "student_id"),
+    "instructor": ("SELECT instructor_id, name, 'Instructor' FROM instructor", "instructor_id"),
+    "course": ("""
+        SELECT course.course_id, course.course_name, COALESCE(instructor.name, 'N/A')
+        FROM course
+        LEFT JOIN instructor ON course.instructor_id = instructor.instructor_id
+        """, "course.course_id"),
+}
+
+# The registrations listed by `update_treeview`, each row followed by its course ID
+REGISTRATION_SQL = '''
+    SELECT s.name, s.age, s.email, s.student_id, c.course_name, i.name, r.course_id
+    FROM registration r
+    JOIN student s ON r.student_id = s.student_id
+    JOIN course c ON r.course_id = c.course_id
+    JOIN instructor i ON c.instructor_id = i.instructor_id
+'''
+# The registrations whose row shows a record of each kind, for `REGISTRATION_SQL`
+# and for `registration r LEFT JOIN course c`
+REGISTRATION_FILTERS = {
+    "student": "r.student_id = ?",
+    "instructor": "c.instructor_id = ?",
+    "course": "r.course_id = ?",
+    "registration": "r.student_id = ? AND r.course_id = ?",
+}
+
+# Changes publish an event; the treeview and the dropdowns apply just that change
+events = EventBus()
+# What the treeview shows: "registrations", or the search results of a kind of record
+tree_shows = "registrations"
+searched_entity = None
 
 def add_student():
     """
@@ -35,18 +93,16 @@ def add_student():
             if not Student.validate_email(student_email):
                 raise ValueError("Invalid email format.")
             
-            conn = sqlite3.connect('school.db')
+            conn = get_connection()
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO student (name, age, email, student_id) 
-                VALUES (?, ?, ?, ?)
-            ''', (student_name, student_age, student_email, student_id))
-            conn.commit()
-            conn.close()
+            with conn:
+                cursor.execute('''
+                    INSERT INTO student (name, age, email, student_id) 
+                    VALUES (?, ?, ?, ?)
+                ''', (student_name, student_age, student_email, student_id))
             
+            events.publish(RecordInserted("student", student_id))
             messagebox.showinfo("Success", f"Student {student_name} added.")
-            update_treeview()
-            refresh_dropdowns()
         except ValueError as e:
             messagebox.showerror("Error", str(e))
         except sqlite3.IntegrityError as e:
@@ -78,18 +134,16 @@ def add_instructor():
             if not Instructor.validate_email(instructor_email):
                 raise ValueError("Invalid email format.")
             
-            conn = sqlite3.connect('school.db')
+            conn = get_connection()
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO instructor (name, age, email, instructor_id) 
-                VALUES (?, ?, ?, ?)
-            ''', (instructor_name, instructor_age, instructor_email, instructor_id))
-            conn.commit()
-            conn.close()
+            with conn:
+                cursor.execute('''
+                    INSERT INTO instructor (name, age, email, instructor_id) 
+                    VALUES (?, ?, ?, ?)
+                ''', (instructor_name, instructor_age, instructor_email, instructor_id))
             
+            events.publish(RecordInserted("instructor", instructor_id))
             messagebox.showinfo("Success", f"Instructor {instructor_name} added.")
-            update_treeview()
-            refresh_dropdowns()
         except ValueError as e:
             messagebox.showerror("Error", str(e))
         except sqlite3.IntegrityError as e:
@@ -119,27 +173,24 @@ def add_course():
             if instructor_text and instructor_text != "None":
                 instructor_id = int(instructor_text.split('(')[-1].strip(')'))
 
-                conn = sqlite3.connect('school.db')
+                conn = get_connection()
                 cursor = conn.cursor()
                 cursor.execute('SELECT * FROM instructor WHERE instructor_id = ?', (instructor_id,))
                 instructor = cursor.fetchone()
-                conn.close()
 
                 if instructor is None:
                     raise ValueError("Instructor not found")
 
-            conn = sqlite3.connect('school.db')
+            conn = get_connection()
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO course (course_id, course_name, instructor_id) 
-                VALUES (?, ?, ?)
-            ''', (course_id, course_name, instructor_id))
-            conn.commit()
-            conn.close()
+            with conn:
+                cursor.execute('''
+                    INSERT INTO course (course_id, course_name, instructor_id) 
+                    VALUES (?, ?, ?)
+                ''', (course_id, course_name, instructor_id))
             
+            events.publish(RecordInserted("course", course_id))
             messagebox.showinfo("Success", f"Course {course_name} added.")
-            update_treeview()
-            refresh_dropdowns()
         except ValueError as e:
             messagebox.showerror("Error", str(e))
         except sqlite3.IntegrityError as e:
@@ -164,27 +215,25 @@ def register_student():
             student_id = int(student_text.split('(')[-1].strip(')'))
             course_id = int(course_text.split('(')[-1].strip(')'))
 
-            conn = sqlite3.connect('school.db')
+            conn = get_connection()
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM student WHERE student_id = ?', (student_id,))
-            student = cursor.fetchone()
+            with conn:
+                cursor.execute('SELECT * FROM student WHERE student_id = ?', (student_id,))
+                student = cursor.fetchone()
 
-            cursor.execute('SELECT * FROM course WHERE course_id = ?', (course_id,))
-            course = cursor.fetchone()
+                cursor.execute('SELECT * FROM course WHERE course_id = ?', (course_id,))
+                course = cursor.fetchone()
 
-            if student is None or course is None:
-                raise ValueError("Student or course not found")
+                if student is None or course is None:
+                    raise ValueError("Student or course not found")
 
-            cursor.execute('''
-                INSERT INTO registration (student_id, course_id) 
-                VALUES (?, ?)
-            ''', (student_id, course_id))
-            conn.commit()
-            conn.close()
+                cursor.execute('''
+                    INSERT INTO registration (student_id, course_id) 
+                    VALUES (?, ?)
+                ''', (student_id, course_id))
 
+            events.publish(RecordInserted("registration", (student_id, course_id)))
             messagebox.showinfo("Success", f"Student {student_text} registered to course {course_text}.")
-            update_treeview()
-            refresh_dropdowns()
         except ValueError as e:
             messagebox.showerror("Error", str(e))
         except sqlite3.IntegrityError as e:
@@ -209,28 +258,26 @@ def assign_instructor():
             instructor_id = int(instructor_text.split('(')[-1].strip(')'))
             course_id = int(course_text.split('(')[-1].strip(')'))
 
-            conn = sqlite3.connect('school.db')
+            conn = get_connection()
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM instructor WHERE instructor_id = ?', (instructor_id,))
-            instructor = cursor.fetchone()
+            with conn:
+                cursor.execute('SELECT * FROM instructor WHERE instructor_id = ?', (instructor_id,))
+                instructor = cursor.fetchone()
 
-            cursor.execute('SELECT * FROM course WHERE course_id = ?', (course_id,))
-            course = cursor.fetchone()
+                cursor.execute('SELECT * FROM course WHERE course_id = ?', (course_id,))
+                course = cursor.fetchone()
 
-            if instructor is None or course is None:
-                raise ValueError("Instructor or course not found")
+                if instructor is None or course is None:
+                    raise ValueError("Instructor or course not found")
 
-            cursor.execute('''
-                UPDATE course 
-                SET instructor_id = ? 
-                WHERE course_id = ?
-            ''', (instructor_id, course_id))
-            conn.commit()
-            conn.close()
+                cursor.execute('''
+                    UPDATE course 
+                    SET instructor_id = ? 
+                    WHERE course_id = ?
+                ''', (instructor_id, course_id))
 
+            events.publish(RecordUpdated("course", course_id))
             messagebox.showinfo("Success", f"Instructor {instructor_text} assigned to course {course_text}.")
-            update_treeview()
-            refresh_dropdowns()
         except ValueError as e:
             messagebox.showerror("Error", str(e))
         except sqlite3.IntegrityError as e:
@@ -240,52 +287,141 @@ def assign_instructor():
     else:
         messagebox.showerror("Error", "Invalid instructor or course selection.")
 
+def bind_picker(combo, index):
+    """
+    Makes a dropdown list only the first labels of an index that match what has been typed.
+
+    The matches are looked up whenever the dropdown opens or a key is released in it, so the
+    dropdown never holds more than `prefix_index.PICKER_LIMIT` labels.
+
+    Args:
+        combo (ttk.Combobox): The dropdown.
+        index (PrefixIndex): The "Name (ID)" labels to pick from.
+
+    Returns:
+        callable: The function that refreshes the dropdown's list.
+    """
+    def show_matches(event=None):
+        combo['values'] = index.matches(combo.get())
+    combo.configure(postcommand=show_matches)
+    combo.bind('<KeyRelease>', show_matches, add='+')
+    return show_matches
+
 def refresh_dropdowns():
     """
     Refreshes the dropdown menus with the latest data from the database.
 
-    Populates student, instructor, and course dropdowns with current records from the database.
+    Rebuilds the student, instructor, and course pick indexes from the current records in the
+    database, which file each "Name (ID)" label under the name and the ID, and refreshes every
+    dropdown with the first matches of its text.
     """
-    conn = sqlite3.connect('school.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT name, student_id FROM student')
-    students = cursor.fetchall()
-    student_combo['values'] = [f"{name} ({student_id})" for name, student_id in students]
-
-    cursor.execute('SELECT name, instructor_id FROM instructor')
-    instructors = cursor.fetchall()
-    instructor_combo['values'] = [f"{name} ({instructor_id})" for name, instructor_id in instructors]
-
-    cursor.execute('SELECT course_name, course_id FROM course')
-    courses = cursor.fetchall()
-    course_combo['values'] = [f"{course_name} ({course_id})" for course_name, course_id in courses]
-    course_combo_assign['values'] = [f"{course_name} ({course_id})" for course_name, course_id in courses]
-    
-    conn.close()
+    conn = get_connection()
+    for entity, (index, query, _) in PICKS.items():
+        labels = pick_labels[entity]
+        labels.clear()
+        entries = []
+        for name, record_id in conn.execute(query):
+            label = f"{name} ({record_id})"
+            labels[record_id] = label
+            entries.append((label, (name, str(record_id))))
+        index.clear()
+        index.update(entries)
+
+    for entity_pickers in pickers.values():
+        for show_matches in entity_pickers:
+            show_matches()
+
+def apply_to_dropdowns(event):
+    """
+    Applies the change to one record to the pick index of its kind.
+
+    Only that record's label is read from the database, and only the dropdowns listing that
+    kind of record look up their first matches again.
+
+    Args:
+        event (RecordEvent): The change.
+    """
+    if event.entity not in PICKS:
+        return
+    index, query, id_column = PICKS[event.entity]
+    labels = pick_labels[event.entity]
+    old_label = labels.pop(getattr(event, "old_id", event.record_id), None)
+    if old_label is not None:
+        index.discard(old_label)
+    if not isinstance(event, RecordDeleted):
+        row = get_connection().execute(f"{query} WHERE {id_column} = ?", (event.record_id,)).fetchone()
+        if row is not None:
+            name, record_id = row
+            label = f"{name} ({record_id})"
+            labels[record_id] = label
+            index.add(label, name, str(record_id))
+    for show_matches in pickers[event.entity]:
+        show_matches()
 
 def update_treeview():
     """
     Updates the treeview with the latest records from the database.
 
     Clears the current treeview data and repopulates it with updated records for students, instructors, and courses.
+    Later changes are applied to single rows by `apply_to_view`.
     """
-    for i in tree.get_children():
-        tree.delete(i)
+    global tree_shows
+    tree_shows = "registrations"
+    tree.delete(*tree.get_children())
 
-    conn = sqlite3.connect('school.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT s.name, s.age, s.email, s.student_id, c.course_name, i.name
-        FROM registration r
-        JOIN student s ON r.student_id = s.student_id
-        JOIN course c ON r.course_id = c.course_id
-        JOIN instructor i ON c.instructor_id = i.instructor_id
-    ''')
-    records = cursor.fetchall()
-    conn.close()
-
-    for record in records:
-        tree.insert('', 'end', values=record)
+    conn = get_connection()
+    for *values, course_id in conn.execute(REGISTRATION_SQL):
+        tree.insert('', 'end', iid=f"registration:{values[3]}:{course_id}", values=values)
+
+def apply_to_view(event):
+    """
+    Applies the change to one record to the rows of the treeview.
+
+    When the treeview lists the registrations, only the rows showing the changed record are read
+    again, added or removed. When it shows search results, a record of the searched kind is
+    added, updated or removed, and other changes are ignored.
+
+    Args:
+        event (RecordEvent): The change.
+    """
+    conn = get_connection()
+    if tree_shows == "registrations":
+        condition = REGISTRATION_FILTERS[event.entity]
+        params = event.record_id if event.entity == "registration" else (event.record_id,)
+        if isinstance(event, RecordDeleted):
+            # The deleted record's registrations are left in the table but no longer listed
+            for student_id, course_id in conn.execute(
+                    "SELECT r.student_id, r.course_id FROM registration r "
+                    f"LEFT JOIN course c ON r.course_id = c.course_id WHERE {condition}", params):
+                item = f"registration:{student_id}:{course_id}"
+                if tree.exists(item):
+                    tree.delete(item)
+            return
+        for *values, course_id in conn.execute(f"{REGISTRATION_SQL} WHERE {condition}", params):
+            item = f"registration:{values[3]}:{course_id}"
+            if tree.exists(item):
+                tree.item(item, values=values)
+            else:
+                tree.insert('', 'end', iid=item, values=values)
+        return
+
+    if event.entity != tree_shows:
+        return
+    item = f"{event.entity}:{event.record_id}"
+    if isinstance(event, RecordDeleted):
+        if tree.exists(item):
+            tree.delete(item)
+        return
+    if not isinstance(event, RecordInserted) and not tree.exists(item):
+        return
+    query, id_column = SEARCH_SQL[event.entity]
+    row = conn.execute(f"{query} WHERE {id_column} = ?", (event.record_id,)).fetchone()
+    if row is None:
+        return
+    if tree.exists(item):
+        tree.item(item, values=row)
+    else:
+        tree.insert('', 'end', iid=item, values=row)
 
 def edit_record():
     """
@@ -305,7 +441,7 @@ def edit_record():
     selected_id = tree.item(selected_item, 'values')[3]  # Assuming "ID" is at index 3
     record_type = search_option.get()
 
-    conn = sqlite3.connect('school.db')
+    conn = get_connection()
     cursor = conn.cursor()
 
     # Fetch the record based on the type
@@ -317,7 +453,6 @@ def edit_record():
         cursor.execute('SELECT * FROM course WHERE course_id = ?', (selected_id,))
     else:
         messagebox.showerror("Error", "Invalid record type.")
-        conn.close()
         return
 
     record = cursor.fetchone()
@@ -379,7 +514,7 @@ def edit_record():
 
                 conn.commit()
                 edit_window.destroy()
-                update_treeview()
+                events.publish(RecordUpdated(record_type.lower(), id_value))
                 messagebox.showinfo("Success", "Record updated successfully.")
             except ValueError as e:
                 messagebox.showerror("Error", "Invalid input. Please check your entries.")
@@ -388,8 +523,6 @@ def edit_record():
     else:
         messagebox.showerror("Error", "Record not found.")
 
-    conn.close()
-
 
 def delete_record():
     """
@@ -407,7 +540,7 @@ def delete_record():
     selected_id = tree.item(selected_item, 'values')[3]  # Assuming "ID" is at index 3
     record_type = search_option.get()
 
-    conn = sqlite3.connect('school.db')
+    conn = get_connection()
     cursor = conn.cursor()
 
     try:
@@ -419,16 +552,14 @@ def delete_record():
             cursor.execute('DELETE FROM course WHERE course_id = ?', (selected_id,))
         else:
             messagebox.showerror("Error", "Invalid record type.")
-            conn.close()
             return
 
         conn.commit()
-        update_treeview()
+        events.publish(RecordDeleted(record_type.lower(), int(selected_id)))
         messagebox.showinfo("Success", "Record deleted successfully.")
     except Exception as e:
+        conn.rollback()
         messagebox.showerror("Error", f"Unexpected error: {str(e)}")
-    finally:
-        conn.close()
 
 import json
 import sqlite3
@@ -456,7 +587,7 @@ def save_data_to_file():
         }
 
         # Connect to the database
-        conn = sqlite3.connect('school.db')
+        conn = get_connection()
         cursor = conn.cursor()
 
         # Fetch students
@@ -478,7 +609,6 @@ def save_data_to_file():
         with open(filename, 'w') as f:
             json.dump(data, f, indent=4)
 
-        conn.close()
         messagebox.showinfo("Success", "Data saved to JSON successfully.")
     except Exception as e:
         messagebox.showerror("Error", f"Error saving data to JSON: {str(e)}")
@@ -508,35 +638,32 @@ def load_data_from_file():
         with open(filename, 'r') as f:
             data = json.load(f)
 
-        conn = sqlite3.connect('school.db')
+        conn = get_connection()
         cursor = conn.cursor()
-
-        # Insert students into the database if they don't already exist
-        for student in data["students"]:
-            cursor.execute('''
-                INSERT INTO student (student_id, name, age, email)
-                SELECT ?, ?, ?, ?
-                WHERE NOT EXISTS (SELECT 1 FROM student WHERE student_id = ?)
-            ''', (student["student_id"], student["name"], student["age"], student["_email"], student["student_id"]))
-
-        # Insert instructors into the database if they don't already exist
-        for instructor in data["instructors"]:
-            cursor.execute('''
-                INSERT INTO instructor (instructor_id, name, age, email)
-                SELECT ?, ?, ?, ?
-                WHERE NOT EXISTS (SELECT 1 FROM instructor WHERE instructor_id = ?)
-            ''', (instructor["instructor_id"], instructor["name"], instructor["age"], instructor["_email"], instructor["instructor_id"]))
-
-        # Insert courses into the database if they don't already exist
-        for course in data["courses"]:
-            cursor.execute('''
-                INSERT INTO course (course_id, course_name, instructor_id)
-                SELECT ?, ?, ?
-                WHERE NOT EXISTS (SELECT 1 FROM course WHERE course_id = ?)
-            ''', (course["course_id"], course["course_name"], course["instructor_id"], course["course_id"]))
-
-        conn.commit()
-        conn.close()
+        with conn:
+            # Insert students into the database if they don't already exist
+            for student in data["students"]:
+                cursor.execute('''
+                    INSERT INTO student (student_id, name, age, email)
+                    SELECT ?, ?, ?, ?
+                    WHERE NOT EXISTS (SELECT 1 FROM student WHERE student_id = ?)
+                ''', (student["student_id"], student["name"], student["age"], student["_email"], student["student_id"]))
+
+            # Insert instructors into the database if they don't already exist
+            for instructor in data["instructors"]:
+                cursor.execute('''
+                    INSERT INTO instructor (instructor_id, name, age, email)
+                    SELECT ?, ?, ?, ?
+                    WHERE NOT EXISTS (SELECT 1 FROM instructor WHERE instructor_id = ?)
+                ''', (instructor["instructor_id"], instructor["name"], instructor["age"], instructor["_email"], instructor["instructor_id"]))
+
+            # Insert courses into the database if they don't already exist
+            for course in data["courses"]:
+                cursor.execute('''
+                    INSERT INTO course (course_id, course_name, instructor_id)
+                    SELECT ?, ?, ?
+                    WHERE NOT EXISTS (SELECT 1 FROM course WHERE course_id = ?)
+                ''', (course["course_id"], course["course_name"], course["instructor_id"], course["course_id"]))
 
         # Update the UI
         update_treeview()
@@ -545,98 +672,109 @@ def load_data_from_file():
     except Exception as e:
         messagebox.showerror("Error", f"Error loading data from JSON: {str(e)}")
 
+def schedule_search(*args):
+    """
+    Runs `search_records` once the search fields have not changed for `DEBOUNCE_MS` milliseconds.
+
+    Each change restarts the timer, so a search runs when typing pauses rather than on every keystroke.
+    """
+    global search_after_id
+    if search_after_id is not None:
+        root.after_cancel(search_after_id)
+    search_after_id = root.after(DEBOUNCE_MS, search_records)
+
 def search_records():
     """
     Searches for records in the database based on the user's input.
 
-    This function retrieves the user's search queries for name and ID, 
-    clears the current contents of the treeview, and performs a search 
-    in the database based on the selected record type (Student, Instructor, 
-    or Course). It constructs the appropriate SQL query with filters for 
-    name and ID, executes the query, and populates the treeview with the 
-    results. If an error occurs during the search process, an error message 
-    is displayed.
+    This function retrieves the user's search queries for name and ID and 
+    constructs the appropriate SQL query with filters for name and ID based 
+    on the selected record type (Student, Instructor, or Course). The query 
+    runs on a worker thread; starting a new search interrupts the query of 
+    the previous one, so only the results of the latest search replace the 
+    contents of the treeview. Searches run as the user types (see 
+    `schedule_search`). If an error occurs during the search process, an 
+    error message is displayed.
 
     Returns:
         None
     """
-    name_query = search_name_entry.get().strip().lower()
+    global search_after_id, search_polling, searched_entity
+    if search_after_id is not None:
+        root.after_cancel(search_after_id)
+        search_after_id = None
+
+    name_query = search_name_entry.get().strip()
     id_query = search_id_entry.get().strip().lower()
     search_type = search_option.get()
 
-    # Clear the treeview
-    for item in tree.get_children():
-        tree.delete(item)
+    # Search Students, Instructors or Courses
+    if search_type in ("Student", "Instructor", "Course"):
+        table = search_type.lower()
+        query, id_column = SEARCH_SQL[table]
+        query += " WHERE 1=1"
+    else:
+        messagebox.showerror("Error", "Invalid search type selected.")
+        return
 
-    try:
-        conn = sqlite3.connect('school.db')
-        cursor = conn.cursor()
+    # Add filters for name and ID; names (and student emails) are matched through the trigram index
+    params = []
+    if name_query:
+        condition, condition_params = contains_filter(table, name_query)
+        query += f" AND {condition}"
+        params.extend(condition_params)
+    if id_query:
+        query += f" AND {id_column} LIKE ?"
+        params.append(f"%{id_query}%")
+
+    # Run the query on a worker thread, interrupting the previous search
+    searched_entity = table
+    token = live_search.begin()
+    threading.Thread(target=run_search, args=(token, query, params), daemon=True).start()
+    if not search_polling:
+        search_polling = True
+        root.after(SEARCH_POLL_MS, poll_search_results)
+
+def run_search(token, query, params):
+    """
+    Runs the query of a search on a worker thread and queues its result for `poll_search_results`.
 
-        # Search Students
-        if search_type == "Student":
-            query = "SELECT student_id, name FROM student WHERE 1=1"
-            params = []
-
-            # Add filters for name and ID
-            if name_query:
-                query += " AND LOWER(name) LIKE ?"
-                params.append(f"%{name_query}%")
-            if id_query:
-                query += " AND student_id LIKE ?"
-                params.append(f"%{id_query}%")
-            
-            cursor.execute(query, params)
-            students = cursor.fetchall()
-            for student in students:
-                tree.insert("", "end", values=(student[0], student[1], "Student"))
-
-        # Search Instructors
-        elif search_type == "Instructor":
-            query = "SELECT instructor_id, name FROM instructor WHERE 1=1"
-            params = []
-
-            # Add filters for name and ID
-            if name_query:
-                query += " AND LOWER(name) LIKE ?"
-                params.append(f"%{name_query}%")
-            if id_query:
-                query += " AND instructor_id LIKE ?"
-                params.append(f"%{id_query}%")
-            
-            cursor.execute(query, params)
-            instructors = cursor.fetchall()
-            for instructor in instructors:
-                tree.insert("", "end", values=(instructor[0], instructor[1], "Instructor"))
-
-        # Search Courses
-        elif search_type == "Course":
-            query = """
-            SELECT course.course_id, course.course_name, instructor.name
-            FROM course
-            LEFT JOIN instructor ON course.instructor_id = instructor.instructor_id
-            WHERE 1=1
-            """
-            params = []
-
-            # Add filters for name and ID
-            if name_query:
-                query += " AND LOWER(course.course_name) LIKE ?"
-                params.append(f"%{name_query}%")
-            if id_query:
-                query += " AND course.course_id LIKE ?"
-                params.append(f"%{id_query}%")
-            
-            cursor.execute(query, params)
-            courses = cursor.fetchall()
-            for course in courses:
-                instructor_name = course[2] if course[2] else "N/A"
-                tree.insert("", "end", values=(course[0], course[1], instructor_name))
-        else:
-            messagebox.showerror("Error", "Invalid search type selected.")
-        
-        conn.close()
+    The result is None if a newer search began, or the exception if the query failed.
+    """
+    try:
+        rows = live_search.run(token, query, params)
     except Exception as e:
-        messagebox.showerror("Error", f"Error searching records: {str(e)}")
+        rows = e
+    search_results.put((token, rows))
+
+def poll_search_results():
+    """
+    Shows the results of the latest search once its worker thread has queued them.
+
+    Results of stale searches are dropped. Polling stops once the latest search is done.
+    """
+    global search_polling, tree_shows
+    while True:
+        try:
+            token, rows = search_results.get_nowait()
+        except queue.Empty:
+            break
+        if rows is None or not live_search.is_current(token):
+            continue
+
+        search_polling = False
+        if isinstance(rows, Exception):
+            messagebox.showerror("Error", f"Error searching records: {str(rows)}")
+            return
+
+        # Replace the contents of the treeview; rows are named after their kind and ID
+        tree_shows = searched_entity
+        tree.delete(*tree.get_children())
+        for row in rows:
+            tree.insert("", "end", iid=f"{searched_entity}:{row[0]}", values=row)
+        return
+
+    root.after(SEARCH_POLL_MS, poll_search_results)
 
 # Create the main window
 root = tk.Tk()
@@ -746,6 +884,15 @@ tk.Label(assign_frame, text="Select Course:").pack(pady=5)
 course_combo_assign = ttk.Combobox(assign_frame)
 course_combo_assign.pack(pady=5)
 
+# The dropdowns only list the first matches of what has been typed into them
+pickers = {
+    "instructor": [bind_picker(course_instructor_combo, instructor_picks),
+                   bind_picker(instructor_combo, instructor_picks)],
+    "student": [bind_picker(student_combo, student_picks)],
+    "course": [bind_picker(course_combo, course_picks),
+               bind_picker(course_combo_assign, course_picks)],
+}
+
 tk.Button(assign_frame, text="Assign", command=assign_instructor).pack(pady=10)
 
 # Search Widgets
@@ -756,10 +903,12 @@ tk.Button(view_frame, text="Load Data", command=load_data_from_file).pack(pady=5
 tk.Label(view_frame, text="Search by Name:").pack(pady=5)
 search_name_entry = tk.Entry(view_frame)
 search_name_entry.pack(pady=5)
+search_name_entry.bind("<KeyRelease>", schedule_search)
 
 tk.Label(view_frame, text="Search by ID:").pack(pady=5)
 search_id_entry = tk.Entry(view_frame)
 search_id_entry.pack(pady=5)
+search_id_entry.bind("<KeyRelease>", schedule_search)
 
 # Create a frame for search options
 search_frame = tk.Frame(view_frame)
@@ -769,9 +918,9 @@ search_frame.pack(pady=5)
 search_option = tk.StringVar(value="Student")  # Default to "Student"
 
 # Add radio buttons for search options (Student, Instructor, Course)
-tk.Radiobutton(search_frame, text="Student", variable=search_option, value="Student").pack(side=tk.LEFT)
-tk.Radiobutton(search_frame, text="Instructor", variable=search_option, value="Instructor").pack(side=tk.LEFT)
-tk.Radiobutton(search_frame, text="Course", variable=search_option, value="Course").pack(side=tk.LEFT)
+tk.Radiobutton(search_frame, text="Student", variable=search_option, value="Student", command=schedule_search).pack(side=tk.LEFT)
+tk.Radiobutton(search_frame, text="Instructor", variable=search_option, value="Instructor", command=schedule_search).pack(side=tk.LEFT)
+tk.Radiobutton(search_frame, text="Course", variable=search_option, value="Course", command=schedule_search).pack(side=tk.LEFT)
 
 # Search Button
 tk.Button(view_frame, text="Search", command=search_records).pack(pady=10)
@@ -788,8 +937,13 @@ tk.Button(view_frame, text="Edit Record", command=edit_record).pack(side=tk.LEFT
 tk.Button(view_frame, text="Delete Record", command=delete_record).pack(side=tk.LEFT, padx=10)
 
 
+# Apply each change to the dropdowns and the treeview
+events.subscribe(apply_to_dropdowns)
+events.subscribe(apply_to_view)
+
 # Initialize the application
 update_treeview()
+refresh_dropdowns()
 
 # Run the application
 root.mainloop()
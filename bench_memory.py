@@ -0,0 +1,65 @@
+"""Measure the memory used per model object.
+
+Builds the same students and courses twice, once with the models and once
+with plain classes laid out like the models used to be (a per-instance
+``__dict__`` and list relationships), and prints the bytes per object
+allocated for each. Run with an optional object count::
+
+    python bench_memory.py 200000
+"""
+import sys
+import tracemalloc
+from course import Course
+from student import Student
+
+
+class _DictStudent:
+    """A student with the previous ``__dict__`` layout."""
+
+    def __init__(self, name, age, email, student_id):
+        self.name = name
+        self.age = age
+        self._email = email
+        self.student_id = student_id
+        self.registered_courses = []
+
+
+class _DictCourse:
+    """A course with the previous ``__dict__`` layout."""
+
+    def __init__(self, course_id, course_name):
+        self.course_id = course_id
+        self.course_name = course_name
+        self.instructor = None
+        self.enrolled_students = []
+
+
+def measure(factory, count):
+    """Return the bytes allocated per object by ``factory(i)`` for ``count`` objects."""
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(1, count + 1)]
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    # The list holding the objects is not part of their cost.
+    used -= sys.getsizeof(objects)
+    return used / len(objects)
+
+
+def main(count=100000):
+    # Share the field values so only the objects themselves are measured.
+    name, email = "Student Name", "student@example.com"
+    cases = [
+        ("Student", lambda i: _DictStudent(name, 20, email, i), lambda i: Student(name, 20, email, i)),
+        ("Course", lambda i: _DictCourse(i, "Math"), lambda i: Course(i, "Math")),
+    ]
+
+    print(f"{'Model':<10}{'__dict__ (B/obj)':>18}{'__slots__ (B/obj)':>19}{'Saved':>8}")
+    for label, legacy, current in cases:
+        before = measure(legacy, count)
+        after = measure(current, count)
+        print(f"{label:<10}{before:>18.1f}{after:>19.1f}{1 - after / before:>8.0%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,431 @@
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+
+# Files with this extension are written and read in the binary format.
+BINARY_EXTENSION = '.snap'
+
+MAGIC = b'SCHSNAP'
+# Version 2 appends an offset index after the end record.
+VERSION = 2
+
+# Every record is framed as a one-byte kind and a four-byte payload length.
+_FRAME = struct.Struct('<cI')
+_STRING = b'T'
+_INSTRUCTOR = b'I'
+_COURSE = b'C'
+_STUDENT = b'S'
+_END = b'E'
+
+# Fixed-size record heads; each is followed by a count of int64 IDs.
+# Names and emails are stored as indexes into the interned string table.
+_INSTRUCTOR_HEAD = struct.Struct('<qIIiI')  # instructor_id, name, email, age, course count
+_COURSE_HEAD = struct.Struct('<qIqI')  # course_id, name, instructor_id (0 = none), student count
+_STUDENT_HEAD = struct.Struct('<qIIiI')  # student_id, name, email, age, course count
+
+# The file ends with a fixed footer locating the offset index: the index
+# offset and the number of strings, instructors, courses and students. The
+# index holds the string offsets, then the sorted IDs and record offsets of
+# each entity kind in that order.
+_FOOTER = struct.Struct('<QQQQQ8s')
+_FOOTER_MAGIC = b'SNAPIDX\x00'
+_ENTITY_KINDS = (_INSTRUCTOR, _COURSE, _STUDENT)
+
+# The snapshot section holding each kind of record.
+_SECTIONS = {_INSTRUCTOR: "instructors", _COURSE: "courses", _STUDENT: "students"}
+
+
+def is_binary_snapshot(filename):
+    """Return True if the filename selects the binary snapshot format."""
+    return os.path.splitext(filename)[1].lower() == BINARY_EXTENSION
+
+
+def _as_id(value):
+    """Return an ID as an int, rejecting IDs that are not whole numbers."""
+    if value != int(value):
+        raise ValueError(f"Binary snapshots only store integer IDs, got {value!r}.")
+    return int(value)
+
+
+def _pack_ids(ids):
+    ids = [_as_id(value) for value in ids]
+    return struct.pack(f'<{len(ids)}q', *ids)
+
+
+class _SnapshotWriter:
+    """Write framed records, interning every string on first use."""
+
+    def __init__(self, file, offset):
+        self._file = file
+        self._offset = offset
+        self._strings = {}
+        self.string_offsets = array('q')
+        self.ids = {kind: array('q') for kind in _ENTITY_KINDS}
+        self.offsets = {kind: array('q') for kind in _ENTITY_KINDS}
+
+    def _intern(self, text):
+        index = self._strings.get(text)
+        if index is None:
+            index = self._strings[text] = len(self._strings)
+            self.string_offsets.append(self._offset)
+            self._write(_STRING, text.encode('utf-8'))
+        return index
+
+    def _write(self, kind, payload, record_id=None):
+        if record_id is not None:
+            self.ids[kind].append(record_id)
+            self.offsets[kind].append(self._offset)
+        self._file.write(_FRAME.pack(kind, len(payload)))
+        self._file.write(payload)
+        self._offset += _FRAME.size + len(payload)
+
+    def instructor(self, record):
+        courses = record["assigned_courses"]
+        instructor_id = _as_id(record["instructor_id"])
+        head = _INSTRUCTOR_HEAD.pack(
+            instructor_id, self._intern(record["name"]),
+            self._intern(record["_email"]), record["age"], len(courses))
+        self._write(_INSTRUCTOR, head + _pack_ids(courses), instructor_id)
+
+    def course(self, record):
+        students = record["enrolled_students"]
+        course_id = _as_id(record["course_id"])
+        instructor_id = record["instructor_id"]
+        head = _COURSE_HEAD.pack(
+            course_id, self._intern(record["course_name"]),
+            0 if instructor_id is None else _as_id(instructor_id), len(students))
+        self._write(_COURSE, head + _pack_ids(students), course_id)
+
+    def student(self, record):
+        courses = record["registered_courses"]
+        student_id = _as_id(record["student_id"])
+        head = _STUDENT_HEAD.pack(
+            student_id, self._intern(record["name"]),
+            self._intern(record["_email"]), record["age"], len(courses))
+        self._write(_STUDENT, head + _pack_ids(courses), student_id)
+
+    def end(self):
+        """Write the end record followed by the offset index and footer."""
+        self._write(_END, b'')
+        index_offset = self._offset
+        self._file.write(struct.pack(f'<{len(self.string_offsets)}q', *self.string_offsets))
+        for kind in _ENTITY_KINDS:
+            ids, offsets = self.ids[kind], self.offsets[kind]
+            order = sorted(range(len(ids)), key=ids.__getitem__)
+            self._file.write(struct.pack(f'<{len(ids)}q', *(ids[i] for i in order)))
+            self._file.write(struct.pack(f'<{len(ids)}q', *(offsets[i] for i in order)))
+        self._file.write(_FOOTER.pack(
+            index_offset, len(self.string_offsets),
+            *(len(self.ids[kind]) for kind in _ENTITY_KINDS), _FOOTER_MAGIC))
+
+
+def write_snapshot(filename, instructor_records, course_records, student_records):
+    """Stream instructor, course and student records to a binary snapshot.
+
+    The records use the same dictionaries as the JSON snapshot. Each one is
+    written as a length-prefixed record with integer IDs, and names and
+    emails are interned so a repeated string is stored once. An offset
+    index at the end of the file lets :class:`SnapshotReader` find single
+    records without reading the rest.
+
+    Args:
+        filename (str): The name of the file where the data will be saved.
+        instructor_records (iterable of dict): The instructor records.
+        course_records (iterable of dict): The course records.
+        student_records (iterable of dict): The student records.
+
+    Raises:
+        ValueError: If an ID is not a whole number.
+    """
+    with open(filename, 'wb') as file:
+        file.write(MAGIC + bytes([VERSION]))
+        writer = _SnapshotWriter(file, len(MAGIC) + 1)
+        for record in instructor_records:
+            writer.instructor(record)
+        for record in course_records:
+            writer.course(record)
+        for record in student_records:
+            writer.student(record)
+        writer.end()
+
+
+def _unpack_ids(payload, offset, count):
+    return list(struct.unpack_from(f'<{count}q', payload, offset))
+
+
+def _decode(kind, payload, strings):
+    """Decode one entity record into its ``(section, record)`` pair."""
+    if kind == _INSTRUCTOR:
+        instructor_id, name, email, age, count = _INSTRUCTOR_HEAD.unpack_from(payload)
+        return "instructors", {
+            "name": strings[name],
+            "age": age,
+            "_email": strings[email],
+            "instructor_id": instructor_id,
+            "assigned_courses": _unpack_ids(payload, _INSTRUCTOR_HEAD.size, count),
+        }
+    if kind == _COURSE:
+        course_id, name, instructor_id, count = _COURSE_HEAD.unpack_from(payload)
+        return "courses", {
+            "course_id": course_id,
+            "course_name": strings[name],
+            "instructor_id": instructor_id or None,
+            "enrolled_students": _unpack_ids(payload, _COURSE_HEAD.size, count),
+        }
+    if kind == _STUDENT:
+        student_id, name, email, age, count = _STUDENT_HEAD.unpack_from(payload)
+        return "students", {
+            "name": strings[name],
+            "age": age,
+            "_email": strings[email],
+            "student_id": student_id,
+            "registered_courses": _unpack_ids(payload, _STUDENT_HEAD.size, count),
+        }
+    raise ValueError(f"Invalid snapshot: unknown record kind {kind!r}.")
+
+
+def iter_snapshot_records(filename, progress=None):
+    """Stream the records of a binary snapshot.
+
+    Args:
+        filename (str): The name of the file to read.
+        progress (callable, optional): Called as ``progress(bytes_read, total_bytes)``
+            roughly every 64 KiB.
+
+    Yields:
+        tuple: ``(section, record)`` pairs in the same shape as the JSON reader.
+
+    Raises:
+        ValueError: If the file is not a binary snapshot or is truncated.
+    """
+    total_bytes = os.path.getsize(filename)
+    strings = []
+    with open(filename, 'rb') as file:
+        header = file.read(len(MAGIC) + 1)
+        if header[:len(MAGIC)] != MAGIC or len(header) != len(MAGIC) + 1:
+            raise ValueError(f"Invalid snapshot: {filename} is not a binary snapshot.")
+        if header[-1] > VERSION:
+            raise ValueError(f"Unsupported snapshot version {header[-1]}.")
+
+        bytes_read = len(header)
+        reported = 0
+        while True:
+            frame = file.read(_FRAME.size)
+            if len(frame) != _FRAME.size:
+                raise ValueError("Invalid snapshot: file is truncated.")
+            kind, length = _FRAME.unpack(frame)
+            if kind == _END:
+                break
+            payload = file.read(length)
+            if len(payload) != length:
+                raise ValueError("Invalid snapshot: file is truncated.")
+
+            bytes_read += _FRAME.size + length
+            if progress is not None and bytes_read - reported >= 1 << 16:
+                progress(bytes_read, total_bytes)
+                reported = bytes_read
+
+            if kind == _STRING:
+                strings.append(payload.decode('utf-8'))
+            else:
+                yield _decode(kind, payload, strings)
+
+    if progress is not None:
+        progress(total_bytes, total_bytes)
+
+
+class _Int64Column:
+    """A read-only sequence view over little-endian int64 values in a buffer."""
+
+    def __init__(self, buffer, offset, count):
+        self._buffer = buffer
+        self._offset = offset
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return struct.unpack_from('<q', self._buffer, self._offset + 8 * index)[0]
+
+
+class _StringTable:
+    """Decode interned strings on demand from their record offsets."""
+
+    def __init__(self, buffer, offsets):
+        self._buffer = buffer
+        self._offsets = offsets
+
+    def __getitem__(self, index):
+        offset = self._offsets[index]
+        _, length = _FRAME.unpack_from(self._buffer, offset)
+        start = offset + _FRAME.size
+        return self._buffer[start:start + length].decode('utf-8')
+
+
+class SnapshotReader:
+    """Random-access, read-only view of a binary snapshot.
+
+    The file is memory-mapped and only the records that are asked for are
+    decoded, using the offset index written at the end of the snapshot.
+    Version 1 snapshots have no index; one is built by skipping through the
+    record frames once, still without decoding them.
+
+    Changes journaled next to the snapshot by
+    :func:`data_manager.save_changes` are read when the snapshot is opened
+    and take precedence over the records in the file, so the reader shows
+    the same data as :func:`data_manager.load_data`. Changes journaled
+    after the snapshot was opened are not seen.
+
+    Example::
+
+        with SnapshotReader("archive.snap") as snapshot:
+            student = snapshot.get_student(12345)
+            roster = snapshot.roster(42)
+    """
+
+    def __init__(self, filename):
+        """Open and map a snapshot.
+
+        Args:
+            filename (str): The name of the ``.snap`` file to open.
+
+        Raises:
+            ValueError: If the file is not a binary snapshot.
+        """
+        self._file = open(filename, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Invalid snapshot: {filename} is empty.")
+
+        # An invalid footer, index or journal must not leak the map and the file
+        try:
+            header_size = len(MAGIC) + 1
+            if self._map[:len(MAGIC)] != MAGIC or len(self._map) < header_size:
+                raise ValueError(f"Invalid snapshot: {filename} is not a binary snapshot.")
+
+            if self._map[len(MAGIC)] >= 2:
+                self._read_index()
+            else:
+                self._scan_index(header_size)
+
+            # Imported here because data_manager imports this module
+            from data_manager import read_journal
+            self._changes = read_journal(filename) or {}
+        except BaseException:
+            self.close()
+            raise
+
+    def _read_index(self):
+        """Locate the string offsets and ID columns from the footer."""
+        if len(self._map) < _FOOTER.size:
+            raise ValueError("Invalid snapshot: the offset index is missing.")
+        *counts, magic = _FOOTER.unpack_from(self._map, len(self._map) - _FOOTER.size)
+        if magic != _FOOTER_MAGIC:
+            raise ValueError("Invalid snapshot: the offset index is missing.")
+        offset, string_count, *entity_counts = counts
+        self._strings = _StringTable(self._map, _Int64Column(self._map, offset, string_count))
+        offset += 8 * string_count
+        self._ids, self._offsets = {}, {}
+        for kind, count in zip(_ENTITY_KINDS, entity_counts):
+            self._ids[kind] = _Int64Column(self._map, offset, count)
+            self._offsets[kind] = _Int64Column(self._map, offset + 8 * count, count)
+            offset += 16 * count
+
+    def _scan_index(self, offset):
+        """Build the index of a version 1 snapshot by walking its frames."""
+        string_offsets = array('q')
+        entries = {kind: [] for kind in _ENTITY_KINDS}
+        while True:
+            kind, length = _FRAME.unpack_from(self._map, offset)
+            if kind == _END:
+                break
+            if kind == _STRING:
+                string_offsets.append(offset)
+            else:
+                record_id = struct.unpack_from('<q', self._map, offset + _FRAME.size)[0]
+                entries[kind].append((record_id, offset))
+            offset += _FRAME.size + length
+
+        self._strings = _StringTable(self._map, string_offsets)
+        self._ids, self._offsets = {}, {}
+        for kind, pairs in entries.items():
+            pairs.sort()
+            self._ids[kind] = array('q', (record_id for record_id, _ in pairs))
+            self._offsets[kind] = array('q', (record_offset for _, record_offset in pairs))
+
+    def _find(self, kind, record_id):
+        """Return the offset of a record in the file, or None if it is not there."""
+        ids = self._ids[kind]
+        index = bisect_left(ids, record_id)
+        if index == len(ids) or ids[index] != record_id:
+            return None
+        return self._offsets[kind][index]
+
+    def _get(self, kind, record_id):
+        key = (_SECTIONS[kind], record_id)
+        if key in self._changes:
+            return self._changes[key]
+        offset = self._find(kind, record_id)
+        if offset is None:
+            return None
+        _, length = _FRAME.unpack_from(self._map, offset)
+        start = offset + _FRAME.size
+        return _decode(kind, self._map[start:start + length], self._strings)[1]
+
+    def get_instructor(self, instructor_id):
+        """Return the record of one instructor, or None if it is not in the snapshot."""
+        return self._get(_INSTRUCTOR, instructor_id)
+
+    def get_course(self, course_id):
+        """Return the record of one course, or None if it is not in the snapshot."""
+        return self._get(_COURSE, course_id)
+
+    def get_student(self, student_id):
+        """Return the record of one student, or None if it is not in the snapshot."""
+        return self._get(_STUDENT, student_id)
+
+    def roster(self, course_id):
+        """Return the student records enrolled in a course.
+
+        Args:
+            course_id (int): The ID of the course.
+
+        Returns:
+            list of dict: The enrolled students found in the snapshot, or an
+            empty list if the course is not in it.
+        """
+        course = self.get_course(course_id)
+        if course is None:
+            return []
+        students = (self.get_student(student_id) for student_id in course["enrolled_students"])
+        return [student for student in students if student is not None]
+
+    def counts(self):
+        """Return the number of instructors, courses and students in the snapshot."""
+        counts = {kind: len(self._ids[kind]) for kind in _ENTITY_KINDS}
+        for kind in _ENTITY_KINDS:
+            section = _SECTIONS[kind]
+            for (change_section, record_id), record in self._changes.items():
+                if change_section == section:
+                    # Added records count once, deleted ones are taken away
+                    counts[kind] += (record is not None) - (self._find(kind, record_id) is not None)
+        return tuple(counts[kind] for kind in _ENTITY_KINDS)
+
+    def close(self):
+        """Unmap and close the snapshot file."""
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -0,0 +1,207 @@
+import threading
+import weakref
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+def current_tracker():
+    """Return the innermost change tracker opened by the calling thread, if any.
+
+    Returns:
+        ChangeTracker or None: The active tracker, or None outside every ``with`` block.
+    """
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+class ChangeTracker:
+    """Remember what changed since the last save.
+
+    Items marked dirty are kept once each, in the order they first changed.
+    Deletions are remembered by key, so they can still be saved after the
+    deleted item itself is gone.
+
+    A tracker belongs to one session, such as a GUI window. Items can be
+    marked on it directly; while it is active (inside its ``with`` block),
+    models also report their own changes to it through :func:`mark_dirty`
+    and :func:`mark_deleted`. Outside every tracker, changes are not
+    recorded.
+
+    Attributes:
+        key (callable): Maps an item to the key recorded when it is deleted.
+        snapshot (str or None): The snapshot file the session's data was
+            last loaded from or fully saved to, if any. Only changes made
+            since then can be journaled to that file (see
+            :func:`data_manager.save_changes`).
+    """
+
+    def __init__(self, key=None, weak=False):
+        """Initialize an empty tracker.
+
+        Args:
+            key (callable, optional): Maps an item to its deletion key.
+                Defaults to None, which records the item itself.
+            weak (bool): Hold weak references to the dirty items, so an item
+                that is no longer used anywhere else is forgotten. Defaults
+                to False.
+        """
+        self.key = key if key is not None else (lambda item: item)
+        self.weak = weak
+        self.snapshot = None
+        self._dirty = weakref.WeakKeyDictionary() if weak else {}
+        self._deleted = {}
+        self._paused = 0
+
+    def mark_dirty(self, item):
+        """Record that an item was added or changed."""
+        if not self._paused:
+            self._dirty[item] = None
+
+    def mark_deleted(self, item, key=None):
+        """Record that an item was deleted.
+
+        Args:
+            item: The deleted item.
+            key (optional): The key to record instead of the item's own key,
+                e.g. the ID an object had before it was changed.
+        """
+        if not self._paused:
+            self._dirty.pop(item, None)
+            self._deleted[self.key(item) if key is None else key] = None
+
+    @property
+    def dirty(self):
+        """list: The items changed since the last save, in order of first change."""
+        return list(self._dirty)
+
+    @property
+    def deleted(self):
+        """list: The keys of the items deleted since the last save."""
+        return list(self._deleted)
+
+    def __len__(self):
+        return len(self._dirty) + len(self._deleted)
+
+    def discard(self, items):
+        """Forget some dirty items, e.g. the ones a save has just written.
+
+        Items changed again after they were read for the save should be
+        marked dirty again by then, so they are kept.
+        """
+        for item in items:
+            self._dirty.pop(item, None)
+
+    def clear(self):
+        """Forget every recorded change, typically after a save."""
+        self._dirty.clear()
+        self._deleted.clear()
+
+    @contextmanager
+    def paused(self):
+        """Ignore changes inside the ``with`` block, e.g. while loading a snapshot."""
+        self._paused += 1
+        try:
+            yield self
+        finally:
+            self._paused -= 1
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _local.stack.pop()
+        return False
+
+
+def mark_dirty(item):
+    """Record that an item was added or changed in the active tracker, if any."""
+    tracker = current_tracker()
+    if tracker is not None:
+        tracker.mark_dirty(item)
+
+
+def mark_deleted(item, key=None):
+    """Record that an item was deleted in the active tracker, if any.
+
+    Args:
+        item: The deleted item.
+        key (optional): See :meth:`ChangeTracker.mark_deleted`.
+    """
+    tracker = current_tracker()
+    if tracker is not None:
+        tracker.mark_deleted(item, key)
+
+
+def _model_key(obj):
+    return (type(obj), getattr(obj, obj._KEY))
+
+
+class ModelChangeTracker(ChangeTracker):
+    """A :class:`ChangeTracker` for Student, Instructor and Course objects.
+
+    Deleted models are recorded as ``(model class, ID)`` pairs, and dirty
+    models are only weakly referenced.
+
+    Example::
+
+        changes = ModelChangeTracker()
+        with changes:
+            student.name = "Ann"  # marks the student dirty
+        changes.dirty  # [student]
+    """
+
+    def __init__(self):
+        """Initialize an empty tracker."""
+        super().__init__(key=_model_key, weak=True)
+
+
+# Marks an attribute that has not been assigned yet.
+_UNSET = object()
+
+
+class TrackedModel:
+    """Mixin marking a model dirty in the active tracker whenever it changes.
+
+    Every assignment to an attribute that already has a value marks the
+    object dirty; the first assignment of each attribute, as done by
+    ``__init__``, does not, so building an object records nothing. A new
+    object is recorded by marking it explicitly when it is added to the
+    session. Changing the ID named by ``_KEY`` also records the old ID as
+    deleted, so a saved snapshot does not keep the record under both IDs,
+    and marks the related models named by ``_REFERENCED_BY`` dirty, since
+    their records hold the ID too. Methods that change a relationship in
+    place call :func:`mark_dirty` themselves.
+    """
+
+    __slots__ = ()
+
+    # The name of the attribute holding the model's ID.
+    _KEY = None
+    # The attributes holding the models whose records refer to this model's
+    # ID, either a single model (or None) or a collection of models.
+    _REFERENCED_BY = ()
+
+    def __setattr__(self, name, value):
+        old_value = getattr(self, name, _UNSET)
+        object.__setattr__(self, name, value)
+        if old_value is _UNSET:
+            return
+        if name == self._KEY and old_value != value:
+            mark_deleted(self, key=(type(self), old_value))
+            for referrer in self._referrers():
+                mark_dirty(referrer)
+        mark_dirty(self)
+
+    def _referrers(self):
+        """Yield the models whose records refer to this model's ID."""
+        for name in self._REFERENCED_BY:
+            related = getattr(self, name, None)
+            if isinstance(related, TrackedModel):
+                yield related
+            elif related is not None:
+                yield from related
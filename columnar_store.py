@@ -0,0 +1,180 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+class StudentColumns:
+    """An append-only, column-oriented copy of the students for analytics.
+
+    Each student is a row. IDs and ages live in typed ``array`` buffers,
+    names and emails are interned once and stored as indexes into a shared
+    string table, and registrations are kept as two parallel arrays of rows
+    and course IDs. A row-order index sorted by age, built on first use,
+    answers age range filters with two binary searches, and per-course age
+    totals are kept up to date as rows are appended, so the aggregations
+    below run in time proportional to the answer rather than to the number
+    of students.
+
+    Example::
+
+        records = (record for section, record in iter_records(filename)
+                   if section == "students")
+        columns = StudentColumns.from_records(records)
+        columns.ids_with_age_between(18, 21)
+        columns.average_age_by_course()
+    """
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self.student_ids = array('q')
+        self.ages = array('i')
+        self.name_refs = array('I')
+        self.email_refs = array('I')
+        self.registration_rows = array('I')
+        self.registration_courses = array('q')
+        self._strings = []
+        self._string_refs = {}
+        self._row_by_id = {}
+        self._course_age_sums = {}
+        self._course_counts = {}
+        self._age_order = None
+        self._sorted_ages = None
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a store from student records as written by :mod:`data_manager`.
+
+        Args:
+            records (iterable of dict): Records with ``student_id``, ``name``,
+                ``age``, ``_email`` and ``registered_courses`` keys.
+
+        Returns:
+            StudentColumns: The filled store.
+        """
+        columns = cls()
+        for record in records:
+            columns.append(record["student_id"], record["name"], record["age"],
+                           record["_email"], record["registered_courses"])
+        return columns
+
+    @classmethod
+    def from_students(cls, students):
+        """Build a store from Student objects.
+
+        Args:
+            students (iterable of Student): The students to copy.
+
+        Returns:
+            StudentColumns: The filled store.
+        """
+        columns = cls()
+        for student in students:
+            columns.append(student.student_id, student.name, student.age, student._email,
+                           [course.course_id for course in student.registered_courses])
+        return columns
+
+    def _intern(self, text):
+        ref = self._string_refs.get(text)
+        if ref is None:
+            ref = self._string_refs[text] = len(self._strings)
+            self._strings.append(text)
+        return ref
+
+    def append(self, student_id, name, age, email, course_ids=()):
+        """Add a student as a new row.
+
+        Args:
+            student_id (int): The unique ID of the student.
+            name (str): The name of the student.
+            age (int): The age of the student.
+            email (str): The email of the student.
+            course_ids (iterable of int): The courses the student is registered in.
+
+        Returns:
+            int: The row of the new student.
+
+        Raises:
+            ValueError: If the student ID is already in the store.
+        """
+        if student_id in self._row_by_id:
+            raise ValueError(f"Student ID {student_id} is already in the store.")
+        row = len(self.student_ids)
+        self.student_ids.append(student_id)
+        self.ages.append(age)
+        self.name_refs.append(self._intern(name))
+        self.email_refs.append(self._intern(email))
+        self._row_by_id[student_id] = row
+        for course_id in course_ids:
+            self.registration_rows.append(row)
+            self.registration_courses.append(course_id)
+            self._course_age_sums[course_id] = self._course_age_sums.get(course_id, 0) + age
+            self._course_counts[course_id] = self._course_counts.get(course_id, 0) + 1
+        self._age_order = self._sorted_ages = None
+        return row
+
+    def __len__(self):
+        return len(self.student_ids)
+
+    def row_of(self, student_id):
+        """Return the row of a student, or None if it is not in the store."""
+        return self._row_by_id.get(student_id)
+
+    def name(self, row):
+        """Return the name stored in a row."""
+        return self._strings[self.name_refs[row]]
+
+    def email(self, row):
+        """Return the email stored in a row."""
+        return self._strings[self.email_refs[row]]
+
+    def record(self, row):
+        """Return ``(student_id, name, age, email)`` for a row."""
+        return (self.student_ids[row], self.name(row), self.ages[row], self.email(row))
+
+    def _age_index(self):
+        """Return the rows sorted by age and the ages in that order."""
+        if self._age_order is None:
+            ages = self.ages
+            self._age_order = array('I', sorted(range(len(ages)), key=ages.__getitem__))
+            self._sorted_ages = array('i', sorted(ages))
+        return self._age_order, self._sorted_ages
+
+    def _age_range(self, low, high):
+        order, sorted_ages = self._age_index()
+        return order, bisect_left(sorted_ages, low), bisect_right(sorted_ages, high)
+
+    def count_age_between(self, low, high):
+        """Return how many students are between two ages, inclusive."""
+        _, start, end = self._age_range(low, high)
+        return end - start
+
+    def rows_with_age_between(self, low, high):
+        """Return the rows of the students between two ages, inclusive.
+
+        Returns:
+            array: The matching rows, ordered by age.
+        """
+        order, start, end = self._age_range(low, high)
+        return order[start:end]
+
+    def ids_with_age_between(self, low, high):
+        """Return the IDs of the students between two ages, inclusive, ordered by age."""
+        student_ids = self.student_ids
+        return [student_ids[row] for row in self.rows_with_age_between(low, high)]
+
+    def average_age(self):
+        """Return the average age of all students, or None if the store is empty."""
+        return sum(self.ages) / len(self.ages) if self.ages else None
+
+    def average_age_by_course(self):
+        """Return the average age of the students registered in each course.
+
+        Returns:
+            dict: Course IDs mapped to the average age of their students.
+        """
+        counts = self._course_counts
+        return {course_id: total / counts[course_id]
+                for course_id, total in self._course_age_sums.items()}
+
+    def course_size(self, course_id):
+        """Return the number of students registered in a course."""
+        return self._course_counts.get(course_id, 0)
@@ -1,21 +1,49 @@
 import sqlite3
+from database import get_connection, bulk_insert, BulkSaveResult
+from unit_of_work import current_unit_of_work
+from migrations import migrate
+from change_tracking import TrackedModel
+from ordered_set import OrderedSet
+from enrollment import enroll, withdraw
+from validation import is_valid_course_name
+from identity_map import register
+
+class Course(TrackedModel):
+    __slots__ = ("course_id", "course_name", "instructor", "enrolled_students", "__weakref__")
+
+    _TABLE = "course"
+    _KEY = "course_id"
+    _REFERENCED_BY = ("instructor", "enrolled_students")
+    _INSERT_SQL = '''
+        INSERT OR REPLACE INTO course (course_id, course_name, instructor_id) 
+        VALUES (?, ?, ?)
+    '''
+    _ENROLL_SQL = '''
+        INSERT OR IGNORE INTO registration (student_id, course_id)
+        VALUES (?, ?)
+    '''
 
-class Course:
     def __init__(self, course_id, course_name, instructor=None):
         # Validate course_id: Must be a positive integer
         if not isinstance(course_id, int) or course_id <= 0:
             raise ValueError("course_id must be a positive integer.")
         
         # Validate course_name: Must contain only letters
-        if not course_name.isalpha():
+        if not is_valid_course_name(course_name):
             raise ValueError("course_name must contain only letters.")
         
         self.course_id = course_id
         self.course_name = course_name
-        self.instructor = None
+        self.enrolled_students = OrderedSet()
+
+        # The active identity map owns ID uniqueness
+        register(self)
         
+        # The first assignment of the instructor is part of building the course, not a change
         if instructor is not None:
             self.set_instructor(instructor)
+        else:
+            self.instructor = None
     
     def set_instructor(self, instructor):
         from instructor import Instructor  # Import here to avoid circular import issues
@@ -23,7 +51,14 @@ class Course:
         if not isinstance(instructor, Instructor):
             raise TypeError(f"Instructor must be an instance of Instructor or None, got {type(instructor).__name__}")
         
+        previous = getattr(self, "instructor", None)
         self.instructor = instructor
+
+        uow = current_unit_of_work('school.db')
+        if uow is not None:
+            # Restore the old instructor if the unit of work is rolled back
+            uow.on_rollback(lambda: setattr(self, "instructor", previous))
+
         # Save instructor_id in the database
         self.save_to_db()
     
@@ -34,78 +69,81 @@ class Course:
             print("Invalid student. Please provide a Student object.")
             return
         
-        conn = sqlite3.connect('school.db')
-        cursor = conn.cursor()
+        # Keep the in-memory roster and the student's courses in sync
+        enrolled = enroll(student, self)
+
+        uow = current_unit_of_work('school.db')
+        if uow is not None:
+            # Queue the registration until the unit of work is flushed
+            uow.add("registration", self._ENROLL_SQL, (student.student_id, self.course_id))
+            if enrolled:
+                uow.on_rollback(lambda: withdraw(student, self))
+            return
+
+        conn = get_connection('school.db')
         
         try:
             # Insert student into the registration table
-            cursor.execute('''
-                INSERT OR IGNORE INTO registration (student_id, course_id)
-                VALUES (?, ?)
-            ''', (student.student_id, self.course_id))
+            with conn:
+                conn.execute(self._ENROLL_SQL, (student.student_id, self.course_id))
             
-            conn.commit()
             print(f"Student {student.name} has been enrolled in {self.course_name}.")
         except sqlite3.IntegrityError as e:
+            if enrolled:
+                withdraw(student, self)
             print(f"Error enrolling student: {e}")
-        finally:
-            conn.close()
     
     @classmethod
     def create_database(cls, db_name='school.db'):
-        """Create the database and the course table if they do not exist."""
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
-        
-        # Create the course table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS course (
-                course_id INTEGER PRIMARY KEY,
-                course_name TEXT NOT NULL,
-                instructor_id INTEGER,
-                FOREIGN KEY (instructor_id) REFERENCES instructor (instructor_id)
-                ON DELETE SET NULL
-            )
-        ''')
-        
-        # Create the registration table if not exists
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS registration (
-                student_id INTEGER,
-                course_id INTEGER,
-                PRIMARY KEY (student_id, course_id),
-                FOREIGN KEY (student_id) REFERENCES student (student_id) ON DELETE CASCADE,
-                FOREIGN KEY (course_id) REFERENCES course (course_id) ON DELETE CASCADE
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-    
+        """Create the database and bring its schema up to date."""
+        migrate(db_name)
+
     def save_to_db(self, db_name='school.db'):
-        """Save the current course instance to the database."""
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
+        """Save the current course instance to the database.
+
+        Inside a :class:`unit_of_work.UnitOfWork` the write is queued instead.
+        """
+        uow = current_unit_of_work(db_name)
+        if uow is not None:
+            uow.add(self._TABLE, self._INSERT_SQL, self._db_row())
+            return
+
+        conn = get_connection(db_name)
         
         try:
-            cursor.execute('''
-                INSERT OR REPLACE INTO course (course_id, course_name, instructor_id) 
-                VALUES (?, ?, ?)
-            ''', (self.course_id, self.course_name, self.instructor.instructor_id if self.instructor else None))
-            conn.commit()
+            with conn:
+                conn.execute(self._INSERT_SQL, self._db_row())
         except sqlite3.IntegrityError as e:
             print(f"Error saving to database: {e}")
-        finally:
-            conn.close()
+
+    def _db_row(self):
+        """Return the parameters for ``_INSERT_SQL``."""
+        return (self.course_id, self.course_name, self.instructor.instructor_id if self.instructor else None)
+
+    @classmethod
+    def save_many(cls, courses, db_name='school.db', chunk_size=1000):
+        """Save many courses in one transaction using ``executemany``.
+
+        Inside a :class:`unit_of_work.UnitOfWork` the inserts are queued
+        instead and the result is empty; an integrity error then fails the
+        whole unit when it is flushed.
+
+        Returns:
+            BulkSaveResult: The number of inserted rows and the courses that
+            failed an integrity check.
+        """
+        uow = current_unit_of_work(db_name)
+        if uow is not None:
+            uow.add_many(cls._TABLE, cls._INSERT_SQL, map(cls._db_row, courses))
+            return BulkSaveResult()
+
+        return bulk_insert(cls._INSERT_SQL, courses, cls._db_row, db_name, chunk_size)
     
     @classmethod
     def show_all_records(cls, db_name='school.db'):
         """Display all records in the course table."""
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM course')
-        rows = cursor.fetchall()
-        conn.close()
+        conn = get_connection(db_name)
+        rows = conn.execute('SELECT * FROM course').fetchall()
 
         from prettytable import PrettyTable
         table = PrettyTable()
@@ -1,60 +1,616 @@
+import codecs
 import json
+import os
+from contextlib import nullcontext
+from binary_snapshot import is_binary_snapshot, write_snapshot, iter_snapshot_records
+from change_tracking import current_tracker
+from enrollment import enroll
+from identity_map import IdentityMap
 from instructor import Instructor
 from course import Course
 from student import Student
 
-def save_data(filename, instructors, students, courses):
+# Encoders reused for every record written by save_records.
+_INDENTED_ENCODER = json.JSONEncoder(indent=4)
+_COMPACT_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+# Snapshot sections in file order, with the key identifying their records.
+_SECTION_KEYS = {
+    "instructors": "instructor_id",
+    "courses": "course_id",
+    "students": "student_id",
+}
+
+# A journal is compacted into a full snapshot once it grows past this
+# fraction of the snapshot size.
+COMPACT_RATIO = 0.25
+
+
+def _instructor_record(instructor):
+    """Return the JSON record for an Instructor."""
+    return {
+        "name": instructor.name,
+        "age": instructor.age,
+        "_email": instructor._email,
+        "instructor_id": instructor.instructor_id,
+        "assigned_courses": [course.course_id for course in instructor.assigned_courses]
+    }
+
+
+def _course_record(course):
+    """Return the JSON record for a Course."""
+    return {
+        "course_id": course.course_id,
+        "course_name": course.course_name,
+        "instructor_id": course.instructor.instructor_id if course.instructor else None,  # Save instructor ID only
+        "enrolled_students": [student.student_id for student in course.enrolled_students]
+    }
+
+
+def _student_record(student):
+    """Return the JSON record for a Student."""
+    return {
+        "name": student.name,
+        "age": student.age,
+        "_email": student._email,
+        "student_id": student.student_id,
+        "registered_courses": [course.course_id for course in student.registered_courses]
+    }
+
+
+def save_records(filename, instructor_records, course_records, student_records, compact=False):
+    """Stream instructor, course and student records to a snapshot file.
+
+    Records are encoded and written one at a time, so memory use does not
+    grow with the number of records. The indented output is identical to
+    ``json.dump(..., indent=4)`` of the equivalent dictionary. A filename
+    ending in ``.snap`` selects the binary format of :mod:`binary_snapshot`.
+
+    Args:
+        filename (str): The name of the file where the data will be saved.
+        instructor_records (iterable of dict): The instructor records.
+        course_records (iterable of dict): The course records.
+        student_records (iterable of dict): The student records.
+        compact (bool): Write JSON without indentation or extra whitespace.
+            Defaults to False.
+    """
+    if is_binary_snapshot(filename):
+        write_snapshot(filename, instructor_records, course_records, student_records)
+        return
+
+    sections = (
+        ("instructors", instructor_records),
+        ("courses", course_records),
+        ("students", student_records),
+    )
+    if compact:
+        encode = _COMPACT_ENCODER.encode
+        open_section, record_sep, close_section = '[', ',', ']'
+        key_sep, section_sep = ':', ','
+    else:
+        encode = lambda record: _INDENTED_ENCODER.encode(record).replace('\n', '\n        ')
+        open_section, record_sep, close_section = '[\n        ', ',\n        ', '\n    ]'
+        key_sep, section_sep = ': ', ',\n    '
+
+    with open(filename, 'w') as file:
+        file.write('{' if compact else '{\n    ')
+        for index, (key, records) in enumerate(sections):
+            if index:
+                file.write(section_sep)
+            file.write(json.dumps(key) + key_sep)
+            first = True
+            for record in records:
+                file.write(open_section if first else record_sep)
+                file.write(encode(record))
+                first = False
+            file.write('[]' if first else close_section)
+        file.write('}' if compact else '\n}')
+
+
+def save_data(filename, instructors, students, courses, compact=False, changes=None):
     """Save the state of instructors, students, and courses to a JSON file.
 
+    The objects are serialized and written one record at a time, so peak
+    memory stays flat regardless of how many there are. A filename ending
+    in ``.snap`` writes a binary snapshot instead.
+
     Args:
         filename (str): The name of the file where the data will be saved.
         instructors (list of Instructor): A list of Instructor objects to save.
         students (list of Student): A list of Student objects to save.
         courses (list of Course): A list of Course objects to save.
+        compact (bool): Write JSON without indentation. Defaults to False.
+        changes (ChangeTracker, optional): The tracker of the session the
+            objects belong to. Its changes are saved now, so they are
+            cleared, and later changes may be journaled to this file.
 
     Prints:
         A confirmation message indicating the data has been saved.
     """
-    data_to_save = {
-        "instructors": [{
-            "name": instructor.name,
-            "age": instructor.age,
-            "_email": instructor._email,
-            "instructor_id": instructor.instructor_id,
-            "assigned_courses": [course.course_id for course in instructor.assigned_courses]
-            }
-            for instructor in instructors],
-        "courses": [
-            {
-                "course_id": course.course_id,
-                "course_name": course.course_name,
-                "instructor_id": course.instructor.instructor_id,  # Save instructor ID only
-                "enrolled_students": [student.student_id for student in course.enrolled_students]
-            }
-            for course in courses
-        ],
-        "students": [
-            {
-                "name": student.name,
-                "age": student.age,
-                "_email": student._email,
-                "student_id": student.student_id,
-                "registered_courses": [course.course_id for course in student.registered_courses]
-            }
-            for student in students
-        ]
-    }
-
-    with open(filename, 'w') as file:
-        json.dump(data_to_save, file, indent=4)
+    save_records(
+        filename,
+        map(_instructor_record, instructors),
+        map(_course_record, courses),
+        map(_student_record, students),
+        compact=compact,
+    )
+    discard_journal(filename)
+    if changes is not None:
+        changes.clear()
+        record_snapshot(filename, changes)
 
     print(f"Data saved to {filename}")
 
-def load_data(filename):
+
+def journal_filename(filename):
+    """Return the name of the change journal kept next to a snapshot."""
+    return filename + '.journal'
+
+
+def _snapshot_stamp(filename):
+    """Identify the current version of a snapshot by its size and mtime."""
+    stat = os.stat(filename)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _read_journal_header(file):
+    try:
+        return json.loads(file.readline()).get("snapshot")
+    except ValueError:
+        return None
+
+
+def record_snapshot(filename, changes):
+    """Record that a session's data matches a snapshot file as it is now.
+
+    Call this after loading the session's data from the file or writing all
+    of it to the file, with the tracker of the session's changes; until the
+    file is replaced, :func:`can_journal` allows journaling those changes to
+    it. The changes themselves are left as they are.
+
+    Args:
+        filename (str): The name of the snapshot file.
+        changes (ChangeTracker): The tracker of the session's changes.
+    """
+    changes.snapshot = [os.path.abspath(filename)] + _snapshot_stamp(filename)
+
+
+def can_journal(filename, changes, compact_ratio=COMPACT_RATIO):
+    """Return True if a session's changes may be saved to the journal of a snapshot.
+
+    That is only the case when the session's data was loaded from the
+    snapshot or fully written to it (see :func:`record_snapshot`), the file
+    has not been replaced since, and it does not need a compaction (see
+    :func:`needs_compaction`). Otherwise the changes are not relative to
+    the snapshot, and a full snapshot must be written instead.
+
+    Args:
+        filename (str): The name of the snapshot file.
+        changes (ChangeTracker): The tracker of the session's changes.
+        compact_ratio (float): See :func:`needs_compaction`.
+    """
+    if needs_compaction(filename, compact_ratio):
+        return False
+    return changes.snapshot == [os.path.abspath(filename)] + _snapshot_stamp(filename)
+
+
+def needs_compaction(filename, compact_ratio=COMPACT_RATIO):
+    """Return True if the next save should rewrite the whole snapshot.
+
+    That is the case when the snapshot does not exist yet, or when its
+    journal has grown past ``compact_ratio`` times the snapshot size.
+
+    Args:
+        filename (str): The name of the snapshot file.
+        compact_ratio (float): The journal to snapshot size ratio that
+            triggers a compaction. Defaults to ``COMPACT_RATIO``.
+    """
+    if not os.path.exists(filename):
+        return True
+    journal = journal_filename(filename)
+    if not os.path.exists(journal):
+        return False
+    return os.path.getsize(journal) > compact_ratio * os.path.getsize(filename)
+
+
+def discard_journal(filename):
+    """Delete the change journal of a snapshot, if there is one."""
+    try:
+        os.remove(journal_filename(filename))
+    except FileNotFoundError:
+        pass
+
+
+def append_journal(filename, upserts, deletions):
+    """Append changed and deleted records to the journal of a snapshot.
+
+    Each change is written as one JSON line. The journal starts with the
+    size and modification time of the snapshot it applies to, so a journal
+    left behind by an older snapshot is ignored and replaced.
+
+    Args:
+        filename (str): The name of the snapshot file, which must exist.
+        upserts (iterable): ``(section, record)`` pairs of added or changed records.
+        deletions (iterable): ``(section, record_id)`` pairs of deleted records.
+    """
+    journal = journal_filename(filename)
+    stamp = _snapshot_stamp(filename)
+    mode = 'w'
+    if os.path.exists(journal):
+        with open(journal, 'r') as file:
+            if _read_journal_header(file) == stamp:
+                mode = 'a'
+
+    with open(journal, mode) as file:
+        if mode == 'w':
+            file.write(_COMPACT_ENCODER.encode({"snapshot": stamp}) + '\n')
+        for section, record_id in deletions:
+            file.write(_COMPACT_ENCODER.encode(
+                {"section": section, "id": record_id, "record": None}) + '\n')
+        for section, record in upserts:
+            file.write(_COMPACT_ENCODER.encode(
+                {"section": section, "id": record[_SECTION_KEYS[section]], "record": record}) + '\n')
+
+
+def read_journal(filename):
+    """Read the changes journaled for a snapshot.
+
+    Args:
+        filename (str): The name of the snapshot file.
+
+    Returns:
+        dict or None: The latest journaled record per ``(section, id)``, None
+        for a deleted record, in the order the records were first journaled;
+        or None if the snapshot has no journal, or only one left behind by
+        an older version of the file.
+    """
+    journal = journal_filename(filename)
+    if not os.path.exists(journal):
+        return None
+    changes = {}
+    with open(journal, 'r') as file:
+        if _read_journal_header(file) != _snapshot_stamp(filename):
+            return None
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break  # A torn last line from an interrupted save
+            key = (entry["section"], entry["id"])
+            # Keep the first-journaled position; later entries win.
+            changes.pop(key, None)
+            changes[key] = entry["record"]
+    return changes
+
+
+def _apply_journal(records, changes):
+    """Overlay journaled changes on the records of a snapshot.
+
+    Changed records replace the snapshot version in place, deleted records
+    are dropped, and new records are appended at the end of their section.
+    """
+    sections = list(_SECTION_KEYS)
+    added = {section: [] for section in sections}
+    for (section, _), record in changes.items():
+        if record is not None and section in added:
+            added[section].append(record)
+
+    def flush_before(index):
+        for section in sections[:index]:
+            for record in added.pop(section, ()):
+                if (section, record[_SECTION_KEYS[section]]) in changes:
+                    yield section, record
+
+    for section, record in records:
+        yield from flush_before(sections.index(section))
+        key = (section, record[_SECTION_KEYS[section]])
+        if key in changes:
+            record = changes.pop(key)
+            if record is None:
+                continue
+        yield section, record
+    yield from flush_before(len(sections))
+
+
+def _model_section(model_class):
+    if issubclass(model_class, Instructor):
+        return "instructors"
+    if issubclass(model_class, Course):
+        return "courses"
+    if issubclass(model_class, Student):
+        return "students"
+    return None
+
+
+_RECORD_CONVERTERS = {
+    "instructors": _instructor_record,
+    "courses": _course_record,
+    "students": _student_record,
+}
+
+
+def save_changes(filename, instructors, students, courses, changes, compact_ratio=COMPACT_RATIO):
+    """Save only what changed since the last snapshot.
+
+    The students, instructors and courses changed or deleted since the
+    session's data was loaded from the snapshot or last saved to it (as
+    recorded by ``changes``) are appended to the snapshot's journal, so the
+    cost of a save follows the size of the edit rather than the size of the
+    data. A full snapshot is written with :func:`save_data` instead, and the
+    journal dropped, when :func:`can_journal` says the changes cannot be
+    journaled: the snapshot does not exist yet, its journal has grown too
+    large, or the session's data did not come from this snapshot.
+    :func:`load_data` replays the journal on top of the snapshot.
+
+    Args:
+        filename (str): The name of the snapshot file.
+        instructors (list of Instructor): Every instructor, used for a full save.
+        students (list of Student): Every student, used for a full save.
+        courses (list of Course): Every course, used for a full save.
+        changes (ModelChangeTracker): The changes of the session.
+        compact_ratio (float): See :func:`needs_compaction`.
+
+    Returns:
+        bool: True if a full snapshot was written, False if only the changes were.
+    """
+    if not can_journal(filename, changes, compact_ratio):
+        save_data(filename, instructors, students, courses, changes=changes)
+        return True
+
+    deletions = []
+    for model_class, record_id in changes.deleted:
+        section = _model_section(model_class)
+        if section is not None:
+            deletions.append((section, record_id))
+    upserts = []
+    for obj in changes.dirty:
+        section = _model_section(type(obj))
+        if section is not None:
+            upserts.append((section, _RECORD_CONVERTERS[section](obj)))
+
+    append_journal(filename, upserts, deletions)
+    changes.clear()
+
+    print(f"Changes saved to {journal_filename(filename)}")
+    return False
+
+class _JsonStreamParser:
+    """Incrementally parse the top-level object of a snapshot file.
+
+    Only a window of the file is kept in memory: top-level arrays are
+    decoded element by element with ``JSONDecoder.raw_decode``.
+    """
+
+    _WHITESPACE = ' \t\n\r'
+    _NUMBER_CHARS = '0123456789.eE+-'
+
+    def __init__(self, file, total_bytes, chunk_size, progress):
+        self._file = file
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._bytes_read = 0
+        self._total_bytes = total_bytes
+        self._chunk_size = chunk_size
+        self._progress = progress
+
+    def _fill(self):
+        """Read the next chunk into the buffer; return False at end of file."""
+        if self._eof:
+            return False
+        data = self._file.read(self._chunk_size)
+        self._bytes_read += len(data)
+        self._eof = not data
+        # Drop the consumed prefix before appending the new text.
+        self._buffer = self._buffer[self._pos:] + self._decoder.decode(data, final=self._eof)
+        self._pos = 0
+        if self._progress is not None:
+            self._progress(self._bytes_read, self._total_bytes)
+        return bool(data)
+
+    def _peek(self):
+        """Skip whitespace and return the next character, or '' at end of file."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in self._WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, chars):
+        char = self._peek()
+        if not char or char not in chars:
+            raise ValueError(f"Invalid snapshot: expected one of {chars!r}, got {char!r}.")
+        self._pos += 1
+        return char
+
+    def _value(self):
+        """Decode the next complete JSON value."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number cut off by the end of the buffer decodes as a shorter
+            # number, so read on until the character after it is known.
+            if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and (end == len(self._buffer) or self._buffer[end] in self._NUMBER_CHARS)
+                    and self._fill()):
+                continue
+            self._pos = end
+            return value
+
+    def __iter__(self):
+        """Yield ``(key, element)`` for each element of each top-level array."""
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            if self._peek() == '[':
+                self._pos += 1
+                if self._peek() == ']':
+                    self._pos += 1
+                else:
+                    while True:
+                        yield key, self._value()
+                        if self._expect(',]') == ']':
+                            break
+            else:
+                self._value()
+            if self._expect(',}') == '}':
+                return
+
+
+def iter_records(filename, progress=None, chunk_size=1 << 16):
+    """Stream the records of a snapshot without loading the whole file.
+
+    JSON files are parsed incrementally; ``.snap`` files are read with
+    :func:`binary_snapshot.iter_snapshot_records`. Changes journaled by
+    :func:`save_changes` are applied on the fly.
+
+    Args:
+        filename (str): The name of the file to read.
+        progress (callable, optional): Called as ``progress(bytes_read, total_bytes)``
+            after every chunk read from disk.
+        chunk_size (int): The number of bytes read at a time. Defaults to 64 KiB.
+
+    Yields:
+        tuple: ``(section, record)`` pairs such as ``("students", {...})``, in
+        file order.
+    """
+    changes = read_journal(filename)
+    if is_binary_snapshot(filename):
+        records = iter_snapshot_records(filename, progress)
+    else:
+        records = _iter_json_records(filename, progress, chunk_size)
+    if changes:
+        records = _apply_journal(records, changes)
+    yield from records
+
+
+def _iter_json_records(filename, progress, chunk_size):
+    total_bytes = os.path.getsize(filename)
+    with open(filename, 'rb') as file:
+        yield from _JsonStreamParser(file, total_bytes, chunk_size, progress)
+
+
+def iter_record_batches(filename, batch_size=1000, progress=None):
+    """Stream the records of a snapshot in batches, ready for ``executemany``.
+
+    Args:
+        filename (str): The name of the file to read.
+        batch_size (int): The maximum number of records per batch. Defaults to 1000.
+        progress (callable, optional): See :func:`iter_records`.
+
+    Yields:
+        tuple: ``(section, records)`` where every record in the list belongs
+        to the same section.
+    """
+    batch_section, batch = None, []
+    for section, record in iter_records(filename, progress):
+        if batch and (section != batch_section or len(batch) >= batch_size):
+            yield batch_section, batch
+            batch = []
+        batch_section = section
+        batch.append(record)
+    if batch:
+        yield batch_section, batch
+
+
+def iter_load(filename, progress=None, identity_map=None):
+    """Build Instructor, Course and Student objects while the file is parsed.
+
+    Objects are yielded as soon as they are built, so callers can start
+    working before the whole snapshot has been read. References to a
+    course or instructor that appears later in the file are linked once it
+    has been read.
+
+    Args:
+        filename (str): The name of the file from which to load the data.
+        progress (callable, optional): See :func:`iter_records`.
+        identity_map (IdentityMap, optional): The map the objects are
+            registered in, which also rejects duplicate IDs. Defaults to a
+            new map for this load.
+
+    Yields:
+        Instructor, Course or Student: The objects in file order.
+    """
+    if identity_map is None:
+        identity_map = IdentityMap()
+    instructor_dict = {}
+    course_dict = {}
+    pending_instructors = []  # (course, instructor_id)
+    pending_courses = []  # (student, course_id)
+
+    for section, data in iter_records(filename, progress):
+        if section == "instructors":
+            with identity_map:
+                instructor = Instructor(data["name"], data["age"], data["_email"], data["instructor_id"])
+            instructor_dict[instructor.instructor_id] = instructor
+            yield instructor
+
+        elif section == "courses":
+            # Find the instructor for this course
+            instructor = instructor_dict.get(data["instructor_id"])
+
+            # Create course with the found instructor
+            with identity_map:
+                course = Course(data["course_id"], data["course_name"], instructor)
+            course_dict[course.course_id] = course
+
+            # Assign this course to the instructor if available
+            if instructor is not None:
+                instructor.assign_course(course)
+            elif data["instructor_id"] is not None:
+                pending_instructors.append((course, data["instructor_id"]))
+            yield course
+
+        elif section == "students":
+            with identity_map:
+                student = Student(data["name"], data["age"], data["_email"], data["student_id"])
+
+            # Register the courses the student was enrolled in
+            for course_id in data["registered_courses"]:
+                if course_id in course_dict:
+                    enroll(student, course_dict[course_id])
+                else:
+                    pending_courses.append((student, course_id))
+            yield student
+
+    for course, instructor_id in pending_instructors:
+        instructor = instructor_dict.get(instructor_id)
+        if instructor is not None:
+            course.set_instructor(instructor)
+            instructor.assign_course(course)
+    for student, course_id in pending_courses:
+        if course_id in course_dict:
+            enroll(student, course_dict[course_id])
+
+
+def load_data(filename, progress=None, identity_map=None, changes=None):
     """Load the state of instructors, students, and courses from a JSON file.
 
+    The file is parsed incrementally; see :func:`iter_load`. Files ending in
+    ``.snap`` are read as binary snapshots.
+
     Args:
         filename (str): The name of the file from which to load the data.
+        progress (callable, optional): Called as ``progress(bytes_read, total_bytes)``
+            while the file is read.
+        identity_map (IdentityMap, optional): See :func:`iter_load`.
+        changes (ChangeTracker, optional): The tracker of the session the
+            objects are loaded into. Its changes are cleared, and later
+            changes may be journaled to this file.
 
     Returns:
         tuple: A tuple containing three dictionaries: 
@@ -62,48 +618,21 @@ def load_data(filename):
             - student_dict: A dictionary of Student objects indexed by their IDs.
             - course_dict: A dictionary of Course objects indexed by their IDs.
     """
-    with open(filename, 'r') as file:
-        data = json.load(file)
-    
-    # Create instructors
     instructor_dict = {}
-    for instructor_data in data["instructors"]:
-        instructor = Instructor(
-            instructor_data["name"],
-            instructor_data["age"],
-            instructor_data["_email"],
-            instructor_data["instructor_id"]
-        )
-        instructor_dict[instructor.instructor_id] = instructor
-
-    # Rebuild the courses
-    course_dict = {}
-    for course_data in data["courses"]:
-        # Find the instructor for this course
-        instructor = instructor_dict.get(course_data["instructor_id"])
-        
-        # Create course with the found instructor
-        course = Course(course_data["course_id"], course_data['course_name'], instructor)
-        course_dict[course.course_id] = course
-
-        # Assign this course to the instructor if available
-        if instructor is not None:
-            instructor.assign_course(course)
-
-    # Rebuild the students and assign courses
     student_dict = {}
-    for student_data in data["students"]:
-        student = Student(
-            student_data["name"],
-            student_data["age"],
-            student_data["_email"],
-            student_data["student_id"]
-        )
-        student_dict[student.student_id] = student
-        
-        # Register the courses the student was enrolled in
-        for course_id in student_data["registered_courses"]:
-            if course_id in course_dict:
-                student.register_course(course_dict[course_id])
+    course_dict = {}
+    # The loaded objects match the snapshot, so linking them is not a change.
+    active = current_tracker()
+    with active.paused() if active is not None else nullcontext():
+        for obj in iter_load(filename, progress, identity_map):
+            if isinstance(obj, Instructor):
+                instructor_dict[obj.instructor_id] = obj
+            elif isinstance(obj, Student):
+                student_dict[obj.student_id] = obj
+            else:
+                course_dict[obj.course_id] = obj
+    if changes is not None:
+        changes.clear()
+        record_snapshot(filename, changes)
 
     return instructor_dict, student_dict, course_dict
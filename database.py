@@ -0,0 +1,284 @@
+import os
+import pathlib
+import sqlite3
+import threading
+from itertools import islice
+
+# PRAGMAs applied once to every connection handed out by the pool.
+PRAGMAS = {
+    "busy_timeout": 5000,
+}
+
+# Durability profiles layered on top of PRAGMAS. All of them use WAL so
+# readers are never blocked by a writer; they differ in how often SQLite
+# fsyncs and how much memory it may use.
+DURABILITY_PROFILES = {
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    "bulk-load": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -256000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+_local = threading.local()
+_profile = os.environ.get("SCHOOL_DB_PROFILE", "balanced")
+_profile_version = 0
+
+if _profile not in DURABILITY_PROFILES:
+    raise ValueError(f"Unknown durability profile in SCHOOL_DB_PROFILE: '{_profile}'.")
+
+
+def set_durability_profile(name):
+    """Select the durability profile used by every pooled connection.
+
+    Connections opened afterwards use the new profile; connections already in
+    the pool switch to it the next time their thread asks for them.
+
+    Args:
+        name (str): One of "safe", "balanced" or "bulk-load".
+
+    Raises:
+        ValueError: If the profile name is unknown.
+    """
+    global _profile, _profile_version
+    if name not in DURABILITY_PROFILES:
+        raise ValueError(f"Unknown durability profile: '{name}'.")
+    _profile = name
+    _profile_version += 1
+
+
+def get_durability_profile():
+    """Return the name of the active durability profile."""
+    return _profile
+
+
+def _apply_pragmas(conn, pragmas):
+    """Apply PRAGMAs to a connection.
+
+    Args:
+        conn (sqlite3.Connection): The connection to configure.
+        pragmas (dict): PRAGMA names mapped to their values.
+    """
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+def get_connection(db_name='school.db'):
+    """Return the pooled connection for the calling thread.
+
+    Connections are created on first use, one per thread and database file,
+    and reused by every later call from the same thread. Callers must not
+    close the returned connection; use :func:`close_connections` instead.
+
+    Args:
+        db_name (str): The name of the database file. Defaults to 'school.db'.
+
+    Returns:
+        sqlite3.Connection: An open connection with the PRAGMAs and the
+        active durability profile already applied.
+    """
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+        _local.profile_versions = {}
+
+    conn = connections.get(db_name)
+    if conn is None:
+        conn = sqlite3.connect(db_name)
+        _apply_pragmas(conn, PRAGMAS)
+        connections[db_name] = conn
+
+    # journal_mode cannot change inside a transaction, so a pending profile
+    # switch waits until the connection is idle.
+    if _local.profile_versions.get(db_name) != _profile_version and not conn.in_transaction:
+        _apply_pragmas(conn, DURABILITY_PROFILES[_profile])
+        _local.profile_versions[db_name] = _profile_version
+    return conn
+
+
+def close_connections(db_name=None):
+    """Close pooled connections owned by the calling thread.
+
+    Args:
+        db_name (str, optional): Only close the connection for this database
+            file. Defaults to None, which closes every connection of the thread.
+    """
+    connections = getattr(_local, "connections", {})
+    profile_versions = getattr(_local, "profile_versions", {})
+    names = [db_name] if db_name is not None else list(connections)
+    for name in names:
+        conn = connections.pop(name, None)
+        profile_versions.pop(name, None)
+        if conn is not None:
+            conn.close()
+
+
+def open_read_only(db_name='school.db'):
+    """Open a dedicated read-only connection, outside the pool.
+
+    The connection is not tied to the thread that opened it, so it may be
+    handed between threads as long as only one thread uses it at a time.
+    The caller must close it.
+
+    Args:
+        db_name (str): The name of the database file. Defaults to 'school.db'.
+
+    Returns:
+        sqlite3.Connection: An open connection with the PRAGMAs applied.
+    """
+    conn = sqlite3.connect(pathlib.Path(db_name).absolute().as_uri() + "?mode=ro", uri=True,
+                           check_same_thread=False)
+    _apply_pragmas(conn, PRAGMAS)
+    return conn
+
+
+def stream_query(sql, params=(), db_name='school.db'):
+    """Yield the rows of a query from a dedicated read-only connection.
+
+    The connection is opened on the first row and closed when the rows run
+    out or the generator is closed. Because it is separate from the pooled
+    connection, a long-lived cursor such as the one behind a scrolling table
+    never holds up, or is reset by, writes made in the meantime; it keeps
+    reading the snapshot it started on. A worker thread may read the first
+    rows and hand the generator to the GUI thread for the rest (see
+    :func:`open_read_only`).
+
+    Args:
+        sql (str): The SELECT statement.
+        params (tuple): The statement parameters. Defaults to ().
+        db_name (str): The name of the database file. Defaults to 'school.db'.
+
+    Yields:
+        tuple: The result rows.
+    """
+    conn = open_read_only(db_name)
+    try:
+        yield from conn.execute(sql, params)
+    finally:
+        conn.close()
+
+
+class PrefetchedRows:
+    """Rows of a streamed query whose first rows have already been read.
+
+    A worker thread reads the first rows, e.g. the first page of a table,
+    and hands the object to the GUI thread, which iterates over those rows
+    and then over the rest of the source as it needs them. Closing it
+    closes the source, so a cursor whose rows are no longer wanted is
+    released right away instead of when it is garbage collected.
+
+    Example::
+
+        rows = PrefetchedRows(stream_query("SELECT * FROM student"), 100)
+        first_page = rows.first
+        rows.close()  # closes the connection behind the rows
+    """
+
+    def __init__(self, source, count):
+        """Read the first rows of a source.
+
+        Args:
+            source (iterable): The rows, such as the generator returned by :func:`stream_query`.
+            count (int): The number of rows to read now.
+        """
+        self._source = iter(source)
+        self.first = list(islice(self._source, count))
+        self._first = iter(self.first)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        for row in self._first:
+            return row
+        return next(self._source)
+
+    def close(self):
+        """Close the source, if it can be closed; no more rows are returned."""
+        self._first = iter(())
+        close = getattr(self._source, "close", None)
+        if close is not None:
+            close()
+        self._source = iter(())
+
+
+class BulkSaveResult:
+    """Summary of a bulk insert.
+
+    Attributes:
+        inserted (int): The number of rows that were written.
+        failed (list): ``(item, error message)`` pairs for the items that
+            failed an integrity check and were skipped.
+    """
+
+    def __init__(self):
+        """Initialize an empty result."""
+        self.inserted = 0
+        self.failed = []
+
+    def __repr__(self):
+        return f"BulkSaveResult(inserted={self.inserted}, failed={len(self.failed)})"
+
+
+def bulk_insert(sql, items, to_row, db_name='school.db', chunk_size=1000):
+    """Insert many items with ``executemany`` inside a single transaction.
+
+    Each chunk is written under a savepoint. When a chunk hits an
+    IntegrityError it is rolled back and replayed row by row, so only the
+    offending items are skipped and reported.
+
+    Args:
+        sql (str): The parameterized INSERT statement.
+        items (iterable): The objects to insert.
+        to_row (callable): Maps an item to the parameter tuple for ``sql``.
+        db_name (str): The name of the database file. Defaults to 'school.db'.
+        chunk_size (int): The number of rows passed to each ``executemany``.
+            Defaults to 1000.
+
+    Returns:
+        BulkSaveResult: The number of inserted rows and the failed items.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer.")
+
+    result = BulkSaveResult()
+    conn = get_connection(db_name)
+    items = iter(items)
+    with conn:
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        while True:
+            chunk = list(islice(items, chunk_size))
+            if not chunk:
+                break
+            rows = [to_row(item) for item in chunk]
+            conn.execute("SAVEPOINT bulk_insert")
+            try:
+                conn.executemany(sql, rows)
+                result.inserted += len(rows)
+            except sqlite3.IntegrityError:
+                conn.execute("ROLLBACK TO bulk_insert")
+                for item, row in zip(chunk, rows):
+                    try:
+                        conn.execute(sql, row)
+                        result.inserted += 1
+                    except sqlite3.IntegrityError as e:
+                        result.failed.append((item, str(e)))
+            conn.execute("RELEASE bulk_insert")
+    return result
@@ -0,0 +1,45 @@
+from change_tracking import mark_dirty
+
+# The enrollment index is stored on the models themselves:
+# Student.registered_courses maps a student to its courses and
+# Course.enrolled_students maps a course to its students. Both are ordered
+# sets, and the functions below are the only place that changes them, so
+# the two directions always agree and each change is O(1).
+
+
+def enroll(student, course):
+    """Enroll a student in a course, updating both sides of the index.
+
+    Args:
+        student (Student): The student to enroll.
+        course (Course): The course to enroll the student in.
+
+    Returns:
+        bool: True if the student was enrolled, False if already enrolled.
+    """
+    if course in student.registered_courses:
+        return False
+    student.registered_courses.add(course)
+    course.enrolled_students.add(student)
+    mark_dirty(student)
+    mark_dirty(course)
+    return True
+
+
+def withdraw(student, course):
+    """Remove a student from a course, updating both sides of the index.
+
+    Args:
+        student (Student): The student to withdraw.
+        course (Course): The course to withdraw the student from.
+
+    Returns:
+        bool: True if the student was withdrawn, False if not enrolled.
+    """
+    if course not in student.registered_courses:
+        return False
+    student.registered_courses.discard(course)
+    course.enrolled_students.discard(student)
+    mark_dirty(student)
+    mark_dirty(course)
+    return True
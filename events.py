@@ -0,0 +1,116 @@
+class RecordEvent:
+    """A change to one record, published on an :class:`EventBus`.
+
+    Attributes:
+        entity (str): The kind of record: "student", "instructor", "course"
+            or "registration".
+        record_id: The ID of the record; for a registration, the
+            ``(student_id, course_id)`` pair.
+        record: The record as it is after the change, such as a model object
+            or a lazy proxy, or None if the publisher does not have it at hand.
+    """
+
+    def __init__(self, entity, record_id, record=None):
+        """Initialize an event.
+
+        Args:
+            entity (str): The kind of record.
+            record_id: The ID of the record.
+            record (optional): The record after the change. Defaults to None.
+        """
+        self.entity = entity
+        self.record_id = record_id
+        self.record = record
+
+    @property
+    def key(self):
+        """tuple: The ``(entity, record_id)`` pair identifying the record."""
+        return (self.entity, self.record_id)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.entity!r}, {self.record_id!r})"
+
+
+class RecordInserted(RecordEvent):
+    """A record was added."""
+
+
+class RecordUpdated(RecordEvent):
+    """A record was changed.
+
+    Attributes:
+        old_id: The ID the record had before the change; the same as
+            ``record_id`` unless the ID itself changed.
+    """
+
+    def __init__(self, entity, record_id, record=None, old_id=None):
+        """Initialize an event.
+
+        Args:
+            entity (str): The kind of record.
+            record_id: The ID of the record after the change.
+            record (optional): The record after the change. Defaults to None.
+            old_id (optional): The ID before the change. Defaults to None,
+                which means the ID did not change.
+        """
+        super().__init__(entity, record_id, record)
+        self.old_id = record_id if old_id is None else old_id
+
+    @property
+    def old_key(self):
+        """tuple: The ``(entity, old_id)`` pair the record was identified by before the change."""
+        return (self.entity, self.old_id)
+
+
+class RecordDeleted(RecordEvent):
+    """A record was removed; ``record`` is the record as it was, if known."""
+
+
+class EventBus:
+    """Deliver record events to the views that show the records.
+
+    Handlers subscribe to an event class and are called, in the order they
+    subscribed, with every published event of that class or a subclass. They
+    run synchronously in the publishing thread, so a GUI publishes from its
+    own thread and its handlers may update widgets directly.
+
+    Example::
+
+        events = EventBus()
+        events.subscribe(lambda event: print("added", event.record_id), RecordInserted)
+        events.publish(RecordInserted("student", 42, student))
+    """
+
+    def __init__(self):
+        """Initialize a bus without subscribers."""
+        self._handlers = []
+
+    def subscribe(self, handler, event_class=RecordEvent):
+        """Call a handler with every published event of a class.
+
+        Args:
+            handler (callable): Called with the event.
+            event_class (type): The events to receive. Defaults to
+                `RecordEvent`, i.e. every event.
+
+        Returns:
+            callable: The handler, so this can be used as a decorator.
+        """
+        self._handlers.append((handler, event_class))
+        return handler
+
+    def unsubscribe(self, handler):
+        """Stop calling a handler; does nothing if it is not subscribed."""
+        self._handlers = [(subscribed, event_class) for subscribed, event_class in self._handlers
+                          if subscribed != handler]
+
+    def publish(self, event):
+        """Call the handlers subscribed to the class of an event."""
+        for handler, event_class in list(self._handlers):
+            if isinstance(event, event_class):
+                handler(event)
+
+    def publish_all(self, events):
+        """Publish several events in order."""
+        for event in events:
+            self.publish(event)
@@ -0,0 +1,116 @@
+import threading
+import weakref
+
+_local = threading.local()
+
+
+def current_identity_map():
+    """Return the innermost identity map opened by the calling thread, if any.
+
+    Returns:
+        IdentityMap or None: The active map, or None outside every ``with`` block.
+    """
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+class IdentityMap:
+    """Hold one instance per ID for Student, Instructor and Course.
+
+    While a map is active (inside its ``with`` block) every new model
+    registers itself here, and creating a second model with an ID that is
+    already taken raises ValueError. A map belongs to one session, such as a
+    GUI window or a single :func:`data_manager.load_data` call, so loading
+    again with a fresh map never collides with the objects of an earlier
+    load. Outside every map, IDs are not checked.
+
+    By default the map only holds weak references: an object that is no
+    longer used anywhere else drops out of the map, and its ID can be used
+    again. Use :meth:`evict` to free an ID immediately, e.g. after deleting
+    a record.
+
+    Example::
+
+        identity_map = IdentityMap()
+        with identity_map:
+            student = Student("Ann", 20, "ann@example.com", 1)
+        identity_map.get(Student, 1) is student  # True
+    """
+
+    def __init__(self, weak=True):
+        """Initialize an empty map.
+
+        Args:
+            weak (bool): Hold weak references so unused objects can be
+                garbage collected. Defaults to True.
+        """
+        self.weak = weak
+        self._objects = weakref.WeakValueDictionary() if weak else {}
+
+    @staticmethod
+    def _key(model_class, record_id):
+        # Subclasses share the ID space of the model that defines the ID.
+        return (model_class._KEY, record_id)
+
+    def get(self, model_class, record_id):
+        """Return the instance with an ID, or None if it is not in the map.
+
+        Args:
+            model_class (type): Student, Instructor or Course.
+            record_id (int): The ID of the instance.
+        """
+        return self._objects.get(self._key(model_class, record_id))
+
+    def add(self, obj):
+        """Register an instance under its ID.
+
+        Args:
+            obj (Student, Instructor or Course): The instance to register.
+
+        Raises:
+            ValueError: If a different instance already has the same ID.
+        """
+        key = self._key(type(obj), getattr(obj, obj._KEY))
+        existing = self._objects.get(key)
+        if existing is not None and existing is not obj:
+            raise ValueError(f"{type(obj).__name__} ID must be unique.")
+        self._objects[key] = obj
+
+    def evict(self, obj):
+        """Remove an instance from the map so its ID can be used again."""
+        key = self._key(type(obj), getattr(obj, obj._KEY))
+        if self._objects.get(key) is obj:
+            del self._objects[key]
+
+    def clear(self):
+        """Remove every instance from the map."""
+        self._objects.clear()
+
+    def __contains__(self, obj):
+        return self._objects.get(self._key(type(obj), getattr(obj, obj._KEY))) is obj
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _local.stack.pop()
+        return False
+
+
+def register(obj):
+    """Register a new model instance with the active identity map, if any.
+
+    Raises:
+        ValueError: If the active map already holds another instance with
+            the same ID.
+    """
+    identity_map = current_identity_map()
+    if identity_map is not None:
+        identity_map.add(obj)
@@ -1,13 +1,24 @@
-import sqlite3
+from database import get_connection
 from person import Person
 from course import Course  # Ensure this is imported if needed
+from change_tracking import TrackedModel, mark_dirty
+from ordered_set import OrderedSet
+from identity_map import register
+from unit_of_work import current_unit_of_work
 from prettytable import PrettyTable
 
-class Instructor(Person):
+class Instructor(TrackedModel, Person):
     """A class to represent an instructor, inheriting from Person."""
 
-    # Class-level attribute to keep track of all instructor IDs
-    existing_instructor_ids = set()
+    __slots__ = ("instructor_id", "assigned_courses")
+
+    _TABLE = "instructor"
+    _KEY = "instructor_id"
+    _REFERENCED_BY = ("assigned_courses",)
+    _INSERT_SQL = '''
+        INSERT INTO instructor (name, age, email, instructor_id) 
+        VALUES (?, ?, ?, ?)
+    '''
 
     def __init__(self, name, age, email, instructor_id):
         """Initialize an Instructor instance.
@@ -19,22 +30,20 @@ class Instructor(Person):
             instructor_id (int): The unique identifier for the instructor, must be a positive integer.
 
         Raises:
-            ValueError: If the instructor ID is not a positive integer or is not unique.
+            ValueError: If the instructor ID is not a positive integer or is not
+                unique in the active :class:`identity_map.IdentityMap`.
         """
         super().__init__(name, age, email)
 
-        # Validate instructor_id: Must be a number and unique
-        if not isinstance(instructor_id, int) or instructor_id <= 0:
+        # Validate instructor_id: Must be a positive integer, not a bool
+        if not isinstance(instructor_id, int) or isinstance(instructor_id, bool) or instructor_id <= 0:
             raise ValueError("Instructor ID must be a positive integer.")
-        
-        if instructor_id in Instructor.existing_instructor_ids:
-            raise ValueError("Instructor ID must be unique.")
-        
-        # If valid, add instructor_id to the set of existing IDs
-        Instructor.existing_instructor_ids.add(instructor_id)
 
         self.instructor_id = instructor_id
-        self.assigned_courses = []
+        self.assigned_courses = OrderedSet()
+
+        # The active identity map owns ID uniqueness
+        register(self)
 
     def assign_course(self, course):
         """Assign a course to the instructor.
@@ -51,57 +60,17 @@ class Instructor(Person):
         if course in self.assigned_courses:
             print(f"Course {course.course_name} is already assigned.")
         else:
-            self.assigned_courses.append(course)
+            self.assigned_courses.add(course)
+            mark_dirty(self)
+            uow = current_unit_of_work('school.db')
+            if uow is not None:
+                # Forget the assignment if the unit of work is rolled back
+                uow.on_rollback(lambda: self.assigned_courses.discard(course))
             print(f"Course {course.course_name} has been assigned.")
 
-    @classmethod
-    def create_database(cls, db_name='school.db'):
-        """Create the database and the instructor table if they do not exist.
-
-        Args:
-            db_name (str): The name of the database file. Defaults to 'school.db'.
-        """
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
-        # Create the person table if it does not exist
-        Person.create_database(db_name)
-        # Create the instructor table with foreign key references to person table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS instructor (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                age INTEGER NOT NULL,
-                email TEXT NOT NULL,
-                instructor_id INTEGER NOT NULL UNIQUE,
-                FOREIGN KEY (name, email) REFERENCES person (name, email) 
-                ON DELETE CASCADE
-            )
-        ''')
-        conn.commit()
-        conn.close()
-
-    def save_to_db(self, db_name='school.db'):
-        """Save the current instructor instance to the database.
-
-        Args:
-            db_name (str): The name of the database file. Defaults to 'school.db'.
-
-        Prints:
-            Error message if there is an IntegrityError during saving.
-        """
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
-        # Insert the instructor into the table
-        try:
-            cursor.execute('''
-                INSERT INTO instructor (name, age, email, instructor_id) 
-                VALUES (?, ?, ?, ?)
-            ''', (self.name, self.age, self._email, self.instructor_id))
-            conn.commit()
-        except sqlite3.IntegrityError as e:
-            print(f"Error saving to database: {e}")
-        finally:
-            conn.close()
+    def _db_row(self):
+        """Return the parameters for ``_INSERT_SQL``."""
+        return (self.name, self.age, self._email, self.instructor_id)
 
     @classmethod
     def show_all_records(cls, db_name='school.db'):
@@ -110,11 +79,8 @@ class Instructor(Person):
         Args:
             db_name (str): The name of the database file. Defaults to 'school.db'.
         """
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM instructor')
-        rows = cursor.fetchall()
-        conn.close()
+        conn = get_connection(db_name)
+        rows = conn.execute('SELECT * FROM instructor').fetchall()
 
         # Use PrettyTable to display the data in a tabular format
         table = PrettyTable()
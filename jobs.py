@@ -0,0 +1,190 @@
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class JobCancelled(Exception):
+    """Raised inside a job to stop it once it has been cancelled."""
+
+
+class JobSignals(QObject):
+    """The signals a :class:`Job` emits from its worker thread.
+
+    The object is created on the thread that submits the job, normally the
+    GUI thread, so slots connected to it run there through queued
+    connections.
+    """
+
+    finished = pyqtSignal(object)
+    error = pyqtSignal(object)
+    progress = pyqtSignal(int, int)
+    cancelled = pyqtSignal()
+
+
+class Job(QRunnable):
+    """A function run on a worker thread of a :class:`JobRunner`.
+
+    The function is called with the job as its first argument, followed by
+    the arguments given to :meth:`JobRunner.submit`. It may call
+    :meth:`report_progress` (which fits the ``progress`` callback of
+    :mod:`data_manager`) and :meth:`check_cancelled` to stop early; both
+    raise :class:`JobCancelled` once :meth:`cancel` has been called.
+
+    Attributes:
+        signals (JobSignals): Emits the result, the error, progress, or the
+            cancellation of the job.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        """Initialize a job.
+
+        Args:
+            fn (callable): The function to run, called as ``fn(job, *args, **kwargs)``.
+            *args: Positional arguments for ``fn``.
+            **kwargs: Keyword arguments for ``fn``.
+        """
+        super().__init__()
+        # The runner keeps the job alive until its outcome is delivered
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = JobSignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Ask the job to stop.
+
+        A job that has not started yet never runs, and a running job stops
+        the next time it reports progress or checks for cancellation. A job
+        whose function returns anyway still delivers its result, since the
+        work it did, such as a committed write, cannot be taken back.
+        """
+        self._cancelled.set()
+
+    @property
+    def is_cancelled(self):
+        """bool: Whether :meth:`cancel` has been called."""
+        return self._cancelled.is_set()
+
+    def check_cancelled(self):
+        """Raise :class:`JobCancelled` if the job has been cancelled."""
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def report_progress(self, done, total):
+        """Emit the progress of the job, then stop it if it has been cancelled.
+
+        Args:
+            done (int): The amount of work done, e.g. bytes read.
+            total (int): The total amount of work.
+        """
+        self.signals.progress.emit(done, total)
+        self.check_cancelled()
+
+    def run(self):
+        """Run the function and emit its outcome; called by the thread pool."""
+        try:
+            self.check_cancelled()
+            result = self.fn(self, *self.args, **self.kwargs)
+        except JobCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.error.emit(e)
+        else:
+            self.signals.finished.emit(result)
+
+
+class JobRunner(QObject):
+    """Run jobs on a thread pool and deliver their outcome on the submitting thread.
+
+    Exactly one of the callbacks given to :meth:`submit`, ``on_finished``,
+    ``on_error`` or ``on_cancelled``, is called for every job, on the thread
+    that submitted it. ``on_cancelled`` is only called for a job that
+    cancellation actually stopped: one that never started, or whose function
+    raised :class:`JobCancelled`. Once the function has returned or raised,
+    its outcome is delivered even if the job was cancelled in the meantime,
+    so a caller that cancels a job to discard an out-of-date result checks
+    whether the result is still wanted when it arrives.
+
+    Jobs run concurrently unless the runner is limited to one thread, in
+    which case they run one at a time in the order they were submitted;
+    this suits writes, which SQLite serializes anyway.
+
+    Example::
+
+        runner = JobRunner(max_threads=1)
+        job = runner.submit(lambda job, path: len(open(path).read()), "school_data.json",
+                            on_finished=print, on_error=print)
+        job.cancel()
+    """
+
+    def __init__(self, parent=None, max_threads=None):
+        """Initialize a runner with its own thread pool.
+
+        Args:
+            parent (QObject, optional): The parent of the runner. Defaults to None.
+            max_threads (int, optional): The number of worker threads. Defaults to None,
+                which uses Qt's default of one per CPU core.
+        """
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        if max_threads is not None:
+            self.pool.setMaxThreadCount(max_threads)
+        self._jobs = set()
+
+    def submit(self, fn, *args, on_finished=None, on_error=None, on_progress=None,
+               on_cancelled=None, **kwargs):
+        """Queue a function to run on a worker thread.
+
+        Args:
+            fn (callable): The function to run, called as ``fn(job, *args, **kwargs)``.
+            *args: Positional arguments for ``fn``.
+            on_finished (callable, optional): Called with the return value of ``fn``.
+            on_error (callable, optional): Called with the exception raised by ``fn``.
+            on_progress (callable, optional): Called with ``(done, total)`` whenever the
+                job reports progress.
+            on_cancelled (callable, optional): Called without arguments if cancelling the job
+                stopped it before ``fn`` returned.
+            **kwargs: Keyword arguments for ``fn``.
+
+        Returns:
+            Job: The queued job, which can be cancelled.
+        """
+        job = Job(fn, *args, **kwargs)
+
+        def settle(callback, *outcome):
+            self._jobs.discard(job)
+            if callback is not None:
+                callback(*outcome)
+
+        job.signals.finished.connect(lambda result: settle(on_finished, result))
+        job.signals.error.connect(lambda error: settle(on_error, error))
+        job.signals.cancelled.connect(lambda: settle(on_cancelled))
+        if on_progress is not None:
+            job.signals.progress.connect(on_progress)
+
+        self._jobs.add(job)
+        self.pool.start(job)
+        return job
+
+    def __len__(self):
+        """Return the number of jobs whose outcome has not been delivered yet."""
+        return len(self._jobs)
+
+    def cancel_all(self):
+        """Cancel every job whose outcome has not been delivered yet."""
+        for job in list(self._jobs):
+            job.cancel()
+
+    def wait(self, msecs=-1):
+        """Block until every started job has returned.
+
+        Outcomes are still delivered through the event loop afterwards.
+
+        Args:
+            msecs (int): The longest time to wait in milliseconds. Defaults to -1, no limit.
+
+        Returns:
+            bool: True if every job returned in time.
+        """
+        return self.pool.waitForDone(msecs)
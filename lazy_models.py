@@ -0,0 +1,225 @@
+from database import get_connection
+
+
+class LazyRecord:
+    """A read-only stand-in for a model row that loads its details on demand.
+
+    A proxy is built from just its ID and name. The first time any other
+    column is read, all remaining columns of the row are fetched with one
+    query and cached; each relationship is fetched and cached the first
+    time it is read. Subclasses describe their table with the class
+    attributes below.
+
+    Attributes:
+        name (str): The name of the record, always loaded.
+    """
+
+    __slots__ = ("name", "_db_name", "_loaded", "__weakref__")
+
+    # The table, its ID column, and the SQL listing every ID and name.
+    _TABLE = None
+    _KEY = None
+    _SELECT_ALL = None
+    # Lazily loaded attributes mapped to their columns.
+    _COLUMNS = {}
+    # Lazily loaded relationships mapped to ``(proxy class name, SQL, many)``;
+    # the SQL takes the record ID and selects the related IDs and names. A
+    # relationship with ``many`` set loads as a tuple, otherwise as a single
+    # proxy or None.
+    _RELATIONS = {}
+
+    def __init__(self, record_id, name, db_name='school.db', **loaded):
+        """Initialize a proxy.
+
+        Args:
+            record_id (int): The ID of the record.
+            name (str): The name of the record.
+            db_name (str): The name of the database file. Defaults to 'school.db'.
+            **loaded: Attribute values already known, which are cached as is.
+        """
+        setattr(self, self._KEY, record_id)
+        self.name = name
+        self._db_name = db_name
+        self._loaded = loaded or None
+
+    @property
+    def record_id(self):
+        """int: The ID of the record."""
+        return getattr(self, self._KEY)
+
+    @classmethod
+    def load_all(cls, db_name='school.db'):
+        """Return a proxy for every record of the table.
+
+        Only the IDs and names are read.
+
+        Args:
+            db_name (str): The name of the database file. Defaults to 'school.db'.
+
+        Returns:
+            list: The proxies in table order.
+        """
+        rows = get_connection(db_name).execute(cls._SELECT_ALL)
+        return [cls.from_row(row, db_name) for row in rows]
+
+    @classmethod
+    def load(cls, record_id, db_name='school.db'):
+        """Return a proxy for one record, read the way :meth:`load_all` reads every record.
+
+        Args:
+            record_id (int): The ID of the record.
+            db_name (str): The name of the database file. Defaults to 'school.db'.
+
+        Returns:
+            LazyRecord or None: The proxy, or None if there is no such record.
+        """
+        row = get_connection(db_name).execute(
+            f"{cls._SELECT_ALL} WHERE {cls._TABLE}.{cls._KEY} = ?", (record_id,)).fetchone()
+        return cls.from_row(row, db_name) if row is not None else None
+
+    @classmethod
+    def from_row(cls, row, db_name='school.db'):
+        """Build a proxy from an ``(id, name)`` row."""
+        return cls(row[0], row[1], db_name)
+
+    def __getattr__(self, attr):
+        # Only called for attributes that are not slots, i.e. lazy ones.
+        loaded = self._loaded
+        if loaded is not None and attr in loaded:
+            return loaded[attr]
+        if attr in self._COLUMNS:
+            self._load_columns()
+        elif attr in self._RELATIONS:
+            self._load_relation(attr)
+        else:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{attr}'")
+        return self._loaded[attr]
+
+    def _cache(self):
+        if self._loaded is None:
+            self._loaded = {}
+        return self._loaded
+
+    def _load_columns(self):
+        columns = ", ".join(self._COLUMNS.values())
+        row = get_connection(self._db_name).execute(
+            f"SELECT {columns} FROM {self._TABLE} WHERE {self._KEY} = ?", (self.record_id,)).fetchone()
+        if row is None:
+            raise LookupError(f"{self._TABLE} {self.record_id} no longer exists.")
+        cache = self._cache()
+        for attr, value in zip(self._COLUMNS, row):
+            cache.setdefault(attr, value)
+
+    def _load_relation(self, attr):
+        proxy_class_name, sql, many = self._RELATIONS[attr]
+        proxy_class = _PROXY_CLASSES[proxy_class_name]
+        rows = get_connection(self._db_name).execute(sql, (self.record_id,))
+        related = tuple(proxy_class.from_row(row, self._db_name) for row in rows)
+        self._cache()[attr] = related if many else (related[0] if related else None)
+
+    def is_loaded(self, attr):
+        """Return True if a lazy attribute has already been fetched."""
+        return self._loaded is not None and attr in self._loaded
+
+    def refresh(self):
+        """Drop the cached details so they are fetched again on next access."""
+        self._loaded = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.record_id!r}, {self.name!r})"
+
+
+class LazyStudent(LazyRecord):
+    """A lazily loaded student; see :class:`LazyRecord`.
+
+    ``age`` and ``_email`` are fetched together on first access, and
+    ``registered_courses`` is a tuple of :class:`LazyCourse`.
+    """
+
+    __slots__ = ("student_id",)
+
+    _TABLE = "student"
+    _KEY = "student_id"
+    _SELECT_ALL = "SELECT student_id, name FROM student"
+    _COLUMNS = {"age": "age", "_email": "email"}
+    _RELATIONS = {
+        "registered_courses": ("LazyCourse", '''
+            SELECT course.course_id, course.course_name
+            FROM registration
+            JOIN course ON course.course_id = registration.course_id
+            WHERE registration.student_id = ?
+        ''', True),
+    }
+
+
+class LazyInstructor(LazyRecord):
+    """A lazily loaded instructor; see :class:`LazyRecord`.
+
+    ``age`` and ``_email`` are fetched together on first access, and
+    ``assigned_courses`` is a tuple of :class:`LazyCourse`.
+    """
+
+    __slots__ = ("instructor_id",)
+
+    _TABLE = "instructor"
+    _KEY = "instructor_id"
+    _SELECT_ALL = "SELECT instructor_id, name FROM instructor"
+    _COLUMNS = {"age": "age", "_email": "email"}
+    _RELATIONS = {
+        "assigned_courses": ("LazyCourse",
+                             "SELECT course_id, course_name FROM course WHERE instructor_id = ?", True),
+    }
+
+
+class LazyCourse(LazyRecord):
+    """A lazily loaded course; see :class:`LazyRecord`.
+
+    ``course_name`` is an alias of ``name``. The instructor is read
+    together with the course by :meth:`load_all`, since the record views
+    show it; ``enrolled_students`` is a tuple of :class:`LazyStudent`.
+    """
+
+    __slots__ = ("course_id",)
+
+    _TABLE = "course"
+    _KEY = "course_id"
+    _SELECT_ALL = '''
+        SELECT course.course_id, course.course_name, instructor.instructor_id, instructor.name
+        FROM course
+        LEFT JOIN instructor ON course.instructor_id = instructor.instructor_id
+    '''
+    _RELATIONS = {
+        "instructor": ("LazyInstructor", '''
+            SELECT instructor.instructor_id, instructor.name
+            FROM course
+            JOIN instructor ON course.instructor_id = instructor.instructor_id
+            WHERE course.course_id = ?
+        ''', False),
+        "enrolled_students": ("LazyStudent", '''
+            SELECT student.student_id, student.name
+            FROM registration
+            JOIN student ON student.student_id = registration.student_id
+            WHERE registration.course_id = ?
+        ''', True),
+    }
+
+    @property
+    def course_name(self):
+        """str: The name of the course."""
+        return self.name
+
+    @classmethod
+    def from_row(cls, row, db_name='school.db'):
+        """Build a proxy from an ``(id, name)`` or ``(id, name, instructor_id, instructor_name)`` row."""
+        if len(row) == 2:
+            return cls(row[0], row[1], db_name)
+        instructor = LazyInstructor(row[2], row[3], db_name) if row[2] is not None else None
+        return cls(row[0], row[1], db_name, instructor=instructor)
+
+
+# Proxy classes by name, for resolving relationships.
+_PROXY_CLASSES = {
+    "LazyStudent": LazyStudent,
+    "LazyInstructor": LazyInstructor,
+    "LazyCourse": LazyCourse,
+}
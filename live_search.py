@@ -0,0 +1,107 @@
+import sqlite3
+import threading
+from database import open_read_only
+
+# How long typing must pause before a search runs, in milliseconds.
+DEBOUNCE_MS = 250
+
+
+class LiveSearch:
+    """Run search-as-you-type queries so that only the latest one counts.
+
+    Every search starts with :meth:`begin`, which returns a new generation
+    token and interrupts the query still running for an older token with
+    ``Connection.interrupt()``. While a query runs, SQLite's progress
+    handler checks every ``check_every`` virtual machine instructions
+    whether its token is still the latest and aborts it otherwise, and a
+    query queued behind a newer search returns without running. A stale
+    search returns None, so only the result of the latest search reaches
+    the view.
+
+    All searches share one read-only connection, used by one query at a
+    time, so :meth:`run` may be called from worker threads while
+    :meth:`begin` is called from the GUI thread.
+
+    Example::
+
+        live_search = LiveSearch()
+        token = live_search.begin()
+        rows = live_search.run(token, "SELECT name FROM student WHERE name LIKE ?", ("%an%",))
+        if rows is not None:
+            show(rows)
+    """
+
+    # Virtual machine instructions between two checks of the token.
+    CHECK_EVERY = 1000
+
+    def __init__(self, db_name='school.db', check_every=CHECK_EVERY):
+        """Initialize a live search; the connection is opened by the first search.
+
+        Args:
+            db_name (str): The name of the database file. Defaults to 'school.db'.
+            check_every (int): Virtual machine instructions between two checks
+                of the token. Defaults to `CHECK_EVERY`.
+        """
+        self.db_name = db_name
+        self.check_every = check_every
+        self._generation = 0
+        self._conn = None
+        # Serializes the queries on the shared connection
+        self._lock = threading.Lock()
+
+    def begin(self):
+        """Start a new search, making every earlier one stale.
+
+        Returns:
+            int: The token to pass to :meth:`run` and :meth:`is_current`.
+        """
+        self._generation += 1
+        conn = self._conn
+        if conn is not None:
+            # Stop the stale query now instead of at its next progress check
+            conn.interrupt()
+        return self._generation
+
+    def is_current(self, token):
+        """Return True if no search has begun since the one with this token."""
+        return token == self._generation
+
+    def run(self, token, sql, params=()):
+        """Run the query of a search unless a newer search has begun.
+
+        Args:
+            token (int): The token returned by :meth:`begin`.
+            sql (str): The SELECT statement.
+            params (tuple): The statement parameters. Defaults to ().
+
+        Returns:
+            list or None: The result rows, or None if the search became stale.
+
+        Raises:
+            sqlite3.Error: If the query of the latest search fails.
+        """
+        with self._lock:
+            if not self.is_current(token):
+                return None
+            if self._conn is None:
+                self._conn = open_read_only(self.db_name)
+            conn = self._conn
+            conn.set_progress_handler(lambda: not self.is_current(token), self.check_every)
+            try:
+                rows = conn.execute(sql, params).fetchall()
+            except sqlite3.OperationalError:
+                # An interrupted or aborted query raises "interrupted"
+                if self.is_current(token):
+                    raise
+                return None
+            finally:
+                conn.set_progress_handler(None, 0)
+        return rows if self.is_current(token) else None
+
+    def close(self):
+        """Stop the running query and close the connection."""
+        self.begin()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,170 @@
+from database import get_connection
+
+# Ordered schema migrations as (version, description, statements). The
+# database records the last applied version in PRAGMA user_version. Never
+# edit a released migration; append a new one instead.
+MIGRATIONS = [
+    (1, "Base schema", [
+        '''
+        CREATE TABLE IF NOT EXISTS person (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            email TEXT NOT NULL UNIQUE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS student (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            email TEXT NOT NULL,
+            student_id INTEGER NOT NULL UNIQUE,
+            FOREIGN KEY (name, email) REFERENCES person (name, email)
+            ON DELETE CASCADE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS instructor (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            email TEXT NOT NULL,
+            instructor_id INTEGER NOT NULL UNIQUE,
+            FOREIGN KEY (name, email) REFERENCES person (name, email)
+            ON DELETE CASCADE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS course (
+            course_id INTEGER PRIMARY KEY,
+            course_name TEXT NOT NULL,
+            instructor_id INTEGER,
+            FOREIGN KEY (instructor_id) REFERENCES instructor (instructor_id)
+            ON DELETE SET NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS registration (
+            student_id INTEGER,
+            course_id INTEGER,
+            PRIMARY KEY (student_id, course_id),
+            FOREIGN KEY (student_id) REFERENCES student (student_id) ON DELETE CASCADE,
+            FOREIGN KEY (course_id) REFERENCES course (course_id) ON DELETE CASCADE
+        )
+        ''',
+    ]),
+    (2, "Indexes for rosters, instructor lookups and name searches", [
+        "CREATE INDEX IF NOT EXISTS idx_registration_course_id ON registration (course_id)",
+        "CREATE INDEX IF NOT EXISTS idx_course_instructor_id ON course (instructor_id)",
+        "CREATE INDEX IF NOT EXISTS idx_student_name ON student (name)",
+        "CREATE INDEX IF NOT EXISTS idx_instructor_name ON instructor (name)",
+    ]),
+    (3, "Trigram full-text indexes for substring searches", [
+        # One FTS5 table per searched table, keyed by the record's ID and kept
+        # in sync by triggers. The tables hold their own copy of the text, so
+        # the insert trigger can also drop the entry of a row removed by
+        # INSERT OR REPLACE, which fires no delete trigger.
+        # student: name, email
+        "CREATE VIRTUAL TABLE IF NOT EXISTS student_search USING fts5(name, email, tokenize='trigram')",
+        '''
+        CREATE TRIGGER IF NOT EXISTS student_search_insert AFTER INSERT ON student BEGIN
+            DELETE FROM student_search WHERE rowid = new.student_id;
+            INSERT INTO student_search (rowid, name, email) VALUES (new.student_id, new.name, new.email);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS student_search_update AFTER UPDATE OF student_id, name, email ON student BEGIN
+            DELETE FROM student_search WHERE rowid = old.student_id;
+            INSERT INTO student_search (rowid, name, email) VALUES (new.student_id, new.name, new.email);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS student_search_delete AFTER DELETE ON student BEGIN
+            DELETE FROM student_search WHERE rowid = old.student_id;
+        END
+        ''',
+        "INSERT INTO student_search (rowid, name, email) SELECT student_id, name, email FROM student",
+        # instructor: name
+        "CREATE VIRTUAL TABLE IF NOT EXISTS instructor_search USING fts5(name, tokenize='trigram')",
+        '''
+        CREATE TRIGGER IF NOT EXISTS instructor_search_insert AFTER INSERT ON instructor BEGIN
+            DELETE FROM instructor_search WHERE rowid = new.instructor_id;
+            INSERT INTO instructor_search (rowid, name) VALUES (new.instructor_id, new.name);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS instructor_search_update AFTER UPDATE OF instructor_id, name ON instructor BEGIN
+            DELETE FROM instructor_search WHERE rowid = old.instructor_id;
+            INSERT INTO instructor_search (rowid, name) VALUES (new.instructor_id, new.name);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS instructor_search_delete AFTER DELETE ON instructor BEGIN
+            DELETE FROM instructor_search WHERE rowid = old.instructor_id;
+        END
+        ''',
+        "INSERT INTO instructor_search (rowid, name) SELECT instructor_id, name FROM instructor",
+        # course: course_name
+        "CREATE VIRTUAL TABLE IF NOT EXISTS course_search USING fts5(course_name, tokenize='trigram')",
+        '''
+        CREATE TRIGGER IF NOT EXISTS course_search_insert AFTER INSERT ON course BEGIN
+            DELETE FROM course_search WHERE rowid = new.course_id;
+            INSERT INTO course_search (rowid, course_name) VALUES (new.course_id, new.course_name);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS course_search_update AFTER UPDATE OF course_id, course_name ON course BEGIN
+            DELETE FROM course_search WHERE rowid = old.course_id;
+            INSERT INTO course_search (rowid, course_name) VALUES (new.course_id, new.course_name);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS course_search_delete AFTER DELETE ON course BEGIN
+            DELETE FROM course_search WHERE rowid = old.course_id;
+        END
+        ''',
+        "INSERT INTO course_search (rowid, course_name) SELECT course_id, course_name FROM course",
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(db_name='school.db'):
+    """Return the schema version recorded in the database.
+
+    Args:
+        db_name (str): The name of the database file. Defaults to 'school.db'.
+
+    Returns:
+        int: The last applied migration, or 0 for a new database.
+    """
+    return get_connection(db_name).execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db_name='school.db'):
+    """Apply every pending migration to the database.
+
+    Each migration runs in its own transaction together with the update of
+    ``PRAGMA user_version``, so an interrupted upgrade can simply be rerun.
+
+    Args:
+        db_name (str): The name of the database file. Defaults to 'school.db'.
+
+    Returns:
+        int: The schema version after migrating.
+    """
+    conn = get_connection(db_name)
+    for version, description, statements in MIGRATIONS:
+        if schema_version(db_name) >= version:
+            continue
+        with conn:
+            # Take the write lock first so concurrent migrators serialize.
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= version:
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version}")
+    return schema_version(db_name)
@@ -0,0 +1,62 @@
+from collections.abc import MutableSet
+
+
+class OrderedSet(MutableSet):
+    """A set that remembers the order in which items were added.
+
+    Membership tests, additions and removals are O(1), and iteration yields
+    the items in insertion order, like the list it replaces. ``append`` is
+    kept as an alias of ``add`` for code written against lists. Most
+    students and courses hold few or no relationships, so an empty set does
+    not allocate its backing dict until the first item is added.
+
+    Example::
+
+        courses = OrderedSet()
+        courses.add(math)
+        courses.add(math)  # Already present, ignored
+        math in courses    # True
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items=()):
+        """Initialize the set.
+
+        Args:
+            items (iterable, optional): The initial items, in order.
+                Duplicates are ignored.
+        """
+        self._items = dict.fromkeys(items) or None
+
+    def __contains__(self, item):
+        return self._items is not None and item in self._items
+
+    def __iter__(self):
+        return iter(self._items or ())
+
+    def __reversed__(self):
+        return reversed(self._items or {})
+
+    def __len__(self):
+        return len(self._items) if self._items is not None else 0
+
+    def add(self, item):
+        """Add an item at the end if it is not already present."""
+        if self._items is None:
+            self._items = {}
+        self._items[item] = None
+
+    append = add
+
+    def discard(self, item):
+        """Remove an item if it is present."""
+        if self._items is not None:
+            self._items.pop(item, None)
+
+    def clear(self):
+        """Remove every item."""
+        self._items = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self)!r})"
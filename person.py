@@ -1,10 +1,22 @@
 import sqlite3
-import re
 from prettytable import PrettyTable
+from database import get_connection, bulk_insert, BulkSaveResult
+from unit_of_work import current_unit_of_work
+from migrations import migrate
+from validation import is_valid_name, is_valid_email, person_errors
 
 class Person:
     """A class to represent a person with name, age, and email."""
 
+    # Slots instead of a per-instance __dict__ keep large loads compact.
+    __slots__ = ("name", "age", "_email", "__weakref__")
+
+    _TABLE = "person"
+    _INSERT_SQL = '''
+        INSERT INTO person (name, age, email) 
+        VALUES (?, ?, ?)
+    '''
+
     def __init__(self, name, age, email):
         """Initialize a Person instance.
 
@@ -17,17 +29,10 @@ class Person:
             ValueError: If the name is invalid, age is not a positive integer,
                         or email format is invalid.
         """
-        # Validate name
-        if not self.validate_name(name):
-            raise ValueError(f"Invalid name: '{name}'. Name should contain only alphabetic characters and spaces.")
-        
-        # Validate age
-        if not isinstance(age, int) or age <= 0:
-            raise ValueError("Age must be a positive integer.")
-        
-        # Validate email
-        if not self.validate_email(email):
-            raise ValueError(f"Invalid email format: '{email}'.")
+        # Validate name, age and email with the precompiled validators
+        errors = person_errors(name, age, email)
+        if errors:
+            raise ValueError(errors[0])
 
         self.name = name
         self.age = age
@@ -48,8 +53,7 @@ class Person:
             bool: True if the name is valid, otherwise False.
         """
         # Name validation: should contain only alphabets and spaces
-        pattern = r'^[A-Za-z\s]+$'
-        return re.match(pattern, name) is not None
+        return is_valid_name(name)
 
     @staticmethod
     def validate_email(email):
@@ -61,53 +65,74 @@ class Person:
         Returns:
             bool: True if the email format is valid, otherwise False.
         """
-        # Basic email validation using regex
-        pattern = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
-        return re.match(pattern, email) is not None
+        # Basic email validation using a precompiled regex
+        return is_valid_email(email)
 
     @classmethod
     def create_database(cls, db_name='school.db'):
-        """Create the database and the person table if they do not exist.
+        """Create the database and bring its schema up to date.
+
+        The tables and indexes for every model are owned by
+        :func:`migrations.migrate`, so calling this on any subclass prepares
+        the whole schema.
 
         Args:
             db_name (str): The name of the database file. Defaults to 'school.db'.
         """
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
-        # Create the person table
-        cursor.execute(''' 
-            CREATE TABLE IF NOT EXISTS person (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                age INTEGER NOT NULL,
-                email TEXT NOT NULL UNIQUE
-            )
-        ''')
-        conn.commit()
-        conn.close()
+        migrate(db_name)
 
     def save_to_db(self, db_name='school.db'):
-        """Save the current person instance to the database.
+        """Save the current instance to its table in the database.
 
         Args:
             db_name (str): The name of the database file. Defaults to 'school.db'.
         
         Prints:
             Error message if there is an IntegrityError during saving.
+
+        Inside a :class:`unit_of_work.UnitOfWork` the insert is queued and
+        written when the unit exits.
         """
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
+        uow = current_unit_of_work(db_name)
+        if uow is not None:
+            uow.add(self._TABLE, self._INSERT_SQL, self._db_row())
+            return
+
+        conn = get_connection(db_name)
         # Insert the person into the table
         try:
-            cursor.execute(''' 
-                INSERT INTO person (name, age, email) 
-                VALUES (?, ?, ?)
-            ''', (self.name, self.age, self._email))
-            conn.commit()
+            with conn:
+                conn.execute(self._INSERT_SQL, self._db_row())
         except sqlite3.IntegrityError as e:
             print(f"Error saving to database: {e}")
-        finally:
-            conn.close()
+
+    def _db_row(self):
+        """Return the parameters for ``_INSERT_SQL``."""
+        return (self.name, self.age, self._email)
+
+    @classmethod
+    def save_many(cls, items, db_name='school.db', chunk_size=1000):
+        """Save many instances in one transaction using ``executemany``.
+
+        Args:
+            items (iterable): The instances to save.
+            db_name (str): The name of the database file. Defaults to 'school.db'.
+            chunk_size (int): The number of rows written per batch. Defaults to 1000.
+
+        Returns:
+            BulkSaveResult: The number of inserted rows and the items that
+            failed an integrity check.
+
+        Inside a :class:`unit_of_work.UnitOfWork` the inserts are queued and
+        written when the unit exits, and the result is empty; an integrity
+        error then fails the whole unit instead of skipping the item.
+        """
+        uow = current_unit_of_work(db_name)
+        if uow is not None:
+            uow.add_many(cls._TABLE, cls._INSERT_SQL, map(cls._db_row, items))
+            return BulkSaveResult()
+
+        return bulk_insert(cls._INSERT_SQL, items, cls._db_row, db_name, chunk_size)
 
     @classmethod
     def show_all_records(cls, db_name='school.db'):
@@ -116,11 +141,8 @@ class Person:
         Args:
             db_name (str): The name of the database file. Defaults to 'school.db'.
         """
-        conn = sqlite3.connect(db_name)
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM person')
-        rows = cursor.fetchall()
-        conn.close()
+        conn = get_connection(db_name)
+        rows = conn.execute('SELECT * FROM person').fetchall()
 
         # Use PrettyTable to display the data in a tabular format
         table = PrettyTable()
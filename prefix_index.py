@@ -0,0 +1,118 @@
+from bisect import bisect_left, bisect_right
+
+# The number of matches a picker shows at a time.
+PICKER_LIMIT = 50
+
+
+class PrefixIndex:
+    """A sorted-key index answering "the first K items whose key starts with ..." queries.
+
+    Each item is filed under one or more keys, such as its name and its ID,
+    which are lowercased and kept in one sorted list. A prefix query finds
+    the first matching key with a binary search and reads the following
+    keys until it has ``limit`` items, so it costs the same however many
+    items there are. It backs pickers that only ever show the top matches
+    of what has been typed so far; one index can be shared by every picker
+    that lists the same records.
+
+    Example::
+
+        index = PrefixIndex()
+        for student in students:
+            index.add(student, student.name, str(student.student_id))
+        index.matches("an", limit=10)  # up to 10 students whose name or ID starts with "an"
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        # Sorted keys and, at the same positions, the numbers of their items
+        self._keys = []
+        self._numbers = []
+        self._items = {}
+        self._entries = {}
+        self._next_number = 0
+
+    def add(self, item, *keys):
+        """Index an item under some keys, replacing the keys it had before.
+
+        Args:
+            item: The item, which must be hashable; model objects are hashed by identity.
+            *keys (str): The texts the item can be found by.
+        """
+        self.discard(item)
+        number = self._register(item, keys)
+        for key in self._entries[item][1]:
+            position = bisect_right(self._keys, key)
+            self._keys.insert(position, key)
+            self._numbers.insert(position, number)
+
+    def update(self, entries):
+        """Index many items at once; faster than calling :meth:`add` for each.
+
+        Args:
+            entries (iterable): ``(item, keys)`` pairs, where ``keys`` is a tuple of strings.
+        """
+        added_keys, added_numbers = [], []
+        for item, item_keys in entries:
+            self.discard(item)
+            number = self._register(item, item_keys)
+            for key in self._entries[item][1]:
+                added_keys.append(key)
+                added_numbers.append(number)
+        keys = self._keys + added_keys
+        numbers = self._numbers + added_numbers
+        # A stable sort by key keeps equal keys in the order of their numbers
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._keys = [keys[position] for position in order]
+        self._numbers = [numbers[position] for position in order]
+
+    def _register(self, item, keys):
+        number = self._next_number
+        self._next_number += 1
+        self._items[number] = item
+        self._entries[item] = (number, tuple({key.lower() for key in keys}))
+        return number
+
+    def discard(self, item):
+        """Remove an item from the index if it is there."""
+        entry = self._entries.pop(item, None)
+        if entry is None:
+            return
+        number, keys = entry
+        del self._items[number]
+        for key in keys:
+            position = bisect_left(self._keys, key)
+            # Few items share a key, so the item is found within a few steps
+            while self._numbers[position] != number:
+                position += 1
+            del self._keys[position]
+            del self._numbers[position]
+
+    def clear(self):
+        """Remove every item from the index."""
+        self.__init__()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._entries
+
+    def matches(self, prefix, limit=PICKER_LIMIT):
+        """Return the first items with a key that starts with a prefix, ignoring case.
+
+        Args:
+            prefix (str): What has been typed so far. An empty prefix matches every item.
+            limit (int): The most items to return. Defaults to `PICKER_LIMIT`.
+
+        Returns:
+            list: Up to ``limit`` items, in the order of their first matching key.
+        """
+        prefix = prefix.lower()
+        keys, numbers = self._keys, self._numbers
+        found = {}
+        position = bisect_left(keys, prefix)
+        while position < len(keys) and len(found) < limit and keys[position].startswith(prefix):
+            found[numbers[position]] = None
+            position += 1
+        return [self._items[number] for number in found]
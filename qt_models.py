@@ -0,0 +1,391 @@
+from itertools import islice
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QObject, QVariant
+from PyQt5.QtWidgets import QComboBox
+from prefix_index import PICKER_LIMIT
+
+
+class _RowNumbers:
+    """
+    The row numbers of the keys of a table, kept cheap to update as rows are removed.
+
+    Each key keeps the slot it was given when its row was appended. Removing a row only marks its
+    slot as removed in a Fenwick tree, so the row number of a key, its slot minus the removed slots
+    before it, and a removal both take O(log n) time. The slots are renumbered once the removed
+    ones outnumber the rows left, which keeps the tree compact at an amortized constant cost.
+    """
+
+    def __init__(self, keys=()):
+        """
+        Initialize the row numbers of some keys, in row order.
+
+        Args:
+            keys (iterable, optional): The keys of the rows. Defaults to ().
+        """
+        self._slots = {}
+        # 1-based Fenwick tree of the removed slots; _tree[0] is unused
+        self._tree = [0]
+        self._removed = 0
+        for key in keys:
+            self.append(key)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def _removed_before(self, slot):
+        count = 0
+        while slot > 0:
+            count += self._tree[slot]
+            slot &= slot - 1
+        return count
+
+    def append(self, key):
+        """Give a key the row after the last one."""
+        position = len(self._tree)
+        # The node covers the slots (position - lowbit, position], all before this new one
+        self._tree.append(self._removed_before(position - 1)
+                          - self._removed_before(position & (position - 1)))
+        self._slots[key] = position - 1
+
+    def get(self, key):
+        """Return the row number of a key, or None if it has no row."""
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+        return slot - self._removed_before(slot)
+
+    def pop(self, key):
+        """Forget a key's row; return its row number, or None if it had no row."""
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return None
+        number = slot - self._removed_before(slot)
+        position = slot + 1
+        while position < len(self._tree):
+            self._tree[position] += 1
+            position += position & -position
+        self._removed += 1
+        return number
+
+    @property
+    def needs_compaction(self):
+        """bool: Whether the removed slots outnumber the rows left."""
+        return self._removed > len(self._slots)
+
+
+class RecordTableModel(QAbstractTableModel):
+    """
+    A table model that fetches its rows on demand as the view scrolls.
+
+    The records may be any iterable, such as a list, a generator or a cursor from
+    `database.stream_query`. Rows are pulled from it one page at a time through Qt's
+    `canFetchMore`/`fetchMore` protocol, so creating the model and showing the first screen
+    take the same time no matter how many rows the source holds.
+
+    Given a `key` function, the model can also add, update and remove single rows (see
+    `add_record`), so a view can apply one change instead of being rebuilt. A change to a row
+    that has not been fetched yet is applied when the row arrives from the source.
+
+    Attributes:
+        records (list): The rows fetched so far, each a list or tuple. A row may hold more
+            items than there are headers; the extra items are not displayed.
+        headers (list): A list of column headers for the table.
+        page_size (int): The number of rows fetched at a time.
+        key (callable): Maps a row to the key identifying its record, or None.
+    """
+
+    PAGE_SIZE = 256
+
+    def __init__(self, records, headers, parent=None, page_size=PAGE_SIZE, key=None):
+        """
+        Initialize the table model and fetch the first page of rows.
+
+        Args:
+            records (iterable): The rows of the table, each a list or tuple.
+            headers (list): The column headers for the table.
+            parent (QObject, optional): The parent of the table model. Defaults to None.
+            page_size (int, optional): The number of rows fetched at a time. Defaults to `PAGE_SIZE`.
+            key (callable, optional): Maps a row to the key identifying its record; required by
+                the methods that change single rows. Defaults to None.
+        """
+        super().__init__(parent)
+        self.headers = headers
+        self.page_size = page_size
+        self.key = key
+        self._source = iter(records)
+        self._exhausted = False
+        # The row number of each fetched key, and the changes to rows not fetched yet:
+        # the row to show instead, or None to drop it
+        self._row_numbers = _RowNumbers()
+        self._pending = {}
+        self.records = []
+        self.records = self._fetch(page_size)
+
+    def _fetch(self, count):
+        """Pull up to `count` rows from the source; return them with the pending changes applied."""
+        rows = list(islice(self._source, count))
+        if len(rows) < count:
+            self.close()
+        if self.key is None:
+            return rows
+
+        fetched = []
+        for row in rows:
+            key = self.key(row)
+            if key in self._pending:
+                row = self._pending.pop(key)
+                if row is None:
+                    continue
+            elif key in self._row_numbers:
+                # Already added by `add_record`
+                continue
+            self._row_numbers.append(key)
+            fetched.append(row)
+        return fetched
+
+    def rowCount(self, parent=None):
+        """
+        Return the number of rows fetched so far.
+
+        Args:
+            parent (QModelIndex, optional): The parent index; a table has no children. Defaults to None.
+
+        Returns:
+            int: The number of fetched rows.
+        """
+        if parent is not None and parent.isValid():
+            return 0
+        return len(self.records)
+
+    def columnCount(self, parent=None):
+        """
+        Return the number of columns in the table.
+
+        Args:
+            parent (QModelIndex, optional): The parent index, not used here. Defaults to None.
+
+        Returns:
+            int: The number of columns in the table, based on the length of the headers list.
+        """
+        return len(self.headers)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        """
+        Return True while the source may still hold rows that were not fetched.
+
+        Args:
+            parent (QModelIndex): The parent index; only the root can fetch more.
+        """
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        """
+        Fetch the next page of rows and append them to the table.
+
+        Args:
+            parent (QModelIndex): The parent index; only the root can fetch more.
+        """
+        if parent.isValid() or self._exhausted:
+            return
+        rows = self._fetch(self.page_size)
+        if rows:
+            first = len(self.records)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self.records.extend(rows)
+            self.endInsertRows()
+
+    def record(self, row):
+        """
+        Return a fetched row.
+
+        Args:
+            row (int): The row number.
+
+        Returns:
+            list or tuple: The full row, including any items that are not displayed.
+        """
+        return self.records[row]
+
+    def close(self):
+        """Stop fetching and release the source, e.g. the database cursor behind it."""
+        self._exhausted = True
+        self._pending.clear()
+        close = getattr(self._source, "close", None)
+        if close is not None:
+            close()
+
+    def add_record(self, row):
+        """
+        Append a row for a new record, or update the row of its record if the table has one.
+
+        Args:
+            row (list or tuple): The row to add.
+        """
+        key = self.key(row)
+        if key in self._row_numbers:
+            self.update_record(row)
+            return
+        # The source may still hold an older row of the record; it is skipped when fetched
+        self._pending.pop(key, None)
+        number = len(self.records)
+        self.beginInsertRows(QModelIndex(), number, number)
+        self.records.append(row)
+        self._row_numbers.append(key)
+        self.endInsertRows()
+
+    def update_record(self, row):
+        """
+        Replace the row of a record; does nothing if the table does not hold the record.
+
+        Args:
+            row (list or tuple): The new row, with the same key as the old one.
+        """
+        key = self.key(row)
+        number = self._row_numbers.get(key)
+        if number is None:
+            if not self._exhausted:
+                self._pending[key] = row
+            return
+        self.records[number] = row
+        self.dataChanged.emit(self.index(number, 0), self.index(number, len(self.headers) - 1))
+
+    def remove_record(self, key):
+        """
+        Remove the row of a record; does nothing if the table does not hold the record.
+
+        The rows after it move up without being renumbered one by one (see `_RowNumbers`).
+
+        Args:
+            key: The key of the record.
+        """
+        number = self._row_numbers.pop(key)
+        if number is None:
+            if not self._exhausted:
+                self._pending[key] = None
+            return
+        self.beginRemoveRows(QModelIndex(), number, number)
+        del self.records[number]
+        if self._row_numbers.needs_compaction:
+            self._row_numbers = _RowNumbers(map(self.key, self.records))
+        self.endRemoveRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        """
+        Provide data for the given index and role.
+
+        Args:
+            index (QModelIndex): The index of the cell that needs data.
+            role (Qt.ItemDataRole): The role for which data is requested (e.g., display role).
+
+        Returns:
+            QVariant: The data for the requested index and role, or an invalid QVariant if
+            the index is invalid or the role is not supported.
+        """
+        if not index.isValid():
+            return QVariant()
+
+        record = self.records[index.row()]
+        if role == Qt.DisplayRole:
+            return QVariant(record[index.column()])
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        """
+        Provide header data for the table, either for rows or columns.
+
+        Args:
+            section (int): The section (row or column) number for which header data is requested.
+            orientation (Qt.Orientation): The orientation (horizontal or vertical) of the header.
+            role (Qt.ItemDataRole): The role for which the header data is requested.
+
+        Returns:
+            QVariant: The header data for the requested section and role, or an invalid QVariant
+            if the role or orientation is not supported.
+        """
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return QVariant(self.headers[section])
+        return QVariant()
+
+
+class PrefixPicker(QObject):
+    """
+    Turns a combo box into a filterable picker over a `prefix_index.PrefixIndex`.
+
+    The combo box becomes editable and only ever holds the first `limit` records whose name or
+    ID starts with the typed text; they are looked up again on every edit instead of adding every
+    record to the combo box up front. The first match becomes the current item, so `currentData()`
+    returns its data until the user picks another one from the list; an item that was current
+    stays current as long as it is still listed.
+
+    Attributes:
+        combo (QComboBox): The combo box, which is also the parent of the picker.
+        index (PrefixIndex): The records to pick from; it may be shared with other pickers.
+        label (callable): Maps a record to the text shown for it.
+        data (callable): Maps a record to the data stored with its item.
+        limit (int): The most records shown at a time.
+    """
+
+    def __init__(self, combo, index, label, data=None, limit=PICKER_LIMIT):
+        """
+        Initialize the picker and fill the combo box with the first records of the index.
+
+        Args:
+            combo (QComboBox): The combo box to manage.
+            index (PrefixIndex): The records to pick from.
+            label (callable): Maps a record to the text shown for it.
+            data (callable, optional): Maps a record to its item data. Defaults to None, which
+                stores the record itself.
+            limit (int, optional): The most records shown at a time. Defaults to `PICKER_LIMIT`.
+        """
+        super().__init__(combo)
+        self.combo = combo
+        self.index = index
+        self.label = label
+        self.data = data if data is not None else (lambda record: record)
+        self.limit = limit
+
+        combo.setEditable(True)
+        combo.setInsertPolicy(QComboBox.NoInsert)
+        # The items change as the user types, so Qt's own completion would fight the filter
+        combo.setCompleter(None)
+        # Only edits by the user filter the list; picking an item sets the text without one
+        combo.lineEdit().textEdited.connect(self.refresh)
+        self.refresh()
+
+    def set_index(self, index):
+        """
+        Pick from another index, e.g. one rebuilt after the records were reloaded.
+
+        Args:
+            index (PrefixIndex): The records to pick from.
+        """
+        self.index = index
+        self.refresh()
+
+    def refresh(self, text=None):
+        """
+        Replace the items with the first matches of the typed text, keeping the text itself.
+
+        The current item stays current if it is among the new matches.
+
+        Args:
+            text (str, optional): The text to match. Defaults to None, the current text.
+        """
+        combo = self.combo
+        line_edit = combo.lineEdit()
+        if text is None:
+            text = combo.currentText()
+        cursor = line_edit.cursorPosition()
+        selected = combo.currentData()
+
+        combo.blockSignals(True)
+        try:
+            combo.clear()
+            for record in self.index.matches(text, self.limit):
+                combo.addItem(self.label(record), self.data(record))
+            position = combo.findData(selected) if selected is not None else -1
+            if position >= 0:
+                combo.setCurrentIndex(position)
+            combo.setEditText(text)
+            line_edit.setCursorPosition(cursor)
+        finally:
+            combo.blockSignals(False)
@@ -0,0 +1,164 @@
+import sys
+import threading
+from collections import OrderedDict
+from database import stream_query
+
+# The most memory the cached rows may use, in bytes.
+MAX_BYTES = 32 * 1024 * 1024
+
+# The tables a cached query may read; a write to one of them invalidates the queries reading it.
+TABLES = ("student", "instructor", "course", "registration")
+
+# Rows between two measurements of a row's size; the rows in between count as the same size.
+SIZE_SAMPLE_EVERY = 64
+
+
+def _row_size(row):
+    """Estimate the memory used by a result row and its values, in bytes."""
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+
+
+class QueryCache:
+    """A read-through cache of query results, invalidated per table.
+
+    Results are kept by their SQL and parameters, and each one records the
+    tables its query reads. Writing to a table invalidates the results that
+    read it, through :meth:`invalidate`; the cache does not see the writes
+    itself, so every writer to the database must report them. A result that
+    is not cached is streamed from the database, and kept once every one of
+    its rows has been read; a result whose rows are closed before then is
+    not kept. The results least recently used are evicted once the cached
+    rows would use more than ``max_bytes``. A result that alone is larger
+    than that is streamed without being kept, and later fetches of it
+    stream too until one of its tables is invalidated.
+
+    Queries run on a dedicated read-only connection (see
+    `database.stream_query`). :meth:`fetch` may be called, and its rows
+    read, from worker threads while :meth:`invalidate` is called from the
+    GUI thread; a result read while one of its tables was invalidated is
+    returned but not kept.
+
+    Example::
+
+        cache = QueryCache()
+        rows = list(cache.fetch("SELECT student_id, name FROM student", tables=("student",)))
+        rows = list(cache.fetch("SELECT student_id, name FROM student", tables=("student",)))  # from memory
+        cache.invalidate("student")  # after writing to the student table
+    """
+
+    def __init__(self, db_name='school.db', max_bytes=MAX_BYTES):
+        """Initialize an empty cache.
+
+        Args:
+            db_name (str): The name of the database file. Defaults to 'school.db'.
+            max_bytes (int): The most memory the cached rows may use. Defaults to `MAX_BYTES`.
+        """
+        self.db_name = db_name
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        # ``(sql, params)`` mapped to ``(rows, tables, size)``, least recently used first
+        self._entries = OrderedDict()
+        # The keys of the results too large to keep, mapped to their tables
+        self._too_large = {}
+        # Incremented by every invalidation of a table
+        self._versions = dict.fromkeys(TABLES, 0)
+        self._lock = threading.Lock()
+
+    def fetch(self, sql, params=(), tables=TABLES):
+        """Return the rows of a query, reading them from the database only if they are not cached.
+
+        Args:
+            sql (str): The SELECT statement.
+            params (tuple): The statement parameters. Defaults to ().
+            tables (tuple): The tables the query reads. Defaults to `TABLES`.
+
+        Returns:
+            iterator: The result rows. Rows not cached yet are streamed as they
+            are read; closing the iterator (if it has a ``close`` method) before
+            the last row closes the query.
+        """
+        key = (sql, tuple(params))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return iter(entry[0])
+            self.misses += 1
+            too_large = key in self._too_large
+            versions = self._versions_of(tables)
+
+        rows = stream_query(sql, params, self.db_name)
+        if too_large:
+            return rows
+        return self._read_through(key, rows, tables, versions)
+
+    def _read_through(self, key, rows, tables, versions):
+        """Yield streamed rows, keeping them to store once the last one has been read."""
+        try:
+            kept, size, row_size = [], 0, 0
+            for row in rows:
+                yield row
+                if len(kept) % SIZE_SAMPLE_EVERY == 0:
+                    row_size = _row_size(row)
+                kept.append(row)
+                size += row_size
+                if size > self.max_bytes:
+                    with self._lock:
+                        if versions == self._versions_of(tables):
+                            self._too_large[key] = tables
+                    kept.clear()
+                    yield from rows
+                    return
+        finally:
+            rows.close()
+
+        self._store(key, tuple(kept), tables, versions, size)
+
+    def _versions_of(self, tables):
+        return [self._versions.get(table, 0) for table in tables]
+
+    def _store(self, key, rows, tables, versions, size):
+        with self._lock:
+            if versions != self._versions_of(tables):
+                return  # A table was written to while the rows were read
+            replaced = self._entries.pop(key, None)
+            if replaced is not None:
+                self.size -= replaced[2]
+            self._entries[key] = (rows, tuple(tables), size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def invalidate(self, *tables):
+        """Drop the results of the queries reading any of some tables.
+
+        Args:
+            *tables (str): The tables written to. Defaults to every table in `TABLES`.
+        """
+        tables = set(tables or TABLES)
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+            for key, (_, entry_tables, size) in list(self._entries.items()):
+                if tables.intersection(entry_tables):
+                    del self._entries[key]
+                    self.size -= size
+            for key, entry_tables in list(self._too_large.items()):
+                if tables.intersection(entry_tables):
+                    del self._too_large[key]
+
+    def clear(self):
+        """Drop every cached result."""
+        with self._lock:
+            for table in self._versions:
+                self._versions[table] += 1
+            self._entries.clear()
+            self._too_large.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+from migrations import migrate
+from student import Student
+from instructor import Instructor
+from course import Course
+from enrollment import enroll
+from change_tracking import ModelChangeTracker
+from data_manager import save_data, save_changes, load_data
+
+
+class RekeyJournalTest(unittest.TestCase):
+    """Changing an ID and journaling the change must keep the relationships of a full save."""
+
+    def setUp(self):
+        # Courses write their instructor to school.db, so work in a scratch directory
+        self._cwd = os.getcwd()
+        self._dir = tempfile.TemporaryDirectory()
+        os.chdir(self._dir.name)
+        migrate()
+        self.filename = "school_data.json"
+
+        instructor = Instructor("Ian", 40, "ian@example.com", 1)
+        course = Course(10, "Math", instructor)
+        instructor.assign_course(course)
+        student = Student("Ann", 20, "ann@example.com", 100)
+        enroll(student, course)
+        save_data(self.filename, [instructor], [student], [course])
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._dir.cleanup()
+
+    def _journal_rekey(self, section, old_id, new_id):
+        changes = ModelChangeTracker()
+        with changes:
+            instructors, students, courses = load_data(self.filename, changes=changes)
+            records = {"instructors": instructors, "courses": courses}[section]
+            obj = records[old_id]
+            setattr(obj, obj._KEY, new_id)
+            journaled = not save_changes(self.filename, list(instructors.values()),
+                                         list(students.values()), list(courses.values()), changes)
+        self.assertTrue(journaled)
+        return load_data(self.filename)
+
+    def test_rekeyed_instructor_keeps_its_courses(self):
+        instructors, _, courses = self._journal_rekey("instructors", 1, 2)
+        self.assertEqual(list(instructors), [2])
+        self.assertIs(courses[10].instructor, instructors[2])
+        self.assertEqual([course.course_id for course in instructors[2].assigned_courses], [10])
+
+    def test_rekeyed_course_keeps_its_enrollments(self):
+        instructors, students, courses = self._journal_rekey("courses", 10, 11)
+        self.assertEqual(list(courses), [11])
+        self.assertEqual([course.course_id for course in students[100].registered_courses], [11])
+        self.assertEqual([student.student_id for student in courses[11].enrolled_students], [100])
+        self.assertIs(courses[11].instructor, instructors[1])
+        self.assertEqual([course.course_id for course in instructors[1].assigned_courses], [11])
+
+
+if __name__ == "__main__":
+    unittest.main()
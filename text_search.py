@@ -0,0 +1,60 @@
+# The trigram full-text index of each searchable table (see migration 3):
+# the FTS5 table, the ID column its rowids hold, and its indexed columns.
+SEARCH_INDEXES = {
+    "student": ("student_search", "student_id", ("name", "email")),
+    "instructor": ("instructor_search", "instructor_id", ("name",)),
+    "course": ("course_search", "course_id", ("course_name",)),
+}
+
+# The trigram tokenizer only indexes terms of at least three characters.
+MIN_TERM_LENGTH = 3
+
+
+def _escape_like(term):
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def contains_filter(table, term, columns=None):
+    """Return a condition matching the rows of a table whose text contains a term.
+
+    Terms of at least `MIN_TERM_LENGTH` characters are looked up in the
+    table's trigram index, which answers in milliseconds however large the
+    table is. Shorter terms fall back to a ``LIKE`` scan of the table. Both
+    ignore case, and both treat every character of the term literally.
+
+    Example::
+
+        condition, params = contains_filter("student", "ann")
+        conn.execute(f"SELECT student_id, name FROM student WHERE {condition}", params)
+
+    Args:
+        table (str): "student", "instructor" or "course".
+        term (str): The text to look for.
+        columns (tuple of str, optional): The indexed columns to search.
+            Defaults to None, which searches every indexed column; for
+            students, that is the name and the email.
+
+    Returns:
+        tuple: The SQL condition, which refers to the table by its name, and its parameters.
+
+    Raises:
+        ValueError: If the table or a column is not indexed.
+    """
+    if table not in SEARCH_INDEXES:
+        raise ValueError(f"No search index for table: '{table}'.")
+    index, id_column, indexed_columns = SEARCH_INDEXES[table]
+    if columns is None:
+        columns = indexed_columns
+    for column in columns:
+        if column not in indexed_columns:
+            raise ValueError(f"Column '{column}' of '{table}' is not indexed.")
+
+    if len(term) >= MIN_TERM_LENGTH:
+        # A quoted phrase, so the term is never parsed as a query
+        phrase = '"' + term.replace('"', '""') + '"'
+        query = "{" + " ".join(columns) + "} : " + phrase
+        return f"{table}.{id_column} IN (SELECT rowid FROM {index} WHERE {index} MATCH ?)", (query,)
+
+    pattern = f"%{_escape_like(term)}%"
+    condition = " OR ".join(f"{table}.{column} LIKE ? ESCAPE '\\'" for column in columns)
+    return f"({condition})", (pattern,) * len(columns)
@@ -0,0 +1,130 @@
+from array import array
+from collections import defaultdict
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """An incremental in-memory substring index over short texts such as names.
+
+    Each item is indexed under every three-character slice of its lowercased
+    text. A search for a term of three or more characters only checks the
+    items filed under the rarest trigram of the term, instead of every item.
+    Shorter terms fall back to a scan of the precomputed lowercased texts.
+
+    Items are numbered in the order they are added, and postings are typed
+    arrays of those numbers. Removing an item only marks its number as free;
+    the postings are rebuilt once most numbers are free.
+
+    Example::
+
+        index = TrigramIndex()
+        for student in students:
+            index.add(student, student.name)
+        index.search("ann")  # the students whose name contains "ann"
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._items = []
+        self._texts = []
+        self._number_of = {}
+        self._postings = {}
+        self._removed = 0
+
+    def add(self, item, text):
+        """Index an item under a text, replacing the text it had before.
+
+        Args:
+            item: The item, which must be hashable; model objects are hashed by identity.
+            text (str): The text to search the item by.
+        """
+        self.update([(item, text)])
+
+    def update(self, pairs):
+        """Index many items at once; faster than calling :meth:`add` for each.
+
+        Args:
+            pairs (iterable): ``(item, text)`` pairs, as for :meth:`add`.
+        """
+        new_postings = defaultdict(list)
+        items, texts, number_of = self._items, self._texts, self._number_of
+        for item, text in pairs:
+            self._forget(item)
+            number = len(items)
+            text = text.lower()
+            items.append(item)
+            texts.append(text)
+            number_of[item] = number
+            for trigram in _trigrams(text):
+                new_postings[trigram].append(number)
+
+        postings = self._postings
+        for trigram, numbers in new_postings.items():
+            posting = postings.get(trigram)
+            if posting is None:
+                postings[trigram] = array('I', numbers)
+            else:
+                posting.extend(numbers)
+        self._compact_if_sparse()
+
+    def discard(self, item):
+        """Remove an item from the index if it is there."""
+        self._forget(item)
+        self._compact_if_sparse()
+
+    def _forget(self, item):
+        number = self._number_of.pop(item, None)
+        if number is not None:
+            self._items[number] = None
+            self._texts[number] = None
+            self._removed += 1
+
+    def _compact_if_sparse(self):
+        if self._removed > 1024 and self._removed * 2 > len(self._items):
+            self._compact()
+
+    def clear(self):
+        """Remove every item from the index."""
+        self.__init__()
+
+    def _compact(self):
+        """Renumber the remaining items and rebuild the postings without the removed ones."""
+        live = [(item, text) for item, text in zip(self._items, self._texts) if text is not None]
+        self.clear()
+        self.update(live)
+
+    def __len__(self):
+        return len(self._number_of)
+
+    def __contains__(self, item):
+        return item in self._number_of
+
+    def search(self, term):
+        """Return the items whose text contains a term, ignoring case.
+
+        Args:
+            term (str): The text to look for. An empty term matches every item.
+
+        Returns:
+            list: The matching items, in the order they were last added.
+        """
+        term = term.lower()
+        items, texts = self._items, self._texts
+        if len(term) < 3:
+            return [items[number] for number, text in enumerate(texts)
+                    if text is not None and term in text]
+
+        postings = []
+        for trigram in _trigrams(term):
+            posting = self._postings.get(trigram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        # Every match is filed under each trigram of the term; check the
+        # candidates of the rarest one, whose numbers are in ascending order.
+        candidates = min(postings, key=len)
+        return [items[number] for number in candidates
+                if texts[number] is not None and term in texts[number]]
@@ -1,42 +1,19 @@
 import sys
-import json
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
     QLabel, QLineEdit, QPushButton, QComboBox, QRadioButton, QButtonGroup, QTableView,
-    QTabWidget, QDialog, QDialogButtonBox, QMessageBox
+    QTabWidget, QMessageBox
 )
-from PyQt5.QtCore import Qt, QAbstractTableModel, QVariant
-from PyQt5.QtGui import QColor
 from student import Student
 from instructor import Instructor
 from course import Course
-from data_manager import save_data, load_data
-
-class RecordTableModel(QAbstractTableModel):
-    def __init__(self, records, headers, parent=None):
-        super().__init__(parent)
-        self.records = records
-        self.headers = headers
-
-    def rowCount(self, parent=None):
-        return len(self.records)
-
-    def columnCount(self, parent=None):
-        return len(self.headers)
-
-    def data(self, index, role=Qt.DisplayRole):
-        if not index.isValid():
-            return QVariant()
-
-        record = self.records[index.row()]
-        if role == Qt.DisplayRole:
-            return QVariant(record[index.column()])
-        return QVariant()
-
-    def headerData(self, section, orientation, role=Qt.DisplayRole):
-        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
-            return QVariant(self.headers[section])
-        return QVariant()
+from data_manager import save_changes, load_data
+from identity_map import IdentityMap
+from change_tracking import ModelChangeTracker
+from qt_models import RecordTableModel, PrefixPicker
+from trigram_index import TrigramIndex
+from prefix_index import PrefixIndex
+from events import EventBus, RecordInserted, RecordUpdated, RecordDeleted
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -47,8 +24,33 @@ class MainWindow(QMainWindow):
         self.students = []
         self.instructors = []
         self.courses = []
+        # The objects of this window by ID; also rejects duplicate IDs
+        self.identity_map = IdentityMap()
+        # What changed since the data was last loaded or saved; edits are recorded while
+        # the event loop runs
+        self.changes = ModelChangeTracker()
+        # Substring indexes of the names searched in the View Records tab
+        self.student_index = TrigramIndex()
+        self.instructor_index = TrigramIndex()
+        self.course_index = TrigramIndex()
+        # Name and ID prefix indexes of the records offered by the dropdowns
+        self.student_picks = PrefixIndex()
+        self.instructor_picks = PrefixIndex()
+        self.course_picks = PrefixIndex()
+        # The search index, pick index and name attribute of each kind of record
+        self.indexes = {
+            "student": (self.student_index, self.student_picks, "name"),
+            "instructor": (self.instructor_index, self.instructor_picks, "name"),
+            "course": (self.course_index, self.course_picks, "course_name"),
+        }
+        # Whether the table shows search results rather than every record
+        self.view_filtered = False
+        # Changes publish an event; the indexes, the view and the dropdowns apply just that change
+        self.events = EventBus()
 
         self.initUI()
+        self.events.subscribe(self.apply_to_indexes)
+        self.events.subscribe(self.apply_to_view)
 
     def initUI(self):
         # Create tabs
@@ -77,6 +79,22 @@ class MainWindow(QMainWindow):
         self.initAssignTab()
         self.initViewTab()
 
+        # The dropdowns only hold the first matches of what has been typed into them
+        instructor_label = lambda instructor: instructor.name
+        student_label = lambda student: student.name
+        course_label = lambda course: course.course_name
+        self.pickers = {
+            "instructor": [
+                PrefixPicker(self.course_instructor_combo, self.instructor_picks, instructor_label),
+                PrefixPicker(self.instructor_combo, self.instructor_picks, instructor_label),
+            ],
+            "student": [PrefixPicker(self.student_combo, self.student_picks, student_label)],
+            "course": [
+                PrefixPicker(self.course_combo, self.course_picks, course_label),
+                PrefixPicker(self.course_combo_assign, self.course_picks, course_label),
+            ],
+        }
+
     def initStudentTab(self):
         layout = QVBoxLayout()
         
@@ -226,37 +244,64 @@ class MainWindow(QMainWindow):
         
         self.view_tab.setLayout(layout)
 
-    def update_treeview(self):
-        headers = ["ID", "Name", "Type/Instructor"]
-        records = []
+    def view_row(self, kind, record):
+        # The ID, name and type or instructor name of a record, then its kind, which is not shown
+        if kind == "course":
+            instructor_name = record.instructor.name if record.instructor else "N/A"
+            return [record.course_id, record.course_name, instructor_name, kind]
+        return [getattr(record, record._KEY), record.name, kind.capitalize(), kind]
+
+    def iter_view_records(self):
+        # Rows are built only when the table view fetches them
         for student in self.students:
-            records.append([student.student_id, student.name, "Student"])
+            yield self.view_row("student", student)
         for instructor in self.instructors:
-            records.append([instructor.instructor_id, instructor.name, "Instructor"])
+            yield self.view_row("instructor", instructor)
         for course in self.courses:
-            instructor_name = course.instructor.name if course.instructor else "N/A"
-            records.append([course.course_id, course.course_name, instructor_name])
-        
-        self.model = RecordTableModel(records, headers)
+            yield self.view_row("course", course)
+
+    def update_treeview(self):
+        headers = ["ID", "Name", "Type/Instructor"]
+        # Rows are identified by their kind and ID, so single changes can be applied
+        self.model = RecordTableModel(self.iter_view_records(), headers, key=lambda row: (row[3], row[0]))
         self.tree_view.setModel(self.model)
+        self.view_filtered = False
 
     def refresh_dropdowns(self):
-        self.course_instructor_combo.clear()
-        self.student_combo.clear()
-        self.course_combo.clear()
-        self.instructor_combo.clear()
-        self.course_combo_assign.clear()
-        
-        for instructor in self.instructors:
-            self.course_instructor_combo.addItem(instructor.name, instructor)
-            self.instructor_combo.addItem(instructor.name, instructor)
-        
-        for student in self.students:
-            self.student_combo.addItem(student.name, student)
-        
-        for course in self.courses:
-            self.course_combo.addItem(course.course_name, course)
-            self.course_combo_assign.addItem(course.course_name, course)
+        # The pick indexes are kept up to date as records change, so only
+        # the first matches of each dropdown's text are looked up again
+        for pickers in self.pickers.values():
+            for picker in pickers:
+                picker.refresh()
+
+    def apply_to_indexes(self, event):
+        # Index a new or changed record, or forget a deleted one, then refresh
+        # only the dropdowns listing that kind of record
+        if event.entity not in self.indexes:
+            return
+        search_index, picks, name_attribute = self.indexes[event.entity]
+        record = event.record
+        if isinstance(event, RecordDeleted):
+            search_index.discard(record)
+            picks.discard(record)
+        else:
+            name = getattr(record, name_attribute)
+            search_index.add(record, name)
+            picks.add(record, name, str(event.record_id))
+        for picker in self.pickers[event.entity]:
+            picker.refresh()
+
+    def apply_to_view(self, event):
+        # Add, update or remove the one row of the changed record
+        if event.entity not in self.indexes or self.model is None:
+            return
+        if isinstance(event, RecordDeleted):
+            self.model.remove_record(event.key)
+        elif isinstance(event, RecordInserted) and not self.view_filtered:
+            self.model.add_record(self.view_row(event.entity, event.record))
+        else:
+            # Search results only show a new record if they already list it
+            self.model.update_record(self.view_row(event.entity, event.record))
 
     def add_student(self):
         try:
@@ -266,10 +311,11 @@ class MainWindow(QMainWindow):
             email = self.student_email_entry.text()
             student_id = int(self.student_id_entry.text())
             
-            student = Student(name, age, email, student_id)
+            with self.identity_map:
+                student = Student(name, age, email, student_id)
             self.students.append(student)
-            self.update_treeview()
-            self.refresh_dropdowns()
+            self.changes.mark_dirty(student)
+            self.events.publish(RecordInserted("student", student_id, student))
         except Exception as e:
             self.show_error_message("Error adding student", str(e))
 
@@ -280,10 +326,11 @@ class MainWindow(QMainWindow):
             email = self.instructor_email_entry.text()
             instructor_id = int(self.instructor_id_entry.text())
             
-            instructor = Instructor(name, age, email, instructor_id)
+            with self.identity_map:
+                instructor = Instructor(name, age, email, instructor_id)
             self.instructors.append(instructor)
-            self.update_treeview()
-            self.refresh_dropdowns()
+            self.changes.mark_dirty(instructor)
+            self.events.publish(RecordInserted("instructor", instructor_id, instructor))
         except Exception as e:
             self.show_error_message("Error adding instructor", str(e))
 
@@ -293,10 +340,11 @@ class MainWindow(QMainWindow):
             course_id = int(self.course_id_entry.text())
             instructor = self.course_instructor_combo.currentData()
             
-            course = Course(course_id, course_name, instructor)
+            with self.identity_map:
+                course = Course(course_id, course_name, instructor)
             self.courses.append(course)
-            self.update_treeview()
-            self.refresh_dropdowns()
+            self.changes.mark_dirty(course)
+            self.events.publish(RecordInserted("course", course_id, course))
         except Exception as e:
             self.show_error_message("Error adding course", str(e))
 
@@ -307,7 +355,8 @@ class MainWindow(QMainWindow):
             
             if course and student:
                 course.add_student(student)
-                self.update_treeview()
+                # No row shows registrations, but other subscribers may care
+                self.events.publish(RecordInserted("registration", (student.student_id, course.course_id)))
         except Exception as e:
             self.show_error_message("Error registering student", str(e))
 
@@ -318,10 +367,18 @@ class MainWindow(QMainWindow):
             
             if course and instructor:
                 course.assign_instructor(instructor)
-                self.update_treeview()
+                self.events.publish(RecordUpdated("course", course.course_id, course))
         except Exception as e:
             self.show_error_message("Error assigning instructor", str(e))
 
+    def find(self, index, model_class, name_attribute, search_name, search_id):
+        # The records whose name contains search_name, then the one with ID search_id
+        found = index.search(search_name)
+        record = self.identity_map.get(model_class, int(search_id)) if search_id.isdigit() else None
+        if record is not None and search_name.lower() not in getattr(record, name_attribute).lower():
+            found.append(record)
+        return found
+
     def search_records(self):
         try:
             search_name = self.search_name_entry.text()
@@ -330,29 +387,30 @@ class MainWindow(QMainWindow):
             
             found_records = []
             
+            # Names are looked up in the trigram indexes and IDs in the identity map,
+            # instead of checking every record
             if search_type == 1:  # Student
-                for student in self.students:
-                    if search_name.lower() in student.name.lower() or search_id == student.student_id:
-                        found_records.append([student.student_id, student.name, "Student"])
+                for student in self.find(self.student_index, Student, "name", search_name, search_id):
+                    found_records.append(self.view_row("student", student))
             elif search_type == 2:  # Instructor
-                for instructor in self.instructors:
-                    if search_name.lower() in instructor.name.lower() or search_id == instructor.instructor_id:
-                        found_records.append([instructor.instructor_id, instructor.name, "Instructor"])
+                for instructor in self.find(self.instructor_index, Instructor, "name", search_name, search_id):
+                    found_records.append(self.view_row("instructor", instructor))
             elif search_type == 3:  # Course
-                for course in self.courses:
-                    if search_name.lower() in course.course_name.lower() or search_id == course.course_id:
-                        instructor_name = course.instructor.name if course.instructor else "N/A"
-                        found_records.append([course.course_id, course.course_name, instructor_name])
+                for course in self.find(self.course_index, Course, "course_name", search_name, search_id):
+                    found_records.append(self.view_row("course", course))
             
-            self.model = RecordTableModel(found_records, ["ID", "Name", "Type/Instructor"])
+            self.model = RecordTableModel(found_records, ["ID", "Name", "Type/Instructor"],
+                                          key=lambda row: (row[3], row[0]))
             self.tree_view.setModel(self.model)
+            self.view_filtered = True
         except Exception as e:
             self.show_error_message("Error searching records", str(e))
 
     def save_data_to_file(self):
         try:
             filename = "school_data.json"  # Set the filename to save
-            save_data(filename, self.instructors, self.students, self.courses)
+            # Only the changes since the last snapshot are written, unless it is time to compact
+            save_changes(filename, self.instructors, self.students, self.courses, self.changes)
             self.show_info_message("Data saved successfully.")
         except Exception as e:
             self.show_error_message("Error saving data", str(e))
@@ -360,13 +418,30 @@ class MainWindow(QMainWindow):
     def load_data_from_file(self):
         try:
             filename = "school_data.json"  # Set the filename to load
-            instructor_dict, student_dict, course_dict = load_data(filename)
+            # Load into a fresh identity map so the replaced objects cannot clash
+            identity_map = IdentityMap()
+            instructor_dict, student_dict, course_dict = load_data(filename, identity_map=identity_map, changes=self.changes)
+            self.identity_map = identity_map
 
             # Convert the dictionaries to lists and store them in the instance attributes
             self.instructors = list(instructor_dict.values())
             self.students = list(student_dict.values())
             self.courses = list(course_dict.values())
 
+            # Rebuild the search and pick indexes for the loaded records
+            for index in (self.student_index, self.instructor_index, self.course_index,
+                          self.student_picks, self.instructor_picks, self.course_picks):
+                index.clear()
+            self.student_index.update((student, student.name) for student in self.students)
+            self.instructor_index.update((instructor, instructor.name) for instructor in self.instructors)
+            self.course_index.update((course, course.course_name) for course in self.courses)
+            self.student_picks.update((student, (student.name, str(student.student_id)))
+                                      for student in self.students)
+            self.instructor_picks.update((instructor, (instructor.name, str(instructor.instructor_id)))
+                                         for instructor in self.instructors)
+            self.course_picks.update((course, (course.course_name, str(course.course_id)))
+                                     for course in self.courses)
+
             # Update the UI
             self.update_treeview()  # Update the tree view to reflect the loaded data
             self.refresh_dropdowns()  # Refresh the dropdowns to show the loaded data
@@ -393,4 +468,6 @@ if __name__ == '__main__':
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
-    sys.exit(app.exec_())
+    with window.changes:
+        status = app.exec_()
+    sys.exit(status)
@@ -0,0 +1,155 @@
+import threading
+from itertools import groupby
+from database import get_connection
+
+# Tables in the order their rows must be written so references resolve.
+TABLE_ORDER = ("person", "instructor", "student", "course", "registration")
+
+_local = threading.local()
+
+
+def current_unit_of_work(db_name='school.db'):
+    """Return the innermost active unit of work for a database, if any.
+
+    Args:
+        db_name (str): The name of the database file. Defaults to 'school.db'.
+
+    Returns:
+        UnitOfWork or None: The active unit of the calling thread, or None if
+        no unit for ``db_name`` is open.
+    """
+    stack = getattr(_local, "stack", None)
+    if stack and stack[-1].db_name == db_name:
+        return stack[-1]
+    return None
+
+
+class UnitOfWork:
+    """Queue model writes and apply them in a single transaction.
+
+    While the ``with`` block is active, ``save_to_db``, ``Course.set_instructor``
+    and ``Course.add_student`` queue their statements here instead of writing
+    and committing one by one. When the block exits normally every queued
+    statement is written in dependency order and committed once; if the block
+    or the flush raises, nothing is written and the in-memory changes
+    registered with :meth:`on_rollback`, such as the enrollments made by
+    ``Course.add_student`` and the instructors assigned by
+    ``Course.set_instructor`` and ``Instructor.assign_course``, are undone. A unit opened inside another unit for
+    the same database hands its work to the outer one.
+
+    Example::
+
+        with UnitOfWork():
+            course = Course(42, "Math", instructor)
+            for student in students:
+                course.add_student(student)
+    """
+
+    def __init__(self, db_name='school.db'):
+        """Initialize an empty unit of work.
+
+        Args:
+            db_name (str): The name of the database file. Defaults to 'school.db'.
+        """
+        self.db_name = db_name
+        self._pending = {table: [] for table in TABLE_ORDER}
+        self._undo = []
+
+    def add(self, table, sql, params):
+        """Queue a statement to be executed when the unit is flushed.
+
+        Args:
+            table (str): The table the statement writes to, one of ``TABLE_ORDER``.
+            sql (str): The parameterized statement.
+            params (tuple): The statement parameters.
+
+        Raises:
+            ValueError: If the table is unknown.
+        """
+        if table not in self._pending:
+            raise ValueError(f"Unknown table: '{table}'.")
+        self._pending[table].append((sql, params))
+
+    def add_many(self, table, sql, rows):
+        """Queue a statement once for each of many parameter tuples.
+
+        Args:
+            table (str): The table the statement writes to, one of ``TABLE_ORDER``.
+            sql (str): The parameterized statement.
+            rows (iterable): The parameter tuples.
+
+        Raises:
+            ValueError: If the table is unknown.
+        """
+        if table not in self._pending:
+            raise ValueError(f"Unknown table: '{table}'.")
+        self._pending[table].extend((sql, params) for params in rows)
+
+    def on_rollback(self, undo):
+        """Register a function undoing an in-memory change if the queued writes are not committed.
+
+        Functions are called in the reverse order of their registration.
+
+        Args:
+            undo (callable): Called without arguments on rollback.
+        """
+        self._undo.append(undo)
+
+    def __len__(self):
+        return sum(len(ops) for ops in self._pending.values())
+
+    def flush(self):
+        """Write every queued statement in one transaction and clear the queue.
+
+        Consecutive statements with the same SQL are sent with ``executemany``.
+
+        Raises:
+            sqlite3.Error: If any statement fails; the transaction is rolled back.
+        """
+        conn = get_connection(self.db_name)
+        with conn:
+            for table in TABLE_ORDER:
+                for sql, ops in groupby(self._pending[table], key=lambda op: op[0]):
+                    conn.executemany(sql, [params for _, params in ops])
+        self.discard()
+        self._undo.clear()
+
+    def discard(self):
+        """Drop every queued statement without writing it."""
+        for ops in self._pending.values():
+            ops.clear()
+
+    def rollback(self):
+        """Drop every queued statement and undo the changes registered with :meth:`on_rollback`."""
+        self.discard()
+        undo, self._undo = self._undo, []
+        for function in reversed(undo):
+            function()
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _local.stack.pop()
+        if exc_type is not None:
+            self.rollback()
+            return False
+
+        outer = current_unit_of_work(self.db_name)
+        if outer is not None:
+            for table, ops in self._pending.items():
+                outer._pending[table].extend(ops)
+            outer._undo.extend(self._undo)
+            self.discard()
+            self._undo.clear()
+        else:
+            try:
+                self.flush()
+            except BaseException:
+                self.rollback()
+                raise
+        return False
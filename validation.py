@@ -0,0 +1,135 @@
+import re
+
+# Compiled once at import; matching with a bound method skips the pattern
+# cache lookup that re.match(pattern, ...) does on every call.
+NAME_PATTERN = re.compile(r'^[A-Za-z\s]+$')
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
+
+_match_name = NAME_PATTERN.match
+_match_email = EMAIL_PATTERN.match
+
+
+def is_valid_name(name):
+    """Return True if the name contains only letters and spaces."""
+    return isinstance(name, str) and _match_name(name) is not None
+
+
+def is_valid_email(email):
+    """Return True if the email has a valid format."""
+    return isinstance(email, str) and _match_email(email) is not None
+
+
+def is_valid_age(age):
+    """Return True if the age is a positive integer."""
+    return isinstance(age, int) and age > 0
+
+
+def is_valid_course_name(course_name):
+    """Return True if the course name contains only letters."""
+    return isinstance(course_name, str) and course_name.isalpha()
+
+
+def person_errors(name, age, email):
+    """Return the validation errors for the fields shared by every person.
+
+    Args:
+        name (str): The name to check.
+        age (int): The age to check.
+        email (str): The email to check.
+
+    Returns:
+        list of str: The error messages, empty if every field is valid.
+    """
+    errors = []
+    if not is_valid_name(name):
+        errors.append(f"Invalid name: '{name}'. Name should contain only alphabetic characters and spaces.")
+    if not is_valid_age(age):
+        errors.append("Age must be a positive integer.")
+    if not is_valid_email(email):
+        errors.append(f"Invalid email format: '{email}'.")
+    return errors
+
+
+def _is_record_id(value):
+    """Return True if the value is a positive integer ID; booleans are not IDs."""
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def _student_errors(record):
+    errors = person_errors(record.get("name"), record.get("age"), record.get("_email"))
+    if not _is_record_id(record.get("student_id")):
+        errors.append("Student ID must be a positive integer.")
+    courses = record.get("registered_courses")
+    if not isinstance(courses, list) or not all(_is_record_id(course_id) for course_id in courses):
+        errors.append("registered_courses must be a list of course IDs.")
+    return errors
+
+
+def _instructor_errors(record):
+    errors = person_errors(record.get("name"), record.get("age"), record.get("_email"))
+    if not _is_record_id(record.get("instructor_id")):
+        errors.append("Instructor ID must be a positive integer.")
+    return errors
+
+
+def _course_errors(record):
+    errors = []
+    course_id = record.get("course_id")
+    if not isinstance(course_id, int) or course_id <= 0:
+        errors.append("course_id must be a positive integer.")
+    if not is_valid_course_name(record.get("course_name")):
+        errors.append("course_name must contain only letters.")
+    if "instructor_id" not in record or not (
+            record["instructor_id"] is None or _is_record_id(record["instructor_id"])):
+        errors.append("instructor_id must be a positive integer or null.")
+    return errors
+
+
+# Validators and ID keys for each snapshot section.
+_SECTION_VALIDATORS = {
+    "instructors": (_instructor_errors, "instructor_id"),
+    "courses": (_course_errors, "course_id"),
+    "students": (_student_errors, "student_id"),
+}
+
+
+def validate_records(section, records):
+    """Check a batch of snapshot records without stopping at the first error.
+
+    Records are checked with the same rules as the model constructors, and
+    the references a record holds (a student's ``registered_courses``, a
+    course's ``instructor_id``) must be present and hold IDs. A record that
+    is not a dict gets an error instead of raising. An ID that appears more
+    than once in the batch is reported on every repeat.
+
+    Args:
+        section (str): "instructors", "courses" or "students".
+        records (iterable of dict): The records, as written by :mod:`data_manager`.
+
+    Returns:
+        list of list of str: One list of error messages per record, in
+        order; the list is empty for a valid record.
+
+    Raises:
+        ValueError: If the section is unknown.
+    """
+    if section not in _SECTION_VALIDATORS:
+        raise ValueError(f"Unknown section: '{section}'.")
+    check, id_key = _SECTION_VALIDATORS[section]
+
+    results = []
+    seen_ids = set()
+    for record in records:
+        if not isinstance(record, dict):
+            results.append([f"Record must be an object, got {type(record).__name__}."])
+            continue
+        errors = check(record)
+        # Only integer IDs are compared; any other ID is already an error above
+        record_id = record.get(id_key)
+        if isinstance(record_id, int):
+            if record_id in seen_ids:
+                errors.append(f"Duplicate {id_key}: {record_id}.")
+            else:
+                seen_ids.add(record_id)
+        results.append(errors)
+    return results